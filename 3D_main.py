@@ -77,6 +77,9 @@ Created on Thu Jun  4 16:05:12 2020
 #           directory
 #           save_dir
 #           wildcard
+#           cache_dir
+#           state_file
+#           workers
 #           site_ID
 #           var_name: temp_C, temp_F, rel_hum, alt, SLP_hPa, SLP_inHg,
 #                     station_P, vis, ir, uv, uvi (depends on sensor name)
@@ -108,8 +111,14 @@ Created on Thu Jun  4 16:05:12 2020
 #
 #       Set the y-axis limits according to your dataset
 # ----------------------------------------------------------------------------
-#       At the moment, this program reads in all data even if a subset of time
-#       is requested for plotting, which is a bit of an overkill
+#       Only the data within the 'mintime' / 'maxtime' time frame are read in;
+#       files are skipped based on the date in their file name (or their first
+#       and last lines), so plotting one week of a 3-year archive only reads
+#       about a week's worth of files
+# ----------------------------------------------------------------------------
+#       To plot several sensors, variables and/or sites in one run, use
+#       'batch_main.py' instead; it reads each sensor directory in once and
+#       makes all of the plots for it from the same data
 # ----------------------------------------------------------------------------
 #       Be mindful of the amount of data you are reading in, as well as your
 #       'mintime' and 'maxtime' time frame limits, when using the daily
@@ -136,7 +145,9 @@ import reader
 from input_checker import input_checker
 from time_checker import time_checker
 from data_smoother import smoothing
-#import quality_assurance as QA
+import output
+from availability import AvailabilityIndex
+import quality_assurance as QA
 import plotter as pltr
 
 
@@ -163,6 +174,38 @@ save_dir = "/Users/blund/Documents/Python_Scripts/Figures/Frederick_CO/BMP280/"
 #    2020)
 wildcard = "*"
 
+#set this to the directory in which to keep a cache of the parsed data files
+#    so that files that have not changed since the last run do not have to be
+#    parsed again (e.g. for nightly re-plots of a long archive); set to an
+#    empty string, "", to not use a cache. To clear the cache, call
+#    data_cache.clear(cache_dir)
+cache_dir = ""
+
+#set this to the file in which to keep the processed data between runs so
+#    that only the files added since the last run are read in and merged into
+#    them (incremental mode; e.g. when one new file arrives per day); set to an
+#    empty string, "", to read in and process every file on every run
+#NOTE: this only applies when 'mintime' and 'maxtime' are both empty strings;
+#      use a separate file for each sensor (and units)
+state_file = ""
+
+#set this to the number of processes with which to read in the data files and
+#    make the daily/weekly/monthly figures at once (e.g. the number of CPU
+#    cores on this machine); 1 does them one after another. Only worth raising
+#    for archives of many files / many figures
+#NOTE: the figures are only made with more than one worker where they are
+#      saved but not shown (the non-interactive "Agg" matplotlib backend);
+#      otherwise they are made, and shown, one after another
+#NOTE: on Windows and macOS, more than one worker requires the code below the
+#      USER OPTIONS to be placed under 'if __name__ == "__main__":'
+workers = 1
+
+#set this to the file in which to save a report of the uptime, missing
+#    reports, data gaps, duplicated timestamps and time resets of this sensor
+#    for every day, week and month (".csv", or ".parquet" for a Parquet file);
+#    set to an empty string, "", to not make a report
+report_file = ""
+
 #change this to the name of the site from which data are being plotted; this
 #    will be used in the plot title as well as the name of the figure
 site_ID = "Frederick_CO"
@@ -244,22 +287,30 @@ averaged = check_inputs
 #    dataframes are read into this program. Parameters such as averaging and
 #    averaging window are specified in THIS program and given to the other
 #    program's function so that parameters in the other program do not override
-#    the ones used for THIS program
+#    the ones used for THIS program; 'mintime' and 'maxtime' are passed along
+#    so that only the data within the user-defined time frame are read in
 
 if sensor.lower() == "bmp180" or sensor.lower() == "bmp280":
-    call_reader = reader.bmp(directory, wildcard)
+    call_reader = reader.bmp(directory, wildcard, mintime, maxtime, cache_dir,
+                             state_file, workers)
 elif sensor.lower() == "htu21d":
-    call_reader = reader.htu21d(directory, wildcard)
+    call_reader = reader.htu21d(directory, wildcard, mintime, maxtime,
+                                cache_dir, state_file, workers)
 elif sensor.lower() == "mcp9808":
-    call_reader = reader.mcp9808(directory, wildcard)
+    call_reader = reader.mcp9808(directory, wildcard, mintime, maxtime,
+                                 cache_dir, state_file, workers)
 elif sensor.lower() == "si1145":
-    call_reader = reader.si1145(directory, wildcard)
+    call_reader = reader.si1145(directory, wildcard, mintime, maxtime,
+                                cache_dir, state_file, workers)
 elif sensor.lower() == "rain":
-    call_reader = reader.rain_gauge(directory, units, wildcard)
+    call_reader = reader.rain_gauge(directory, units, wildcard, mintime,
+                                    maxtime, cache_dir, state_file, workers)
 elif sensor.lower() == "wind_vane":
-    call_reader = reader.wind_vane(directory, wildcard)
+    call_reader = reader.wind_vane(directory, wildcard, mintime, maxtime,
+                                   cache_dir, state_file, workers)
 elif sensor.lower() == "anemometer":
-    call_reader = reader.anemometer(directory, units, wildcard)
+    call_reader = reader.anemometer(directory, units, wildcard, mintime,
+                                    maxtime, cache_dir, state_file, workers)
 else:
     #redundant, given that this parameter gets checked with the input checker
     print("Sensor name not recognized. Program exited...")
@@ -268,6 +319,12 @@ else:
 #df = reader."%s"(directory, wildcard) % sensor
 df = call_reader[0]
 missing_reports_times = call_reader[1]
+#times at which time reset and duplicated timestamps (for the report below)
+events = call_reader[2]
+
+#the availability index of the data (see 'availability.py'); the missing
+#    reports are counted once for both the time checker and the report below
+avail = AvailabilityIndex(df)
 
 
 ##############################################################################
@@ -276,7 +333,7 @@ missing_reports_times = call_reader[1]
 
 #this must be done AFTER the data is read in and cleansed since the dataset is
 #    used to determine the validity of the user-input 'mintime' and 'maxtime'
-check_time = time_checker(mintime, maxtime, plot_opt, df)
+check_time = time_checker(mintime, maxtime, plot_opt, df, avail)
 
 #the following variables are output from the time_checker function called above;
 #    separate them by their respective, appropriate variable names since they
@@ -304,8 +361,14 @@ if mintime != 0 or maxtime != df.index[-1]:
 ##########################    QUALITY ASSURANCE    ###########################
 ##############################################################################
 
-# #call the quality assurance function
-# call_QA = qa(sensor, mintime, maxtime, df)
+#flag the values outside the sensor's specifications; one flag per row of
+#    'df' (see 'quality_assurance.py'), e.g. QA.flagged(limits_flags, sensor,
+#    var_name) is True wherever 'var_name' was flagged
+limits_flags = QA.limits_test(sensor, df, units)
+
+#flag sudden jumps (e.g. spikes) and values stuck at the same value for too
+#    long, in the same form
+step_flags, persistence_flags = QA.temporal_test(sensor, df, units)
 
 
 
@@ -342,6 +405,11 @@ if sensor == "anemometer":
 # #    metrics and other metadata for analysis
 # call_output = output.
 
+#the availability report of this sensor for every day, week and month
+if report_file != "":
+    call_output = output.availability_report([(site_ID, sensor, df, events, avail)],
+                                             report_file)
+
 
 
 ##############################################################################
@@ -363,17 +431,20 @@ if plot_opt == "plotter":
 elif plot_opt == "daily":
     #call the daily-plotting function
     pltr.daily_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
-                 avg_window, mintime, maxtime, plot_opt, tag, df)
+                 avg_window, mintime, maxtime, plot_opt, tag, df,
+                 workers)
     
 elif plot_opt == "weekly":
     #call the weekly-plotting function
     pltr.weekly_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
-                        avg_window, mintime, maxtime, plot_opt, tag, df)
+                        avg_window, mintime, maxtime, plot_opt, tag, df,
+                        workers)
 
 elif plot_opt == "monthly":
     #call the monthly-plotting function
     pltr.monthly_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
-                        avg_window, mintime, maxtime, plot_opt, tag, df)
+                        avg_window, mintime, maxtime, plot_opt, tag, df,
+                        workers)
     
 elif plot_opt == "":
     #don't plot if 'plot_opt' set to an empty string
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+###############################################################################
+'''
+           _____   _____     _     ____        ___    ___   _____
+           |    \  |        / \    |   \       |  \  /  |   |
+           |____/  |__     /___\   |    |      |   \/   |   |__
+           | \     |      /     \  |    |      |        |   |
+           |  \    |____ /       \ |___/       |        |   |____
+'''
+
+#This code answers how available (up) a sensor was within any time frame of a
+#    dataframe returned by the reader functions: the number of missing reports,
+#    the total time, the uptime and the uptime percentage; also for every day,
+#    ISO week or month of the dataset at once.
+#
+#LICENSE:
+#This code may be used and distributed freely, provided proper attribution is
+#    given to UCAR.
+#
+#
+#REQUIREMENTS:
+#    Python 3
+#    Numpy
+#    Pandas
+#
+#
+#PLANNED FEATURES:
+#
+#
+#HOW TO USE:
+#    1. Save this file/program in the same directory as the parent program you
+#       will use this function in conjunction with
+#    2. Build the index once for a dataframe, then ask it about any time frame,
+#       given as indices of the dataframe from 'lo' up to (not including)
+#       'hi', or as times:
+#
+#       avail = AvailabilityIndex(df)
+#       avail.missing(lo, hi)
+#       avail.total(lo, hi)
+#       avail.uptime(lo, hi)
+#       avail.uptime_percent(lo, hi)
+#       avail.missing_times(lo, hi)
+#       lo, hi = avail.rows("2020-01-01 00:00", "2020-02-01 00:00")
+#
+#       Pass the same index to every function that asks about the dataframe
+#       (e.g. 'time_checker.py' and 'output.py'), so the missing reports are
+#       only counted once:
+#
+#       time_checker(mintime, maxtime, plot_opt, df, avail)
+#       output.timeframe_uptime(mintime, maxtime, df, avail)
+#       output.availability_report([(site_ID, sensor, df, events, avail)])
+#
+#       Build it only once the data of the dataframe will no longer change,
+#       i.e. after the reader functions (and 'data_smoother.py', which only
+#       adds columns)
+#
+#    3. For a table of the uptime of every day, ISO week or month:
+#
+#       avail.table("day")    ... or "week" or "month"
+#
+#
+#NOTES: A report is missing when the first data column of the dataframe
+#       (df.columns[1]) is NaN, as in the reader functions. Each report covers
+#       one minute.
+# ----------------------------------------------------------------------------
+#       The missing reports are counted once, as a running total (see
+#       'valid_counts.py'); every answer after that takes the same (very
+#       short) time no matter how long the time frame is. The times of the
+#       missing reports are only found if they are asked for.
+
+
+
+##############################################################################
+#########################    IMPORTING MODULES    ############################
+##############################################################################
+
+import numpy as np
+import pandas as pd
+from valid_counts import ValidCounts
+from calendar_index import CalendarIndex
+
+
+
+##############################################################################
+###############################    CLASS    ##################################
+##############################################################################
+
+class AvailabilityIndex:
+
+    def __init__(self, df):
+        self.df = df
+        self.column = df.columns[1]
+        self.counts = ValidCounts(df)
+        self.calendar = CalendarIndex(df.time)
+        #the indices of every missing report; only found when first needed
+        self._missing_idx = None
+
+    #the indices from the first report at or after 'start' up to (not
+    #    including) the first report after 'end' (times as "YYYY-MM-DD HH:mm";
+    #    empty strings for the beginning/end of the dataset)
+    def rows(self, start="", end=""):
+        lo = 0 if start == "" else self.calendar.locate(start)
+        hi = len(self.df) if end == "" else self.calendar.locate(pd.Timestamp(end) + pd.Timedelta(1, unit='ns'))
+        return lo, hi
+
+    #the number of missing reports
+    def missing(self, lo, hi):
+        return self.counts.size(lo, hi) - self.counts.count(self.column, lo, hi)
+
+    #the total amount of time
+    def total(self, lo, hi):
+        return pd.Timedelta(self.counts.size(lo, hi), unit='m')
+
+    #the total amount of uptime
+    def uptime(self, lo, hi):
+        return pd.Timedelta(self.counts.count(self.column, lo, hi), unit='m')
+
+    #the uptime percentage (rounded to 0.1%)
+    def uptime_percent(self, lo, hi):
+        return round((1 - (float(self.missing(lo, hi)) / float(self.counts.size(lo, hi)))) * 100., 1)
+
+    #the indices of every missing report
+    def missing_idx(self):
+        if self._missing_idx is None:
+            self._missing_idx = np.flatnonzero(self.df[self.column].isna().to_numpy())
+        return self._missing_idx
+
+    #the timestamps of the missing reports
+    def missing_times(self, lo, hi):
+        missing_idx = self.missing_idx()
+        idx = missing_idx[np.searchsorted(missing_idx, lo):np.searchsorted(missing_idx, hi)]
+        return pd.DatetimeIndex(self.df.time.to_numpy()[idx])
+
+    #the number of missing reports, total time, uptime, uptime percentage,
+    #    number of data gaps (runs of consecutive missing reports) and longest
+    #    data gap of every day, ISO week ("week") or month of the dataset, one
+    #    row each, starting at the beginning of that day/week/month (periods
+    #    only partly covered by the dataset are counted from/to the start/end
+    #    of the dataset; a data gap running into the next period is counted
+    #    in both)
+    def table(self, period):
+        if period not in ("day", "week", "month"):
+            raise ValueError("'period' must be \"day\", \"week\" or \"month\"")
+
+        if len(self.df) == 0:
+            bounds = lo = np.array([], dtype=np.int64)
+        elif period == "day":
+            bounds = self.calendar.days()
+        elif period == "week":
+            bounds = self.calendar.iso_weeks()
+        else:
+            bounds = self.calendar.months()
+
+        #the first and last index of each period
+        if len(self.df) > 0:
+            lo = np.unique(np.concatenate(([0], bounds)))
+        hi = np.append(lo[1:], len(self.df)).astype(np.int64)
+
+        totals = self.counts.totals(self.column)
+        size = hi - lo
+        valid = totals[hi] - totals[lo]
+
+        #the beginning of each period
+        start = self.calendar.times[lo]
+        if period == "day":
+            start = start.astype('datetime64[D]')
+        elif period == "week":
+            #1970-01-01 was a Thursday, 3 days after the start of its ISO week
+            day = start.astype('datetime64[D]')
+            start = day - (day.astype(np.int64) + 3) % 7
+        else:
+            start = start.astype('datetime64[M]')
+
+        #a data gap begins at each missing report that does not directly
+        #    follow another one within the same period
+        missing_idx = self.missing_idx()
+        in_period = np.searchsorted(lo, missing_idx, side='right') - 1
+        first = np.ones(len(missing_idx), dtype=bool)
+        first[1:] = (np.diff(missing_idx) != 1) | (np.diff(in_period) != 0)
+        gap_length = np.diff(np.append(np.flatnonzero(first), len(missing_idx)))
+        gap_period = in_period[first]
+        longest_gap = np.zeros(len(lo), dtype=np.int64)
+        np.maximum.at(longest_gap, gap_period, gap_length)
+
+        table = pd.DataFrame({'start': start.astype('datetime64[ns]'),
+                              'missing_reports': size - valid,
+                              'total': pd.to_timedelta(size, unit='m'),
+                              'uptime': pd.to_timedelta(valid, unit='m'),
+                              'uptime_percent': np.round((1 - (size - valid) / size) * 100., 1),
+                              'data_gaps': np.bincount(gap_period, minlength=len(lo)),
+                              'longest_gap': pd.to_timedelta(longest_gap, unit='m')})
+        return table
+
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+###############################################################################
+'''
+           _____   _____     _     ____        ___    ___   _____
+           |    \  |        / \    |   \       |  \  /  |   |
+           |____/  |__     /___\   |    |      |   \/   |   |__
+           | \     |      /     \  |    |      |        |   |
+           |  \    |____ /       \ |___/       |        |   |____
+'''
+
+#This code reads data from any number of UCAR/NCAR COMET 3D-PAWS sensors at
+#    any number of sites and generates every requested plot in one run. It is
+#    the batch version of '3D_main.py': instead of one sensor, one directory
+#    and one variable per run, it takes a list of site/sensor entries, reads
+#    each sensor directory in once, and makes every plot for that sensor from
+#    the same data.
+#
+#License:
+#This code may be used and distributed freely, provided
+#proper attribution is given to UCAR.
+#
+#
+#Requirements:
+#    Python 3
+#    Numpy
+#    Matplotlib
+#    Pandas
+#    Sys
+#    Json
+#    Hashlib
+#    Multiprocessing
+#
+#
+#Planned Features:
+#
+#
+#How to Use:
+#    1. Save this file/program in the same directory as '3D_main.py' and the
+#       programs it uses (reader.py, plotter.py, etc.)
+#    2. Change all variables in "USER OPTIONS" section to desired input; these
+#       are the same as in '3D_main.py', except that the sensors, directories,
+#       variables and plotting options are given as a list of entries in
+#       'config' (one entry per sensor per site):
+#
+#           'site_ID'   : name of the site
+#           'save_dir'  : directory in which to save the figures (with the
+#                         trailing forward slash)
+#           'sensor'    : bmp180, bmp280, htu21d, mcp9808, si1145, rain,
+#                         anemometer, wind_vane
+#           'directory' : directory holding the sensor's data files (with the
+#                         trailing forward slash)
+#           'var_names' : list of variables to plot (see '3D_main.py'; may be
+#                         left out for rain, anemometer and wind_vane)
+#           'plot_opts' : list of plotting options: plotter, daily, weekly,
+#                         monthly
+#
+#       Any other option in USER OPTIONS (wildcard, units, averaged,
+#       avg_window, mintime, maxtime, tag) may also be given in an entry to
+#       override it for that entry only, as may 'state_file' (the file in
+#       which to keep that entry's processed data between runs; see
+#       'state_dir').
+#
+#       ...or set 'config_file' to a JSON file holding the same list of
+#       entries, e.g.:
+#
+#       [{"site_ID": "Frederick_CO",
+#         "save_dir": "/path/to/Figures/Frederick_CO/",
+#         "sensor": "BMP280",
+#         "directory": "/path/to/data/bmp/",
+#         "var_names": ["temp_C", "SLP_hPa"],
+#         "plot_opts": ["daily", "monthly"]}]
+#
+#    3. Run with "python batch_main.py" in terminal, or give the JSON file on
+#       the command line instead of setting 'config_file':
+#       "python batch_main.py config.json"
+#
+#
+#NOTES: Each sensor directory is read in ONCE per distinct combination of
+#       wildcard, units, 'mintime' and 'maxtime', no matter how many variables
+#       and plotting options are requested for it.
+# ----------------------------------------------------------------------------
+#       The work is spread across 'workers' processes: first the sensor
+#       directories are read in (one directory per process), then every plot
+#       (one variable and one plotting option of one sensor per process) is
+#       made from the data read in. The plotting processes are forked from
+#       this program after the data are read in, so they share the data
+#       rather than each receiving a copy; where processes are not forked by
+#       default (macOS and Windows, where they are spawned instead), reading
+#       and plotting are done one after another in this program.
+# ----------------------------------------------------------------------------
+#       Figures are saved with the same names as with '3D_main.py' and are
+#       not shown on screen. A plot that fails (e.g. 'mintime'/'maxtime'
+#       outside the data of that sensor) is reported at the end of the run and
+#       does not stop the remaining plots.
+
+
+
+##############################################################################
+#########################    IMPORTING MODULES    ############################
+##############################################################################
+
+import matplotlib
+matplotlib.use("Agg") #figures are only saved, never shown
+import matplotlib.pyplot as plt
+import sys
+import json
+import hashlib
+import os
+import warnings
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import reader
+from input_checker import input_checker
+from time_checker import time_checker
+from data_smoother import smoothing
+import output
+from availability import AvailabilityIndex
+import plotter as pltr
+
+
+
+##############################################################################
+############################    USER OPTIONS    ##############################
+##############################################################################
+
+#the list of sensors (and sites) to plot; one entry per sensor per site, see
+#    the How to Use section above
+config = [
+    {'site_ID': "Frederick_CO",
+     'save_dir': "/Users/blund/Documents/Python_Scripts/Figures/Frederick_CO/BMP280/",
+     'sensor': "BMP280",
+     'directory': "/Users/blund/Documents/3D-PAWS/Data/3DPAWS_FrederickCO/data/bmp/",
+     'var_names': ["temp_C", "SLP_hPa", "station_P"],
+     'plot_opts': ["daily", "monthly"]},
+    {'site_ID': "Frederick_CO",
+     'save_dir': "/Users/blund/Documents/Python_Scripts/Figures/Frederick_CO/anemometer/",
+     'sensor': "anemometer",
+     'directory': "/Users/blund/Documents/3D-PAWS/Data/3DPAWS_FrederickCO/data/anemometer/",
+     'plot_opts': ["weekly"]},
+    ]
+
+#set this to a JSON file holding the list of entries to use it instead of
+#    'config' above; leave as an empty string, "", to use 'config'
+config_file = ""
+
+#the default options for every entry in 'config'; see '3D_main.py' for what
+#    each of them does
+wildcard = "*"
+units = "mps"
+averaged = False
+avg_window = 30
+mintime = ""
+maxtime = ""
+tag = "network-time"
+
+#set this to the directory in which to keep the processed data of each sensor
+#    directory between runs, so that only the files added since the last run
+#    are read in (incremental mode; see '3D_main.py'); each sensor directory
+#    (and read options) gets its own file in it, unless an entry gives its own
+#    'state_file'. Set to an empty string, "", to read in and process every
+#    file on every run
+state_dir = ""
+
+#set this to the directory in which to keep a cache of the parsed data files;
+#    set to an empty string, "", to not use a cache (see 'data_cache.py')
+cache_dir = ""
+
+#set this to True to keep the data read in as compact dataframes (32-bit
+#    floats, unit conversions such as temp_F computed only when plotted; see
+#    COMPACT DATA in 'reader.py'), to hold many sensors in memory at once
+compact = False
+
+#set this to the number of processes with which to read in and plot at once
+#    (e.g. the number of CPU cores on this machine); 1 does everything one
+#    after another in this program
+workers = 1
+
+#set this to the file in which to save a report of the uptime, missing
+#    reports, data gaps, duplicated timestamps and time resets of every sensor
+#    read in, for every day, week and month (".csv", or ".parquet" for a
+#    Parquet file); set to an empty string, "", to not make a report
+report_file = ""
+
+
+
+##############################################################################
+##############################    FUNCTIONS    ###############################
+##############################################################################
+
+#the data read in for each sensor directory, keyed by '_read_key'; filled in
+#    before the plotting processes are forked so that they all share it
+_frames = {}
+
+#the times at which time reset and the duplicated timestamps found while
+#    reading in each sensor directory (for the availability report), keyed
+#    like '_frames'
+_events = {}
+
+#the availability index of the data in '_frames' (see 'availability.py'),
+#    keyed like '_frames'; built once for the report and all of the plots
+#    made from the same data
+_avail = {}
+
+
+#the options that decide what a reader function returns; entries with the same
+#    key share one read
+def _read_key(entry):
+    return (entry['sensor'].lower(), entry['directory'], entry['wildcard'],
+            entry['units'], entry['mintime'], entry['maxtime'],
+            entry['state_file'])
+
+
+#the file in 'state_dir' in which to keep the processed data of an entry
+#    between runs; one file per read (see '_read_key'), so that the entries
+#    never share, overwrite or throw away each other's state
+def _state_path(entry):
+    key = repr(_read_key(dict(entry, state_file="")))
+    return os.path.join(state_dir, "%s_%s.pkl" % (entry['sensor'].lower(),
+                                                  hashlib.sha1(key.encode()).hexdigest()[:16]))
+
+
+#read in the data for one entry by calling the appropriate reader function
+#    (as in '3D_main.py'); 'file_workers' is the number of processes used to
+#    read in the files of the directory
+def _read_sensor(entry, file_workers=1):
+    sensor = entry['sensor'].lower()
+    args = (entry['mintime'], entry['maxtime'], cache_dir, entry['state_file'],
+            file_workers, compact)
+
+    if sensor == "bmp180" or sensor == "bmp280":
+        call_reader = reader.bmp(entry['directory'], entry['wildcard'], *args)
+    elif sensor == "htu21d":
+        call_reader = reader.htu21d(entry['directory'], entry['wildcard'], *args)
+    elif sensor == "mcp9808":
+        call_reader = reader.mcp9808(entry['directory'], entry['wildcard'], *args)
+    elif sensor == "si1145":
+        call_reader = reader.si1145(entry['directory'], entry['wildcard'], *args)
+    elif sensor == "rain":
+        call_reader = reader.rain_gauge(entry['directory'], entry['units'],
+                                        entry['wildcard'], *args)
+    elif sensor == "wind_vane":
+        call_reader = reader.wind_vane(entry['directory'], entry['wildcard'], *args)
+    elif sensor == "anemometer":
+        call_reader = reader.anemometer(entry['directory'], entry['units'],
+                                        entry['wildcard'], *args)
+
+    #the dataframe, and the time resets and duplicated timestamps for the
+    #    availability report
+    return call_reader[0], call_reader[2]
+
+
+#the name of an error (or exit) 'e' and its message, on one line, for the
+#    summary at the end (e.g. the reason a reader function exited with)
+def _error_text(e):
+    message = " ".join(str(e).split())
+    if message == "":
+        return type(e).__name__
+    return "%s: %s" % (type(e).__name__, message)
+
+
+#read in the data for one entry; returns the dataframe and time
+#    resets/duplicated timestamps, and None, or None and an error message if
+#    the directory could not be read in (e.g. no data files within the time
+#    frame)
+def _read_job(entry, file_workers=1):
+    try:
+        return _read_sensor(entry, file_workers), None
+    except (Exception, SystemExit) as e:
+        return None, "%s %s %s: %s" % (entry['site_ID'], entry['sensor'],
+                                       entry['directory'], _error_text(e))
+
+
+#make ONE plot (one variable and one plotting option for one entry) from the
+#    data in '_frames'; returns an error message if the plot failed, otherwise
+#    None
+def _plot_job(job):
+    key, entry, var_name, plot_opt = job
+    df = _frames[key]
+
+    try:
+        #right now, the anemometer is the only sensor that has the ability for
+        #    smoothing/averaging; smoothing adds a column to the dataframe it is
+        #    given, so give it a (shallow) copy to leave the data in '_frames'
+        #    as read in for the other plots of this sensor
+        if entry['sensor'].lower() == "anemometer":
+            df = smoothing(entry['averaged'], entry['avg_window'], df.copy(deep=False))
+
+        #verify 'mintime'/'maxtime' against this sensor's data and convert
+        #    them to indices
+        check_time = time_checker(entry['mintime'], entry['maxtime'], plot_opt,
+                                  df, _avail[key])
+        min_idx, max_idx, plot_opt = check_time[0], check_time[1], check_time[2]
+
+        #based on the plotting option, call the appropriate plotting function
+        if plot_opt == "daily":
+            plot_func = pltr.daily_plotter
+        elif plot_opt == "weekly":
+            plot_func = pltr.weekly_plotter
+        elif plot_opt == "monthly":
+            plot_func = pltr.monthly_plotter
+        else:
+            plot_func = pltr.plotter
+
+        with warnings.catch_warnings():
+            #'_save_figure' calls plt.show(), which does nothing (but warn)
+            #    with the non-interactive backend
+            warnings.filterwarnings("ignore", message=".*non-GUI backend")
+            plot_func(entry['sensor'], entry['save_dir'], entry['site_ID'],
+                      var_name, entry['units'], entry['averaged'],
+                      entry['avg_window'], min_idx, max_idx, plot_opt,
+                      entry['tag'], df)
+
+    #time_checker and the plotters exit the program on some errors; only stop
+    #    this plot
+    except (Exception, SystemExit) as e:
+        return "%s %s %s %s: %s" % (entry['site_ID'], entry['sensor'],
+                                    var_name, plot_opt, _error_text(e))
+
+    finally:
+        #nothing is shown, so free the figures that were made
+        plt.close('all')
+
+    return None
+
+
+#the process pool for 'workers' processes, so that the plotting processes
+#    share '_frames'; only where the platform forks processes by default
+#    (forking on macOS, where processes may already run threads, is unsafe),
+#    otherwise None (do everything in this program)
+def _pool(workers):
+    context = multiprocessing.get_context()
+    if workers <= 1 or context.get_start_method() != "fork":
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+def batch_main(config, workers=1):
+
+    #tell the user that the function was called
+    print("------------------------------------------------------------------\n")
+    print("'batch_main' function called...\n")
+
+    #fill in the default options for every entry and check its inputs; the
+    #    input checker exits the program on a bad entry, before anything is
+    #    read in
+    entries = []
+    for e in config:
+        entry = {'wildcard':wildcard, 'units':units, 'averaged':averaged,
+                 'avg_window':avg_window, 'mintime':mintime, 'maxtime':maxtime,
+                 'tag':tag, 'state_file':"", 'var_names':[""]}
+        entry.update(e)
+        if entry['state_file'] == "" and state_dir != "":
+            os.makedirs(state_dir, exist_ok=True)
+            entry['state_file'] = _state_path(entry)
+        for var_name in entry['var_names']:
+            entry['averaged'] = input_checker(entry['sensor'], var_name,
+                                              entry['units'], entry['averaged'],
+                                              entry['avg_window'])
+        entries.append(entry)
+
+    #one read per distinct sensor directory (and read options)
+    reads = {}
+    for entry in entries:
+        reads.setdefault(_read_key(entry), entry)
+
+    #every plot to make: each variable with each plotting option of each entry
+    jobs = [(_read_key(entry), entry, var_name, plot_opt)
+            for entry in entries
+            for var_name in entry['var_names']
+            for plot_opt in entry['plot_opts']]
+
+    ######################## Read in Sensor Directories ######################
+
+    #read in each directory in its own process (which then reads the files in
+    #    that directory one after another), or, with one read or one worker,
+    #    here with all workers reading in the files
+    pool = _pool(min(workers, len(reads)))
+    if pool is None:
+        results = [_read_job(entry, workers) for entry in reads.values()]
+    else:
+        with pool:
+            results = list(pool.map(_read_job, reads.values()))
+
+    #a directory that could not be read in is reported at the end, along with
+    #    the plots that would have been made from it
+    read_errors = []
+    for key, (frame, error) in zip(reads.keys(), results):
+        if error is None:
+            _frames[key], _events[key] = frame
+            _avail[key] = AvailabilityIndex(_frames[key])
+        else:
+            read_errors.append(error)
+    jobs = [job for job in jobs if job[0] in _frames]
+
+    ########################## Availability Report ###########################
+
+    #one table for every sensor directory read in (see 'output.py')
+    if report_file != "" and len(_frames) > 0:
+        output.availability_report([(reads[key]['site_ID'], reads[key]['sensor'],
+                                     _frames[key], _events[key], _avail[key])
+                                    for key in _frames], report_file)
+        print("Availability report saved to %s\n" % report_file)
+
+    ############################### Plotting #################################
+
+    #the plotting processes are started (forked) only now, so that they all
+    #    share '_frames' with this program
+    pool = _pool(min(workers, len(jobs)))
+    if pool is None:
+        errors = [_plot_job(job) for job in jobs]
+    else:
+        with pool:
+            errors = list(pool.map(_plot_job, jobs))
+    errors = [e for e in errors if e is not None]
+
+    print("------------------------------------------------------------------\n")
+    print("%s sensor directories read, %s failed; %s plots made, %s failed.\n" %
+          (len(_frames), len(read_errors), len(jobs) - len(errors), len(errors)))
+    for e in read_errors + errors:
+        print(e)
+
+    return read_errors + errors
+
+
+
+##############################################################################
+
+#only run the batch if this program is run directly (this guard is also
+#    needed for the worker processes)
+if __name__ == "__main__":
+
+    #a JSON config file given on the command line or in 'config_file' takes
+    #    the place of 'config'
+    if len(sys.argv) > 1:
+        config_file = sys.argv[1]
+    if config_file != "":
+        with open(config_file) as f:
+            config = json.load(f)
+
+    batch_main(config, workers)
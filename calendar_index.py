@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+###############################################################################
+'''
+           _____   _____     _     ____        ___    ___   _____
+           |    \  |        / \    |   \       |  \  /  |   |
+           |____/  |__     /___\   |    |      |   \/   |   |__
+           | \     |      /     \  |    |      |        |   |
+           |  \    |____ /       \ |___/       |        |   |____
+'''
+
+#This code finds where the days, weeks, months (or any other periods of time)
+#    begin within the 'time' column of a dataframe returned by the reader
+#    functions, as integer indices into the dataframe.
+#
+#LICENSE:
+#This code may be used and distributed freely, provided proper attribution is
+#    given to UCAR.
+#
+#
+#REQUIREMENTS:
+#    Python 3
+#    Numpy
+#    Pandas
+#
+#
+#PLANNED FEATURES:
+#
+#
+#HOW TO USE:
+#    1. Save this file/program in the same directory as the parent program you
+#       will use this function in conjunction with
+#    2. Build the index once for a dataframe, then ask it for the indices at
+#       which each day / ISO week (Monday 00:00 UTC) / month / period begins
+#       between two indices of the dataframe ('lo' included, 'hi' excluded):
+#
+#       calendar = CalendarIndex(df.time)
+#       calendar.days(mintime, maxtime)
+#       calendar.iso_weeks(mintime, maxtime)
+#       calendar.months(mintime, maxtime)
+#       calendar.periods(pd.Timedelta(weeks=1), mintime, maxtime)
+#       calendar.locate("2020-01-01 00:00")
+#
+#
+#NOTES: Each day/week/month/period is looked up with a binary search of the
+#       (sorted) times, so no matter how long the dataset is, finding the
+#       boundaries takes a few microseconds per boundary and no copy of the
+#       data is made. The index of a boundary is that of the first time at or
+#       after it, so a boundary that falls within a gap in the data (if the
+#       gaps were not filled with NaNs) still gives the start of the data
+#       following it; boundaries within the same gap are only returned once.
+
+
+
+##############################################################################
+#########################    IMPORTING MODULES    ############################
+##############################################################################
+
+import numpy as np
+import pandas as pd
+
+
+
+##############################################################################
+###############################    CLASS    ##################################
+##############################################################################
+
+class CalendarIndex:
+
+    #'time' is the (sorted) 'time' column of the dataframe
+    def __init__(self, time):
+        self.times = np.asarray(time, dtype='datetime64[ns]')
+
+    def __len__(self):
+        return len(self.times)
+
+    #the index of the first time at or after 'when' (anything pandas accepts
+    #    as a time, e.g. "YYYY-MM-DD HH:mm"); len(self) if there is none
+    def locate(self, when):
+        return int(np.searchsorted(self.times, pd.Timestamp(when).to_datetime64()))
+
+    #the indices from 'lo' up to (not including) 'hi' at which the times given
+    #    by 'bounds' begin; times before the time at 'lo' are left out
+    def _boundaries(self, bounds, lo, hi):
+        bounds = bounds.astype('datetime64[ns]')
+        bounds = bounds[bounds >= self.times[lo]]
+        idx = np.unique(np.searchsorted(self.times, bounds))
+        return idx[idx < hi]
+
+    #the first and last time from 'lo' up to 'hi' (both defaulting to the
+    #    whole dataset)
+    def _span(self, lo, hi):
+        if hi is None:
+            hi = len(self.times)
+        return self.times[lo], self.times[max(hi, lo + 1) - 1], hi
+
+    #the indices at which each day (00:00 UTC) begins
+    def days(self, lo=0, hi=None):
+        first, last, hi = self._span(lo, hi)
+        bounds = np.arange(first.astype('datetime64[D]'), last + np.timedelta64(1, 'D'),
+                           dtype='datetime64[D]')
+        return self._boundaries(bounds, lo, hi)
+
+    #the indices at which each ISO week (Monday 00:00 UTC) begins
+    def iso_weeks(self, lo=0, hi=None):
+        first, last, hi = self._span(lo, hi)
+        #1970-01-01 was a Thursday, 3 days after the start of its ISO week
+        day = first.astype('datetime64[D]')
+        monday = day - (day.astype(np.int64) + 3) % 7
+        bounds = np.arange(monday, last + np.timedelta64(1, 'D'), 7,
+                           dtype='datetime64[D]')
+        return self._boundaries(bounds, lo, hi)
+
+    #the indices at which each month (00:00 UTC on the 1st) begins
+    def months(self, lo=0, hi=None):
+        first, last, hi = self._span(lo, hi)
+        bounds = np.arange(first.astype('datetime64[M]'), last.astype('datetime64[M]') + 1,
+                           dtype='datetime64[M]')
+        return self._boundaries(bounds, lo, hi)
+
+    #the indices at which each period of length 'length' (a pandas Timedelta
+    #    or anything it accepts, e.g. "7D") begins, counting from 'anchor' (by
+    #    default, the time at 'lo')
+    def periods(self, length, lo=0, hi=None, anchor=None):
+        first, last, hi = self._span(lo, hi)
+        length = np.timedelta64(pd.Timedelta(length).value, 'ns')
+        if anchor is None:
+            anchor = first
+        anchor = pd.Timestamp(anchor).to_datetime64()
+        #the first period beginning at or before the time at 'lo'
+        start = anchor + (first - anchor) // length * length
+        bounds = np.arange(start, last + 1, length)
+        return self._boundaries(bounds, lo, hi)
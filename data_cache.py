@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+###############################################################################
+'''
+           _____   _____     _     ____        ___    ___   _____
+           |    \  |        / \    |   \       |  \  /  |   |
+           |____/  |__     /___\   |    |      |   \/   |   |__
+           | \     |      /     \  |    |      |        |   |
+           |  \    |____ /       \ |___/       |        |   |____
+'''
+
+#This code keeps a cache of already-parsed 3D-PAWS data files so that the
+#    reader functions do not have to re-parse historical files (which never
+#    change) every time the parent program is run.
+#
+#LICENSE:
+#This code may be used and distributed freely, provided proper attribution is
+#    given to UCAR.
+#
+#
+#REQUIREMENTS:
+#    Python 3
+#    Numpy
+#
+#
+#PLANNED FEATURES:
+#
+#
+#HOW TO USE:
+#    1. Save this file/program in the same directory as 'reader.py'
+#    2. Set 'cache_dir' in the USER OPTIONS section of the parent program to
+#       the directory in which to keep the cache (leave it as an empty string
+#       to not use a cache); the reader functions take care of the rest
+#    3. To throw away the cache (e.g. after changing the data files in a way
+#       that does not change their size or modification time), call:
+#
+#       a) data_cache.clear(cache_dir)
+#       ... or, for a single data file...
+#       b) data_cache.clear(cache_dir, file)
+#
+#
+#NOTES: Each data file gets one entry in the cache: a NumPy .npz file holding
+#       the parsed (typed) columns of that data file, the number of lines that
+#       were skipped, and the path, size and modification time of the data
+#       file when it was parsed. An entry is only used if the data file still
+#       has the same size and modification time; otherwise the data file is
+#       parsed again and the entry is replaced.
+# ----------------------------------------------------------------------------
+#       The cache is capped at 'max_bytes' in total. Every time an entry is
+#       used its modification time is updated, so when the cache grows too
+#       large the least recently used entries are removed first.
+
+
+
+##############################################################################
+#########################    IMPORTING MODULES    ############################
+##############################################################################
+
+import numpy as np
+import hashlib
+import os
+
+
+
+##############################################################################
+########################    UNIVERSAL VARIABLES    ###########################
+##############################################################################
+
+#default maximum total size of the cache, in bytes (2 GB)
+max_bytes = 2 * 1024**3
+
+
+
+##############################################################################
+##############################    FUNCTIONS    ###############################
+##############################################################################
+
+#the path to the cache entry for a data file; the column layout is part of the
+#    name since the same file parsed with a different layout gives different
+#    columns
+def _entry_path(cache_dir, file, layouts):
+    key = repr((os.path.abspath(file), sorted((k, sorted(v.items())) for k, v in layouts.items())))
+    return os.path.join(cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".npz")
+
+
+#return the parsed array and number of skipped lines for 'file' if the cache
+#    holds an up-to-date entry for it; otherwise return None
+def load(cache_dir, file, layouts):
+    entry = _entry_path(cache_dir, file, layouts)
+    if not os.path.exists(entry):
+        return None
+
+    stat = os.stat(file)
+    try:
+        with np.load(entry) as npz:
+            #the data file has changed since it was cached (or, very unlikely,
+            #    two data files share the same entry name)
+            if str(npz['path']) != os.path.abspath(file) or \
+                int(npz['size']) != stat.st_size or \
+                    int(npz['mtime']) != stat.st_mtime_ns:
+                return None
+            block = npz['block']
+            skipped = int(npz['skipped'])
+    except (OSError, ValueError, KeyError):
+        #a damaged or partially written entry; treat it as missing
+        return None
+
+    #mark the entry as recently used
+    os.utime(entry)
+
+    return block, skipped
+
+
+#store the parsed array and number of skipped lines for 'file' in the cache;
+#    'stat' is the os.stat() of the data file taken BEFORE it was read, so that
+#    if the file grows while it is being parsed (e.g. a logger appending to
+#    it), the entry does not match the grown file and it is parsed again
+def store(cache_dir, file, layouts, block, skipped, stat):
+    os.makedirs(cache_dir, exist_ok=True)
+    entry = _entry_path(cache_dir, file, layouts)
+
+    #write to a temporary file first and then move it into place, so that an
+    #    interrupted run never leaves a half-written entry behind
+    temp = entry + ".%s.tmp" % os.getpid()
+    with open(temp, mode = "wb") as f:
+        np.savez(f, block=block, skipped=skipped, path=os.path.abspath(file),
+                 size=stat.st_size, mtime=stat.st_mtime_ns)
+    os.replace(temp, entry)
+
+
+#remove the least recently used entries until the cache is no larger than
+#    'limit' bytes
+def evict(cache_dir, limit=None):
+    if limit is None:
+        limit = max_bytes
+    if not os.path.isdir(cache_dir):
+        return
+
+    entries = [e for e in os.scandir(cache_dir) if e.name.endswith(".npz")]
+    entries = sorted(entries, key=lambda e: e.stat().st_mtime)
+    total = sum(e.stat().st_size for e in entries)
+
+    for e in entries:
+        if total <= limit:
+            break
+        total -= e.stat().st_size
+        os.remove(e.path)
+
+
+#invalidate the cache; removes every entry, or only the entries for 'file' if
+#    a data file is given
+def clear(cache_dir, file=None):
+    if not os.path.isdir(cache_dir):
+        return
+
+    for e in os.scandir(cache_dir):
+        if not e.name.endswith(".npz"):
+            continue
+        if file is not None:
+            try:
+                with np.load(e.path) as npz:
+                    if str(npz['path']) != os.path.abspath(file):
+                        continue
+            except (OSError, ValueError, KeyError):
+                pass #remove damaged entries as well
+        os.remove(e.path)
@@ -76,7 +76,13 @@ Created on Fri Nov 13 15:55:30 2020
 #    
 #
 #
-#NOTES:
+#NOTES: 'availability_report' makes the table of uptime, missing reports,
+#       data gaps, duplicated timestamps and time resets per day/week/month
+#       for any number of sensors (e.g. all sensors of a site, or a whole
+#       network through 'batch_main.py'):
+#
+#       report = output.availability_report([(site_ID, sensor, df, events)],
+#                                           "report.csv")
 
 
 
@@ -87,6 +93,7 @@ Created on Fri Nov 13 15:55:30 2020
 import numpy as np
 import pandas as pd
 import sys
+from availability import AvailabilityIndex
 
 
 
@@ -97,8 +104,9 @@ import sys
 ######################### Uptime within Time Frame ########################### 
 
 #this can only be called AFTER the 'time_checker.py' where 'mintime' and
-#    'maxtime' are set to integers
-def timeframe_uptime(mintime, maxtime, df):
+#    'maxtime' are set to integers; 'avail' is the availability index of 'df'
+#    (see 'availability.py'), built here if not given
+def timeframe_uptime(mintime, maxtime, df, avail=None):
     #calculate the total uptime based on the number of missing reports,
     #    but within the time frame ('mintime' and 'maxtime') set by the user; must
     #    add 1 to 'maxtime' because indexing ranges in python exclude the very
@@ -108,13 +116,66 @@ def timeframe_uptime(mintime, maxtime, df):
     #      being plotted, the uptime calculated below should be the same as that
     #      calculated above in the "Filling gaps with NaNs" subsection
     if mintime != 0 or maxtime != df.index[-1]:
-        missing_reports = df[df.columns[1]][mintime:maxtime+1].isna().sum()
-        total = pd.Timedelta(len(df.index[mintime:maxtime+1]), unit='m')
-        uptime = pd.Timedelta((len(df.index[mintime:maxtime+1]) - missing_reports), unit='m')
-        uptime_percent = round((1 - (float(missing_reports) / float(len(df[mintime:maxtime+1])))) * 100., 1)
+        if avail is None:
+            avail = AvailabilityIndex(df)
+        missing_reports = avail.missing(mintime, maxtime+1)
+        total = avail.total(mintime, maxtime+1)
+        uptime = avail.uptime(mintime, maxtime+1)
+        uptime_percent = avail.uptime_percent(mintime, maxtime+1)
         print("Uptime during the time frame is %s out of %s (%s%%).\n" % (uptime,total,uptime_percent))
         
         return missing_reports, total, uptime, uptime_percent 
+
+
+######################### Availability Report ################################
+
+#the availability of one sensor for every day, ISO week or month ('period');
+#    'avail' is the availability index of the dataframe and 'events' the
+#    dictionary of time resets and duplicated timestamps returned by the
+#    reader functions, so nothing is counted again that was already counted
+#    during pre-processing
+def _period_report(avail, events, period):
+    table = avail.table(period)
+    
+    #each time reset and duplicated timestamp falls within the last period
+    #    beginning at or before it
+    starts = table.start.to_numpy()
+    for name in ('duplicates', 'time_resets'):
+        in_period = np.searchsorted(starts, events[name], side='right') - 1
+        table[name] = np.bincount(in_period[in_period >= 0], minlength=len(table))
+    
+    return table
+
+
+#the availability (uptime, missing reports, data gaps, duplicated timestamps
+#    and time resets) of every sensor in 'frames' for every day, ISO week and
+#    month ('periods'), as one table; 'frames' is a list of
+#    (site_ID, sensor, df, events) with 'df' and 'events' as returned by the
+#    reader functions, or (site_ID, sensor, df, events, avail) to use the
+#    availability index 'avail' already built for 'df'. The table is also
+#    saved to 'report_file' if given, as a Parquet file if its name ends in
+#    ".parquet" (requires pyarrow or fastparquet), otherwise as a CSV file
+def availability_report(frames, report_file="", periods=("day", "week", "month")):
+    tables = []
+    for frame in frames:
+        site_ID, sensor, df, events = frame[:4]
+        avail = frame[4] if len(frame) > 4 else AvailabilityIndex(df)
+        for period in periods:
+            table = _period_report(avail, events, period)
+            table.insert(0, 'period', period)
+            table.insert(0, 'sensor', sensor)
+            table.insert(0, 'site_ID', site_ID)
+            tables.append(table)
+    
+    report = pd.concat(tables, ignore_index=True)
+    
+    if report_file.endswith(".parquet"):
+        report.to_parquet(report_file, index=False)
+    elif report_file != "":
+        report.to_csv(report_file, index=False)
+    
+    return report
+
     
 #information to add to this output file...
 #number of files read
@@ -31,6 +31,7 @@ Created on Thu Jun  4 16:05:12 2020
 #    Numpy
 #    Pandas
 #    Sys
+#    Multiprocessing (only used when making figures with more than one worker)
 #
 #
 #HISTORY:
@@ -57,6 +58,13 @@ Created on Thu Jun  4 16:05:12 2020
 #       ... or...
 #       b) call_plotter = pltr.plotter(mintime, maxtime, df)
 #
+#       The daily, weekly and monthly plotters also take the number of
+#       processes with which to make the figures at once ('workers'):
+#
+#       c) pltr.daily_plotter(sensor, save_dir, site_ID, var_name, units,
+#                             averaged, avg_window, mintime, maxtime,
+#                             plot_opt, tag, df, workers)
+#
 #    4. Run the parent program within terminal (e.g. "python main.py"),
 #       or open the parent program in Spyder and run from there.
 #
@@ -67,9 +75,16 @@ Created on Thu Jun  4 16:05:12 2020
 #    
 #
 #
-#NOTES: At the moment, this program reads in all data (the whole dataframe)
-#       even if a subset of time is requested for plotting, analysis, etc.,
-#       which is a bit of an overkill
+#NOTES: Only the data within the time frame of each figure are drawn, so a
+#       daily plot of a 2-year dataset takes no longer to make than a daily
+#       plot of a 2-day dataset
+# ----------------------------------------------------------------------------
+#       Each figure is closed once it has been saved (and shown), unless
+#       matplotlib is in interactive mode. When the figures are not shown at
+#       all (the Agg backend, or more than one worker), the daily, weekly and
+#       monthly plotters draw ONE figure and only swap in the data and x-axis
+#       limits of each time frame, so memory use does not grow with the number
+#       of figures made
 
 
 
@@ -80,8 +95,15 @@ Created on Thu Jun  4 16:05:12 2020
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+from pandas.tseries.frequencies import to_offset
 import sys
 import datetime
+import warnings
+from calendar_index import CalendarIndex
+from valid_counts import ValidCounts
+from reader import with_columns
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 
 
@@ -118,6 +140,106 @@ def _universal_params(ax,df,mintime,maxtime,sensor,site_ID):
 
 
 
+##############################################################################
+##############################   PLOT WINDOW    ###############################
+##############################################################################
+
+#the rows of 'df' to draw for the time frame 'mintime' to 'maxtime' (indices),
+#    taking every 'step'th row of the WHOLE dataframe (as df[::step] does);
+#    the rows just outside the time frame are included too so that the lines
+#    still run to the edges of the figure, exactly as when the whole
+#    dataframe is drawn and set_xlim() cuts it down to the time frame
+def _window(df, mintime, maxtime, step=1):
+    #the last row before 'mintime' and the first row after 'maxtime' that
+    #    fall on a multiple of 'step'
+    first = max((mintime - 1) // step * step, 0)
+    last = (maxtime // step + 1) * step
+    return df.iloc[first:last+1:step]
+
+
+#the positions of the values in 'y' that still need to be drawn when the line
+#    spans 'buckets' columns of pixels (min/max envelope, a.k.a. M4,
+#    downsampling): within each bucket, every unbroken run of values keeps only
+#    its first, last, smallest and largest value, which is all that can be
+#    seen of it in that column of pixels; the first NaN of every gap is kept
+#    so the line is still broken across the gap. Lines with no more than four
+#    values per bucket are drawn in full
+def _envelope(y, buckets):
+    n = len(y)
+    if n <= 4 * buckets:
+        return np.arange(n)
+    
+    valid = ~np.isnan(y)
+    after_valid = np.concatenate(([False], valid[:-1]))
+    bucket = np.arange(n) * buckets // n
+    
+    #a run starts at each value that is the first in its bucket or follows a
+    #    NaN; 'run' numbers the runs of the valid values
+    starts = valid & (np.concatenate(([True], bucket[1:] != bucket[:-1])) | ~after_valid)
+    idx = np.flatnonzero(valid)
+    run = np.cumsum(starts)[idx]
+    
+    #the first and last value of each run, and (sorting each run by value)
+    #    its smallest and largest value
+    first = np.concatenate(([True], run[1:] != run[:-1]))
+    last = np.concatenate((run[1:] != run[:-1], [True]))
+    order = idx[np.lexsort((y[idx], run))]
+    
+    gaps = np.flatnonzero(~valid & after_valid)
+    
+    return np.unique(np.concatenate((idx[first], idx[last], order[first],
+                                     order[last], gaps)))
+
+
+#set the data of the lines on 'ax' (one for each of 'columns' of 'df_window',
+#    in order), keeping only what can be seen at the resolution the figure is
+#    saved at (see '_envelope'); the time it takes to draw and save the figure
+#    then no longer grows with the length of the time frame
+def _set_lines(ax, df_window, columns):
+    
+    #the width of the figure in pixels when saved (at 500 dpi, see
+    #    '_save_figure'); the plotting area is narrower, so each bucket is
+    #    narrower than a pixel
+    buckets = int(ax.figure.get_figwidth() * 500)
+    
+    #pandas draws evenly spaced times as periods (of the spacing of the data)
+    #    rather than as dates, so the times must be given the same way
+    time = df_window.time.values
+    
+    for line, column in zip(ax.get_lines(), columns):
+        y = df_window[column].values
+        keep = _envelope(y, buckets)
+        x = time[keep]
+        if getattr(ax, 'freq', None) is not None:
+            x = pd.PeriodIndex(x, freq=ax.freq)
+        line.set_data(x, y[keep])
+    
+    return
+
+
+#the data of 'columns' of 'df_window' to hand to pandas for a figure 'width'
+#    inches wide, indexed by time: only the rows that can be seen at the
+#    resolution the figure is saved at are kept (see '_envelope'); pandas
+#    draws evenly spaced times as periods (of the spacing of the data), but
+#    cannot tell the spacing from the rows that are left, so evenly spaced
+#    times are given as periods here, as pandas would have made them from
+#    all the rows
+def _plot_data(df_window, columns, width):
+    buckets = int(width * 500)
+    keep = np.unique(np.concatenate([_envelope(df_window[column].values, buckets)
+                                     for column in columns]))
+    
+    time = pd.DatetimeIndex(df_window.time.values, name='time')
+    freq = pd.infer_freq(time) if len(time) >= 3 else None
+    
+    df_plot = df_window[columns].iloc[keep].set_axis(time[keep], axis=0)
+    if freq is not None:
+        df_plot.index = df_plot.index.to_period(to_offset(freq).rule_code)
+    
+    return df_plot
+
+
+
 ##############################################################################
 ##############################   SAVE FIGURE    ##############################
 ##############################################################################
@@ -176,6 +298,113 @@ def _save_figure(sensor, save_dir, site_ID, var_name, units, averaged,
 
 
 
+##############################################################################
+############################   RENDER FIGURES    #############################
+##############################################################################
+
+#the dataframe being plotted by the processes started in '_render'; each
+#    process is handed it once, when it starts, rather than each figure being
+#    sent its own copy
+_shared_df = None
+
+
+#set up each process started in '_render': figures are drawn with the
+#    non-interactive Agg backend and only saved, so plt.show() in
+#    '_save_figure' has nothing to show (and need not warn about it)
+def _init_worker(df):
+    global _shared_df
+    _shared_df = df
+    plt.switch_backend("Agg")
+    warnings.filterwarnings("ignore", message=".*non-GUI backend")
+
+
+#make every figure in 'figures' (see '_render') on ONE figure: the figure is
+#    drawn in full for the first time frame only, and then just redrawn for
+#    each of the others (see '_update_figure'); only used where figures are
+#    saved but never shown. The figure is closed at the end, so no matter how
+#    many figures are made, only one is ever held in memory
+def _render_reusing(figures, df):
+    ax = None
+    try:
+        for args in figures:
+            if ax is None:
+                ax = _make_figure(*args, df)
+            else:
+                _update_figure(ax, *args, df)
+            _save_figure(*args, df)
+    finally:
+        if ax is not None:
+            plt.close(ax.figure)
+
+
+#make a run of consecutive figures in a process started by '_render'
+def _render_chunk(figures):
+    _render_reusing(figures, _shared_df)
+
+
+#make every figure in 'figures' (a list of the arguments to the default plotter
+#    function, without the dataframe) in 'workers' processes at once, each
+#    process making a run of consecutive figures; each figure is saved with
+#    the same name as when made in this process
+def _render(figures, df, workers):
+    
+    #split the figures into a few runs of consecutive figures per process
+    workers = min(workers, len(figures))
+    size = -(-len(figures) // (workers * 4))
+    chunks = [figures[i:i+size] for i in range(0, len(figures), size)]
+    
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context(),
+                             initializer=_init_worker, initargs=(df,)) as pool:
+        #raise any error from the processes here
+        list(pool.map(_render_chunk, chunks))
+
+
+#the figures made by the daily, weekly and monthly plotters: each time frame
+#    handed to 'append' (the arguments to the default plotter function,
+#    without the dataframe) is made right away, and shown, as before. Where
+#    nothing is shown (the Agg backend), one figure is redrawn for every time
+#    frame rather than a new figure being made for each; only then, with
+#    'workers' greater than 1, are the time frames collected and made in that
+#    many processes at once by 'finish' (see '_render'). The processes are
+#    started the platform's default way (see 'reader.py' for what that means
+#    for the parent program)
+class _Figures:
+
+    def __init__(self, df, workers=1):
+        self.df = df
+        self.workers = workers
+        self.reuse = plt.get_backend().lower() == "agg"
+        self.pending = [] #the time frames left for the processes
+        self.ax = None #the figure being redrawn
+
+    def append(self, args):
+        if self.reuse and self.workers > 1:
+            self.pending.append(args)
+        elif self.reuse:
+            if self.ax is None:
+                self.ax = _make_figure(*args, self.df)
+            else:
+                _update_figure(self.ax, *args, self.df)
+            _save_figure(*args, self.df)
+        else:
+            plotter(*args, self.df)
+
+    #make the time frames left for the processes, if any (one process is not
+    #    worth starting for a single figure), and close the figure being
+    #    redrawn
+    def finish(self):
+        figures, self.pending = self.pending, []
+        if len(figures) > 1:
+            _render(figures, self.df, self.workers)
+        elif len(figures) == 1:
+            _render_reusing(figures, self.df)
+        if self.ax is not None:
+            plt.close(self.ax.figure)
+            self.ax = None
+
+
+
 ##############################################################################
 ##############################    PLOTTERs    #################################
 ##############################################################################
@@ -189,6 +418,59 @@ def plotter(sensor, save_dir, site_ID, var_name, units, averaged, avg_window,
     #no print statement here telling the user that this function was called
     #    because this one gets called MANY times from the other plotting
     #    functions (daily, weekly and monthly)
+    
+    #draw the figure by calling the hidden '_make_figure' function
+    ax = _make_figure(sensor, save_dir, site_ID, var_name, units, averaged,
+                      avg_window, mintime, maxtime, plot_opt, tag, df)
+    
+    #save the figure by calling the hidden '_save_figure' function
+    _save_figure(sensor, save_dir, site_ID, var_name, units, averaged,
+                avg_window, mintime, maxtime, plot_opt, tag, df)
+    
+    #free the figure once it has been saved and shown
+    _close_figure(ax.figure)
+    
+    return
+
+
+#the columns of 'df' that the default plotter draws (one line each, in this
+#    order) and the step between the rows it draws, based on 'sensor' and the
+#    averaging options
+def _plot_columns(sensor, var_name, averaged, avg_window):
+    if sensor.lower() == "anemometer":
+        if averaged == True:
+            return ['windspd_avg'], 1
+        elif averaged == "static":
+            return ['windspd_avg'], avg_window
+        elif averaged == "resampled":
+            return ['wind_speed'], avg_window
+        else:
+            return ['wind_speed'], 1
+    elif sensor.lower() == "wind_vane":
+        return ['wind_dir'], 1
+    elif sensor.lower() == "rain":
+        return ['rain', 'no_rain'], 1
+    else:
+        return [var_name], 1
+
+
+#draw the figure for the time frame 'mintime' to 'maxtime' (indices) without
+#    saving it; returns the axes it was drawn on
+def _make_figure(sensor, save_dir, site_ID, var_name, units, averaged,
+                 avg_window, mintime, maxtime, plot_opt, tag, df):
+        
+    #only the data within the time frame are drawn (rather than drawing the
+    #    whole dataframe and setting the x-axis limits to the time frame), so
+    #    the time it takes to make a figure depends on the length of the time
+    #    frame, not the length of the dataset
+    #(columns left out of compact dataframes, e.g. temp_F, are computed for
+    #    these data only; see COMPACT DATA in 'reader.py')
+    columns, step = _plot_columns(sensor, var_name, averaged, avg_window)
+    df_lines = with_columns(_window(df, mintime, maxtime, step), columns)
+    
+    #pandas is given only the rows that can be seen in the figure (see
+    #    '_plot_data'), so long time frames are downsampled before drawing
+    df_window = _plot_data(df_lines, columns, 30)
         
     #plot based on 'sensor'
     if sensor.lower() == "anemometer":
@@ -204,19 +486,19 @@ def plotter(sensor, save_dir, site_ID, var_name, units, averaged, avg_window,
         #plot based on the user-defined averaging/smoothing parameters
         if averaged == False:
             #plotting all raw data
-            ax = df.plot(x='time', y='wind_speed', color='b', label='wind_%s' % units,
+            ax = df_window.plot(y='wind_speed', color='b', label='wind_%s' % units,
                          figsize=(30,5))
         elif averaged == True:
             #plotting running averaged data
-            ax = df.plot(x='time', y='windspd_avg', color='b', label='%s_%s-min' % (units, avg_window),
+            ax = df_window.plot(y='windspd_avg', color='b', label='%s_%s-min' % (units, avg_window),
                          figsize=(30,5))
         elif averaged == "static":
             #plotting static averaged data (fewer data points)
-            ax = df[::avg_window].plot(x='time', y='windspd_avg', color='b',label='%s_%s-min-%s' % (units, avg_window, averaged),
+            ax = df_window.plot(y='windspd_avg', color='b',label='%s_%s-min-%s' % (units, avg_window, averaged),
                          figsize=(30,5))
         elif averaged == "resampled":
             #plotting every nth raw data point (fewer data points)
-            ax = df[::avg_window].plot(x='time', y='wind_speed', color='b', label='wind_%s_%s' % (units, averaged),
+            ax = df_window.plot(y='wind_speed', color='b', label='wind_%s_%s' % (units, averaged),
                          figsize=(30,5))
         else:
             #plotting all raw data; should eliminate this statement because
@@ -225,7 +507,7 @@ def plotter(sensor, save_dir, site_ID, var_name, units, averaged, avg_window,
             #    program will exit at the input-checking stage, never getting
             #    to this stage so the line below is a wasted of space; will
             #    vet this thoroughly
-            ax = df.plot(x='time', y='wind_speed', color='b', label='wind_%s' % units,
+            ax = df_window.plot(y='wind_speed', color='b', label='wind_%s' % units,
                          figsize=(30,5))
             
     ##########    
@@ -271,7 +553,7 @@ def plotter(sensor, save_dir, site_ID, var_name, units, averaged, avg_window,
     
 ##########   
     elif sensor.lower() == "wind_vane":
-        ax = df.plot(x='time', y='wind_dir', color='b', label='wind_dir',
+        ax = df_window.plot(y='wind_dir', color='b', label='wind_dir',
                      figsize=(30,5))
     
         #set y-axis limits/range
@@ -282,7 +564,7 @@ def plotter(sensor, save_dir, site_ID, var_name, units, averaged, avg_window,
         
 ##########    
     elif sensor.lower() == "rain":
-        ax = df.plot(x='time', y=['rain', 'no_rain'], color=['b','r'],
+        ax = df_window.plot(y=['rain', 'no_rain'], color=['b','r'],
                      label=['rain','no-rain'], figsize=(30,5))
         
         #set y-axis range and title based on "millimeters"
@@ -303,7 +585,7 @@ def plotter(sensor, save_dir, site_ID, var_name, units, averaged, avg_window,
             
 ##########    
     else: #for all other sensors, we plot here
-        ax = df.plot(x='time', y=var_name, color='b', label=var_name, figsize=(30,5))
+        ax = df_window.plot(y=var_name, color='b', label=var_name, figsize=(30,5))
     
         #plot parameters within these 'if' statements are those specific to each
         #    variable
@@ -412,12 +694,34 @@ def plotter(sensor, save_dir, site_ID, var_name, units, averaged, avg_window,
     #call the function that sets up all the universal plotting parameters:
     #    gridlines, x-axis limits, titles, labels, legends, etc.
     _universal_params(ax,df,mintime,maxtime,sensor,site_ID)
-    
-    #save the figure by calling the hidden '_save_figure' function
-    _save_figure(sensor, save_dir, site_ID, var_name, units, averaged,
-                avg_window, mintime, maxtime, plot_opt, tag, df)
 
+    return ax
+
+
+#redraw the figure on 'ax' (made by '_make_figure' with the same sensor,
+#    variable and averaging options) for a new time frame 'mintime' to
+#    'maxtime'; only the data of the lines and the x-axis limits change, the
+#    rest of the figure (grid, labels, title, legend) is kept as is
+def _update_figure(ax, sensor, save_dir, site_ID, var_name, units, averaged,
+                   avg_window, mintime, maxtime, plot_opt, tag, df):
+    
+    columns, step = _plot_columns(sensor, var_name, averaged, avg_window)
+    _set_lines(ax, with_columns(_window(df, mintime, maxtime, step), columns), columns)
+    
+    #set x-axis limits/range
+    ax.set_xlim(df.time[mintime], df.time[maxtime])
+    
     return
+
+
+#close a figure that has been saved, unless it may still be on screen;
+#    outside of interactive mode, plt.show() either waited for the figure
+#    window to be closed or (e.g. with the Agg backend) showed nothing at all,
+#    so the figure is no longer needed. Otherwise every figure made in a long
+#    run would be kept in memory until the end of the run
+def _close_figure(fig):
+    if plt.isinteractive() == False:
+        plt.close(fig)
     
 
 
@@ -428,7 +732,7 @@ def plotter(sensor, save_dir, site_ID, var_name, units, averaged, avg_window,
 #to plot figures on a daily basis within the user-defined time frame, call
 #    this function
 def daily_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
-                  avg_window, mintime, maxtime, plot_opt, tag, df):
+                  avg_window, mintime, maxtime, plot_opt, tag, df, workers=1):
     
     #tell the user that the function was called
     print("------------------------------------------------------------------\n")
@@ -447,11 +751,19 @@ def daily_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
     #      still be counted in the total count of days
     total_count = 0 #count for ALL weeks possible within the time frame
     plotted_count = 0 #count for all weeks that were plotted within the time frame
+    figures = _Figures(df, workers) #makes the figures (see '_Figures')
+    
+    #running totals of the valid data points, so that each time frame can be
+    #    checked for data without going through it (see 'valid_counts.py')
+    counts = ValidCounts(df)
+    
+    #find where each day begins in the dataset (see 'calendar_index.py')
+    calendar = CalendarIndex(df.time)
     
     #this line will find the first occurrence of a 00:00 UTC time in the
     #    selected timeframe; this is the start of your range to loop through
     #    for making daily plots
-    start = pd.DatetimeIndex(df.time[mintime:maxtime]).indexer_at_time('00:00:00')[0] + mintime
+    start = calendar.days(mintime, maxtime)[0]
     
     #before getting into the loop, to account for instances such that the
     #    dataset or the time frame set by the user begins with a partial day
@@ -466,7 +778,7 @@ def daily_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
         
         #skip the creation of plot if there are no data within the current 1-day
         #    period
-        if (averaged == True or averaged == "static") and (df[df.columns[2]][mintime:start].notna().any() == False):
+        if (averaged == True or averaged == "static") and (counts.count(df.columns[2], mintime, start) == 0):
             #we need this special except above because when 'averaged' is set
             #    to either of those two conditions, a new column is created in
             #    the dataframe and it contains a different number of NaNs than
@@ -478,7 +790,7 @@ def daily_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
             pass #don't plot
             
         else:
-            if df[df.columns[1]][mintime:start].empty == True:
+            if counts.size(mintime, start) == 0:
                 #this little condition avoids printing the statement that
                 #    "2019-01-08 00:00 - 2019-01-08 00:00" has no data because, of
                 #    course, this is a single time so it has no length/data; this
@@ -486,7 +798,7 @@ def daily_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
                 #    exactly equal 1 day / 1440 minutes
                 pass
             
-            elif df[df.columns[1]][mintime:start].notna().any() == False:
+            elif counts.count(df.columns[1], mintime, start) == 0:
                 #tell the user this time frame was not plotted due to the absence of
                 #    any data
                 print("%s - %s not plotted --> No data" % (df.time[mintime], df.time[start]))
@@ -499,10 +811,11 @@ def daily_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
                 #increase the plotting counter by 1
                 plotted_count +=  1
                 
-                #call the default plotter function here; this also sets up the
-                #    universal plotting parameters AND saves the figures all in one
-                plotter(sensor, save_dir, site_ID, var_name, units, averaged,
-                        avg_window, mintime, start, plot_opt, tag, df)
+                #make the figure for this time frame (or, with 'workers',
+                #    leave it for the processes to make at the end; see
+                #    '_Figures'), with the default plotter function
+                figures.append((sensor, save_dir, site_ID, var_name, units, averaged,
+                                avg_window, mintime, start, plot_opt, tag))
     
     #since data are recorded every minute, and there are 1440 minutes in 1 day,
     #    we set the range interval to 1440 (equivalent to 'every 1440th index');
@@ -524,7 +837,7 @@ def daily_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
     #######################
     #now, loop through the entire time frame set by the user with 1-week intervals
     #    making a week-long plot of the chosen variable for each iteration
-    for d in range(start,end,interval):
+    for d in calendar.days(start, end):
         
         #increase total counter by 1
         total_count += 1
@@ -548,7 +861,7 @@ def daily_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
         
         #skip the creation of plot if there are no data within the current 1-day
         #    period
-        if (averaged == True or averaged == "static") and (df[df.columns[2]][mintime:maxtime].notna().any() == False):
+        if (averaged == True or averaged == "static") and (counts.count(df.columns[2], mintime, maxtime) == 0):
             #we need this special except above because when 'averaged' is set
             #    to either of those two conditions, a new column is created in
             #    the dataframe and it contains a different number of NaNs than
@@ -561,7 +874,7 @@ def daily_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
         
         else:
             
-            if df[df.columns[1]][mintime:maxtime].empty == True:
+            if counts.size(mintime, maxtime) == 0:
                 #this little condition avoids printing the statement that
                 #    "2019-01-08 00:00 - 2019-01-08 00:00" has no data because, of
                 #    course, this is a single time so it has no length/data; this
@@ -569,7 +882,7 @@ def daily_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
                 #    exactly equal 1 day / 1440 minutes
                 pass
             
-            elif df[df.columns[1]][mintime:maxtime].notna().any() == False:
+            elif counts.count(df.columns[1], mintime, maxtime) == 0:
                 #tell the user this time frame was not plotted due to the absence of
                 #    any data
                 print("%s - %s not plotted --> No data" % (df.time[mintime], df.time[maxtime]))
@@ -582,11 +895,15 @@ def daily_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
                 #increase the plotting counter by 1
                 plotted_count +=  1
                 
-                #call the default plotter function here; this also sets up the
-                #    universal plotting parameters AND saves the figures all in one
-                plotter(sensor, save_dir, site_ID, var_name, units, averaged,
-                        avg_window, mintime, maxtime, plot_opt, tag, df)
-        
+                #make the figure for this time frame (or, with 'workers',
+                #    leave it for the processes to make at the end; see
+                #    '_Figures'), with the default plotter function
+                figures.append((sensor, save_dir, site_ID, var_name, units, averaged,
+                                avg_window, mintime, maxtime, plot_opt, tag))
+    
+    #make the figures left for 'workers' processes at once, if any
+    figures.finish()
+    
     return
 
 
@@ -598,7 +915,7 @@ def daily_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
 #to plot figures on a weekly basis within the user-defined time frame, call
 #    this function
 def weekly_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
-                   avg_window, mintime, maxtime, plot_opt, tag, df):
+                   avg_window, mintime, maxtime, plot_opt, tag, df, workers=1):
     
     #tell the user that the function was called
     print("------------------------------------------------------------------\n")
@@ -632,6 +949,11 @@ def weekly_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
     #      counted in the total count of weeks
     total_count = 0 #count for ALL weeks possible within the time frame
     plotted_count = 0 #count for all weeks that were plotted within the time frame
+    figures = _Figures(df, workers) #makes the figures (see '_Figures')
+    
+    #running totals of the valid data points, so that each time frame can be
+    #    checked for data without going through it (see 'valid_counts.py')
+    counts = ValidCounts(df)
     
     #store a list of dates/times that encompass weeks that were not plotted due to
     #    missing data
@@ -639,7 +961,7 @@ def weekly_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
     #######################
     #now, loop through the entire time frame set by the user with 1-week intervals
     #    making a week-long plot of the chosen variable for each iteration
-    for w in range(start,end,interval):
+    for w in CalendarIndex(df.time).periods(pd.Timedelta(weeks=1), start, end):
         
         #increase total counter by 1
         total_count += 1
@@ -663,14 +985,14 @@ def weekly_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
         
         #skip the creation of plot if there are no data within the current 7-day
         #    period
-        if df[df.columns[1]][mintime:maxtime].empty == True:
+        if counts.size(mintime, maxtime) == 0:
             #this little condition avoids printing the statement that
             #    "2019-01-08 00:00 - 2019-01-08 00:00" has no data because, of
             #    course, this is a single time so it has no length/data; this
             #    will only happen for datasets or given time frames that
             #    exactly equal 1 week / 7 days
             pass
-        elif df[df.columns[1]][mintime:maxtime].notna().any() == False:
+        elif counts.count(df.columns[1], mintime, maxtime) == 0:
             #tell the user this time frame was not plotted due to the absence of
             #    any data
             print("%s - %s not plotted --> No data" % (df.time[mintime], df.time[maxtime]))
@@ -683,11 +1005,15 @@ def weekly_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
             #increase the plotting counter by 1
             plotted_count +=  1
             
-            #call the default plotter function here; this also sets up the
-            #    universal plotting parameters AND saves the figures all in one
-            plotter(sensor, save_dir, site_ID, var_name, units, averaged,
-                    avg_window, mintime, maxtime, plot_opt, tag, df)
-        
+            #make the figure for this time frame (or, with 'workers',
+            #    leave it for the processes to make at the end; see
+            #    '_Figures'), with the default plotter function
+            figures.append((sensor, save_dir, site_ID, var_name, units, averaged,
+                            avg_window, mintime, maxtime, plot_opt, tag))
+    
+    #make the figures left for 'workers' processes at once, if any
+    figures.finish()
+    
     return
 
 
@@ -699,7 +1025,8 @@ def weekly_plotter(sensor, save_dir, site_ID, var_name, units, averaged,
 #to plot figures on a monthly basis within the user-defined time frame, call
 #    this function
 def monthly_plotter(sensor, save_dir, site_ID, var_name,
-                    units, averaged, avg_window, mintime, maxtime, plot_opt, tag, df):
+                    units, averaged, avg_window, mintime, maxtime, plot_opt, tag, df,
+                    workers=1):
     
     #tell the user that the function was called
     print("------------------------------------------------------------------\n")
@@ -715,15 +1042,16 @@ def monthly_plotter(sensor, save_dir, site_ID, var_name,
     #      days
     total_count = 0 #count for ALL months possible within the time frame
     plotted_count = 0 #count for all months that were plotted within the time frame
-
-    #this line will find the index of the very first day/time for each month in
-    #    the whole dataframe
-    day1_of_month_idx = df.index[df.set_index('time').index.day == 1][::1440]
+    figures = _Figures(df, workers) #makes the figures (see '_Figures')
     
+    #running totals of the valid data points, so that each time frame can be
+    #    checked for data without going through it (see 'valid_counts.py')
+    counts = ValidCounts(df)
+
     #this line will find the index(indices) of the very first day/time for each
-    #    month within the time frame set by the user (within 'mintime' and
-    #    'maxtime')
-    day1_of_month_idx = day1_of_month_idx[(day1_of_month_idx>mintime) & (day1_of_month_idx<maxtime)]
+    #    month within the time frame set by the user (after 'mintime' and
+    #    before 'maxtime'; see 'calendar_index.py')
+    day1_of_month_idx = pd.Index(CalendarIndex(df.time).months(mintime + 1, maxtime))
     
     #the starting index of the range over which to plot; this is the first
     #    index of 'day1_of_month_idx'; notice that if 'day1_of_month_idx' has
@@ -742,7 +1070,7 @@ def monthly_plotter(sensor, save_dir, site_ID, var_name,
         
         #skip the creation of plot if there are no data within the current 1-day
         #    period
-        if (averaged == True or averaged == "static") and (df[df.columns[2]][mintime:start].notna().any() == False):
+        if (averaged == True or averaged == "static") and (counts.count(df.columns[2], mintime, start) == 0):
             #we need this special except above because when 'averaged' is set
             #    to either of those two conditions, a new column is created in
             #    the dataframe and it contains a different number of NaNs than
@@ -754,7 +1082,7 @@ def monthly_plotter(sensor, save_dir, site_ID, var_name,
             pass #don't plot
             
         else:
-            if df[df.columns[1]][mintime:start].empty == True:
+            if counts.size(mintime, start) == 0:
                 #this little condition avoids printing the statement that
                 #    "2019-01-08 00:00 - 2019-01-08 00:00" has no data because, of
                 #    course, this is a single time so it has no length/data; this
@@ -762,7 +1090,7 @@ def monthly_plotter(sensor, save_dir, site_ID, var_name,
                 #    exactly equal 1 day / 1440 minutes
                 pass
             
-            elif df[df.columns[1]][mintime:start].notna().any() == False:
+            elif counts.count(df.columns[1], mintime, start) == 0:
                 #tell the user this time frame was not plotted due to the absence of
                 #    any data
                 print("%s - %s not plotted --> No data" % (df.time[mintime], df.time[start]))
@@ -775,10 +1103,11 @@ def monthly_plotter(sensor, save_dir, site_ID, var_name,
                 #increase the plotting counter by 1
                 plotted_count +=  1
                 
-                #call the default plotter function here; this also sets up the
-                #    universal plotting parameters AND saves the figures all in one
-                plotter(sensor, save_dir, site_ID, var_name, units, averaged,
-                        avg_window, mintime, start, plot_opt, tag, df)
+                #make the figure for this time frame (or, with 'workers',
+                #    leave it for the processes to make at the end; see
+                #    '_Figures'), with the default plotter function
+                figures.append((sensor, save_dir, site_ID, var_name, units, averaged,
+                                avg_window, mintime, start, plot_opt, tag))
                 
     #find the ending index of the range over which to plot; this will be the
     #    index of df.time that equals the 'maxtime' specified by the user; this,
@@ -820,7 +1149,7 @@ def monthly_plotter(sensor, save_dir, site_ID, var_name,
         
         #skip the creation of plot if there are no data within the current 1-day
         #    period
-        if (averaged == True or averaged == "static") and (df[df.columns[2]][mintime:maxtime].notna().any() == False):
+        if (averaged == True or averaged == "static") and (counts.count(df.columns[2], mintime, maxtime) == 0):
             #we need this special except above because when 'averaged' is set
             #    to either of those two conditions, a new column is created in
             #    the dataframe and it contains a different number of NaNs than
@@ -833,7 +1162,7 @@ def monthly_plotter(sensor, save_dir, site_ID, var_name,
         
         else:
             
-            if df[df.columns[1]][mintime:maxtime].empty == True:
+            if counts.size(mintime, maxtime) == 0:
                 #this little condition avoids printing the statement that
                 #    "2019-01-08 00:00 - 2019-01-08 00:00" has no data because, of
                 #    course, this is a single time so it has no length/data; this
@@ -841,7 +1170,7 @@ def monthly_plotter(sensor, save_dir, site_ID, var_name,
                 #    exactly equal 1 day / 1440 minutes
                 pass
             
-            elif df[df.columns[1]][mintime:maxtime].notna().any() == False:
+            elif counts.count(df.columns[1], mintime, maxtime) == 0:
                 #tell the user this time frame was not plotted due to the absence of
                 #    any data
                 print("%s - %s not plotted --> No data" % (df.time[mintime], df.time[maxtime]))
@@ -854,11 +1183,15 @@ def monthly_plotter(sensor, save_dir, site_ID, var_name,
                 #increase the plotting counter by 1
                 plotted_count +=  1
                 
-                #call the default plotter function here; this also sets up the
-                #    universal plotting parameters AND saves the figures all in one
-                plotter(sensor, save_dir, site_ID, var_name, units, averaged,
-                        avg_window, mintime, maxtime, plot_opt, tag, df)
-        
+                #make the figure for this time frame (or, with 'workers',
+                #    leave it for the processes to make at the end; see
+                #    '_Figures'), with the default plotter function
+                figures.append((sensor, save_dir, site_ID, var_name, units, averaged,
+                                avg_window, mintime, maxtime, plot_opt, tag))
+    
+    #make the figures left for 'workers' processes at once, if any
+    figures.finish()
+    
     return
 
 ''' From here, you will want to use the indices in that list as the starting
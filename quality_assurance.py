@@ -5,199 +5,266 @@ Created on Thu Dec 10 15:20:44 2020
 
 @author: blund
 """
+###############################################################################
+'''
+           _____   _____     _     ____        ___    ___   _____
+           |    \  |        / \    |   \       |  \  /  |   |
+           |____/  |__     /___\   |    |      |   \/   |   |__
+           | \     |      /     \  |    |      |        |   |
+           |  \    |____ /       \ |___/       |        |   |____
+'''
+
+#This code performs quality assurance (QA) tests on the data from the
+#    UCAR/NCAR COMET 3D-PAWS sensors as returned by the reader functions.
+#
+#Written by Brianna Lund
+#
+#QUESTIONS?
+#Email me at blund@ucar.edu
+#
+#LICENSE:
+#This code may be used and distributed freely, provided proper attribution is
+#    given to UCAR and the author.
+#
+#
+#REQUIREMENTS:
+#    Python 3
+#    Numpy
+#    Pandas
+#
+#
+#HISTORY:
+#    Dec 10, 2020 - First Write
+#    Oct 16, 2026 - Limits test completed (table-driven, flags packed into bits)
+#    Oct 16, 2026 - Temporal consistency (step and persistence) test
+#    Oct 16, 2026 - Internal consistency test between sensors
+#
+#
+#PLANNED FEATURES:
+#
+#
+#HOW TO USE:
+#    1. Save this file/program in the same directory as the parent program you
+#       will use this function in conjunction with
+#    2. Import this function in the parent program (no need for file
+#       extensions):
+#
+#       a) from quality_assurance import limits_test
+#       ... or...
+#       b) import quality_assurance as QA
+#
+#    3. Call the function in the parent program, ensuring that you pass the
+#       appropriate attributes/parameters ('units' only matters for the
+#       anemometer and the rain gauge):
+#
+#       a) flags = limits_test(sensor, df, units)
+#       ... or...
+#       b) flags = QA.limits_test(sensor, df, units)
+#
+#       To see which values of a variable were flagged (including variables
+#       computed from flagged variables, e.g. temp_F from temp_C):
+#
+#       QA.flagged(flags, sensor, var_name)
+#
+#       For the step (rate-of-change) and persistence (flat-line) tests, on
+#       the whole dataframe or piece by piece (passing the same 'state'
+#       dictionary with each piece, in order):
+#
+#       step_flags, persistence_flags = QA.temporal_test(sensor, df, units)
+#       step_flags, persistence_flags = QA.temporal_test(sensor, piece, units, state)
+#
+#       To compare the temperature of the BMP, HTU21D and MCP9808 sensors of a
+#       station (the dataframes as returned by the reader functions):
+#
+#       ic, ic_flags = QA.IC_test({'bmp280': df_bmp, 'htu21d': df_htu,
+#                                  'mcp9808': df_mcp}, "temp_C")
+#
+#
+#NOTES: The limits test does not add any columns to the dataframe. It returns
+#       one flag per row (uint8; uint16 for sensors with more than 8 tested
+#       variables), with one bit per measured variable in the order of
+#       '_limits' below: the bit is 1 where the value is outside the sensor's
+#       specifications. Missing values (NaNs) are not flagged.
+
+
+
+##############################################################################
+#########################    IMPORTING MODULES    ############################
+##############################################################################
+
+import numpy as np
+import pandas as pd
+from itertools import combinations
+
+
 
 ##############################################################################
 ##############################   LIMITS TEST   ###############################
 ##############################################################################
 
-def limits_test(sensor, mintime, maxtime, df):
-
-    #performing simple limits test on the data to verify that measurements are
-    #    within the sensor's specifications according to the sensor's manual
-    
-    'are the bmp specs different between the different models?'
-    #these are taken from the sensor manuals themselves
-    #bmp specs
-    bmp_t_min = -40.  # deg C
-    bmp_t_max = 85.   # deg C
-    bmp_p_min = 300.  # hPa
-    bmp_p_max = 1100. # hPa
-    bmp_a_min = -500. # meters
-    bmp_a_max = 9000. # meters
-    bmp_rh_min = 0.   # %
-    bmp_rh_max = 100. # %
-    
-    #htu21D specs
-    htu_t_min = -40.  # deg C
-    htu_t_max = 125.  # deg C
-    htu_rh_min = 0.   # %
-    htu_rh_max = 100. # %
-    
-    #mcp9808 specs
-    mcp_t_min = -40.  # deg C
-    mcp_t_max = 125.  # deg C
-    
-    #si1145 specs
-    si_min = 0.       # W m^-2
-    si_max = 1000.    # W m^-2
-    
-    #tipping bucket specs
-    tb_min = 0.       # mm
-    tb_max = 100.     # mm
-    
-    #anemometer specs
-    ws_min = 0.       # m/s
-    ws_max = 50.      # m/s
-    
-    #wind vane specs
-    wd_min = 0.       # deg
-    wd_max = 360.     # deg
-    
-    
-    ############################### BMP Sensor ###############################
-
-    if sensor.lower() == "bmp180" or sensor.lower() == "bmp280":
-        #create a new column for each meausure variable (temp_C, station_P and
-        #    alt) filled with 0s and 1s; 0s where values are within spec, and
-        #    1s where values are out of spec
-        
-        #if either or both T and P our out of spec, then all the subsequent
-        #    variables calculated from them are also out of spec and must be
-        #    flagged at the very least, discarded if necessary
-        #temp_F need only be flagged if temp_C is flagged
-        #SLP_hPa and SLP_inHg must be flagged if ANY measured value is out of
-        #    spec (temp_C, altitude, or pressure)
-        #altitude must be flagged if "" and/or "" is flagged
-        
-        #generate separate arrays of zeros the same length as the dataframe;
-        #    these will each serve as the columns of flags in the dataframe for
-        #    their respective measured variables
-        t_LC = np.zeros(len(df)) # temperature
-        p_LC = t_LC              # pressure
-        a_LC = t_LC              # altitude
-        
-        #find the indices in the dataframe for each measured variable such that
-        #    the value is outside the specifications for the given variable
-        t_idx = df.index[(df.temp_C <= bmp_t_min) & (df.temp_C >= bmp_t_max)]
-        p_idx = df.index[(df.station_P <= bmp_p_min) & (df.station_P >= bmp_p_max)]
-        a_idx = df.index[(df.alt <= bmp_a_min) & (df.alt >= bmp_a_max)]
-        
-        #for the indices in the dataframe of values that are outside the
-        #    specifications, change the values at the same indices in the zero
-        #    arrays to ones (these indicate the values out of range)
-        t_LC[t_idx] = 1
-        p_LC[p_idx] = 1
-        a_LC[a_idx] = 1
-        
-        #add new columns in the dataframe indicating with 1s where the
-        #    temperature, pressure, altitude, and relative humidity (for BME
-        #    only) records are flagged for exceeding the limits test, 0s for
-        #    the opposite
-        df.insert(3,"t_LC",t_LC)
-        df.insert(5,"p_LC",p_LC)
-        df.insert(9,"a_LC",a_LC)
-    
-    
-    ############################# HTU21D Sensor ##############################
-    
-    if sensor.lower() == "htu21d":
-    
-        #temp_F must be flagged only if temp_C is flagged
-    
-        #generate separate arrays of zeros the same length as the dataframe;
-        #    these will each serve as the columns of flags in the dataframe for
-        #    their respective measured variables
-        t_LC = np.zeros(len(df)) # temperature
-        rh_LC = t_LC             # relative humidity
-        
-        #find the indices in the dataframe for each measured variable such that
-        #    the value is outside the specifications for the given variable
-        t_idx = df.index[(df.temp_C <= htu_t_min) & (df.temp_C >= htu_t_max)]
-        rh_idx = df.index[(df.rel_hum <= htu_rh_min) & (df.rel_hum >= htu_rh_max)]
-        
-        #for the indices in the dataframe of values that are outside the
-        #    specifications, change the values at the same indices in the zero
-        #    arrays to ones (these indicate the values out of range)
-        t_LC[t_idx] = 1
-        rh_LC[rh_idx] = 1
-        
-        #add new columns in the dataframe indicating with 1s where the
-        #    temperature, pressure, altitude, and relative humidity (for BME
-        #    only) records are flagged for exceeding the limits test, 0s for
-        #    the opposite
-        df.insert(3,"t_LC",t_LC)
-        df.insert(5,"rh_LC",rh_LC)
-    
-    
-    ############################# MCP9808 Sensor #############################
-    
-    if sensor.lower() == "mcp9808":
-    
-        #temp_F must be flagged only if temp_C is flagged
-        
-        #generate separate arrays of zeros the same length as the dataframe;
-        #    these will each serve as the columns of flags in the dataframe for
-        #    their respective measured variables
-        t_LC = np.zeros(len(df)) # temperature
-        
-        #find the indices in the dataframe for each measured variable such that
-        #    the value is outside the specifications for the given variable
-        t_idx = df.index[(df.temp_C <= mcp_t_min) & (df.temp_C >= mcp_t_max)]
-        
-        #for the indices in the dataframe of values that are outside the
-        #    specifications, change the values at the same indices in the zero
-        #    arrays to ones (these indicate the values out of range)
-        t_LC[t_idx] = 1
-        
-        #add new columns in the dataframe indicating with 1s where the
-        #    temperature, pressure, altitude, and relative humidity (for BME
-        #    only) records are flagged for exceeding the limits test, 0s for
-        #    the opposite
-        df.insert(3,"t_LC",t_LC)
-    
-    
-    ############################# SI1145 Sensor ##############################
-    
-    if sensor.lower() == "si1145":
-    
-    #
-    
-    
-    ############################### Anemometer ###############################
-    
-    if sensor.lower() == "anemometer":
-    
-    #
-    
-    
-    ############################### Wind Vane ################################
-    
-    if sensor.lower() == "wind_vane":
-    
-    #
-    
-    
-    ############################ Tipping Bucket ##############################
-    
-    if sensor.lower() == "rain":
-    
-    #
-    
-    
-    ##########################################################################
-    
+'are the bmp specs different between the different models?'
+#the sensor specifications, taken from the sensor manuals themselves; one row
+#    per measured variable of each sensor: (variable, min, max, kind of units)
+#    with the limits in metric units (deg C, hPa, meters, %, W m^-2, mm, m/s,
+#    deg); each variable gets its own bit in the flags, in this order
+_limits = {
+    'bmp':        [('temp_C', -40., 85., ""),
+                   ('station_P', 300., 1100., ""),
+                   ('alt', -500., 9000., "")],
+    'htu21d':     [('temp_C', -40., 125., ""),
+                   ('rel_hum', 0., 100., "")],
+    'mcp9808':    [('temp_C', -40., 125., "")],
+    'si1145':     [('vis', 0., 1000., ""),
+                   ('ir', 0., 1000., ""),
+                   ('uv', 0., 1000., "")],
+    'rain':       [('rain', 0., 100., "rain")],
+    'anemometer': [('wind_speed', 0., 50., "wind")],
+    'wind_vane':  [('wind_dir', 0., 360., "")],
+    }
+
+#the variables computed from the measured variables; these are flagged
+#    wherever any of the variables they are computed from is flagged
+#    (e.g. temp_F need only be flagged if temp_C is flagged; SLP must be
+#    flagged if ANY measured value is out of spec)
+_derived = {
+    'bmp':        {'temp_F': ('temp_C',),
+                   'SLP_hPa': ('temp_C', 'station_P', 'alt'),
+                   'SLP_inHg': ('temp_C', 'station_P', 'alt')},
+    'htu21d':     {'temp_F': ('temp_C',)},
+    'mcp9808':    {'temp_F': ('temp_C',)},
+    'rain':       {'no_rain': ('rain',)},
+    'anemometer': {'windspd_avg': ('wind_speed',)},
+    }
+
+#the factors by which the reader functions convert the metric units into the
+#    units chosen by the user
+_unit_factors = {'rain': {'mm': 1., 'inches': 1. / 25.4},
+                 'wind': {'mps': 1., 'kmph': 3.6, 'mph': 2.23694, 'kts': 1.94384}}
+
+
+#pack the results of each row (one column per variable, True where flagged)
+#    into the bits of one number, the first variable in the lowest bit
+def _pack(flagged):
+    packed = np.packbits(flagged, axis=1, bitorder='little')
+    if flagged.shape[1] <= 8:
+        return packed[:, 0]
+    return np.ascontiguousarray(packed[:, :2]).view('<u2')[:, 0]
+
+
+#the key of 'sensor' in '_limits' (both BMP models share the same specs)
+def _sensor_key(sensor):
+    sensor = sensor.lower()
+    if sensor == "bmp180" or sensor == "bmp280":
+        return "bmp"
+    return sensor
+
+
+#performing simple limits test on the data to verify that measurements are
+#    within the sensor's specifications according to the sensor's manual;
+#    returns the flags of each row (see NOTES)
+def limits_test(sensor, df, units=""):
+
+    limits = _limits[_sensor_key(sensor)]
+
+    #the lower and upper limits of each variable, in the units of the data
+    lower = np.array([lo for var, lo, hi, kind in limits])
+    upper = np.array([hi for var, lo, hi, kind in limits])
+    for i, (var, lo, hi, kind) in enumerate(limits):
+        if kind != "":
+            lower[i] *= _unit_factors[kind][units]
+            upper[i] *= _unit_factors[kind][units]
+
+    #test every variable at once: one column per variable, True where the
+    #    value is outside the specifications (NaNs compare False)
+    values = df[[var for var, lo, hi, kind in limits]].to_numpy(dtype=float)
+    out_of_spec = (values < lower) | (values > upper)
+
+    flags = _pack(out_of_spec)
+
+    #tell the user how many values of each variable were flagged
+    num_flagged = out_of_spec.sum(axis=0)
+    for i, (var, lo, hi, kind) in enumerate(limits):
+        print("%s %s values are outside the sensor specifications (%s to %s).\n" %
+              (num_flagged[i], var, lower[i], upper[i]))
+
     print("------------------------------------------------------------------")
-    
-    #
-    # return df
-    
-    
+
+    return flags
+
+
+#True where 'var_name' of 'sensor' was flagged, given the flags returned by
+#    'limits_test' (or either of the flags returned by 'temporal_test')
+def flagged(flags, sensor, var_name):
+    key = _sensor_key(sensor)
+    variables = [var for var, lo, hi, kind in _limits[key]]
+
+    #the bits of the variable itself, or of the variables it is computed from
+    mask = 0
+    for var in _derived.get(key, {}).get(var_name, (var_name,)):
+        mask |= 1 << variables.index(var)
+
+    return (flags & mask) != 0
+
+
 
 ##############################################################################
 #######################   INTERNAL CONSISTENCY TEST   ########################
 ##############################################################################
 
-def IC_test(sensor, mintime, maxtime, df):
+#the values of 'var_name' in 'df' from time 'start' for 'n' minutes; a view
+#    of the data (no copy) when 'df' is on a complete 1-minute grid, as
+#    returned by the reader functions
+def _aligned(df, var_name, start, n):
+    first = df.time.iloc[0]
+    values = df[var_name].to_numpy(dtype=float)
+    if len(df) == (df.time.iloc[-1] - first) // pd.Timedelta(minutes=1) + 1:
+        offset = (start - first) // pd.Timedelta(minutes=1)
+        return values[offset:offset + n]
+    grid = pd.date_range(start=start, periods=n, freq='min')
+    return df.set_index('time')[var_name].reindex(grid).to_numpy(dtype=float)
+
+
+#comparing the same variable (e.g. temperature) measured by several sensors
+#    at the same station, over the time they were all reporting; 'frames' is
+#    a dictionary of the dataframes returned by the reader functions, keyed
+#    by sensor name, e.g. {'bmp280': df_bmp, 'htu21d': df_htu,
+#    'mcp9808': df_mcp}. For each pair of sensors, returns the running
+#    (centered, 'window' minutes) mean and standard deviation of their
+#    difference (first minus second sensor; float32 to keep years of data
+#    small), and flags with one bit per pair (in the order of the columns)
+#    where the two sensors differ by more than 'max_diff'. NaNs are never
+#    flagged; the running statistics need at least half of the window
+def IC_test(frames, var_name="temp_C", max_diff=2., window=60):
+
+    #the time during which every sensor was reporting
+    start = max(df.time.iloc[0] for df in frames.values())
+    end = min(df.time.iloc[-1] for df in frames.values())
+    if start > end:
+        raise ValueError("The sensors have no time in common.")
+    n = (end - start) // pd.Timedelta(minutes=1) + 1
+
+    #the data of each sensor over that time, lined up minute by minute
+    values = {sensor: _aligned(df, var_name, start, n) for sensor, df in frames.items()}
+
+    ic = {'time': pd.date_range(start=start, periods=n, freq='min')}
+    disagree = np.zeros((n, len(values) * (len(values) - 1) // 2), dtype=bool)
+    for i, (a, b) in enumerate(combinations(values, 2)):
+        diff = pd.Series(values[a] - values[b])
+
+        #pairs of sensors that disagree (NaNs compare False)
+        disagree[:, i] = np.abs(diff.to_numpy()) > max_diff
+
+        #running bias between the two sensors
+        rolling = diff.rolling(window, center=True, min_periods=window // 2)
+        ic["%s-%s_bias" % (a, b)] = rolling.mean().to_numpy(dtype=np.float32)
+        ic["%s-%s_std" % (a, b)] = rolling.std().to_numpy(dtype=np.float32)
+
+        print("%s and %s disagree by more than %s in %s of %s minutes.\n" %
+              (a, b, max_diff, disagree[:, i].sum(), n))
+
+    print("------------------------------------------------------------------")
+
+    return pd.DataFrame(ic), _pack(disagree)
 
 
 
@@ -205,15 +272,83 @@ def IC_test(sensor, mintime, maxtime, df):
 #######################   TEMPORAL CONSISTENCY TEST   ########################
 ##############################################################################
 
-def temporal_test(sensor, mintime, maxtime, df):
+#the largest change from one minute to the next that is still believable
+#    ('max_step', in the same metric units as '_limits') and the number of
+#    minutes after which a value that has not changed at all is suspicious
+#    ('persistence', e.g. a stuck anemometer); None where a variable is not
+#    tested. Same variables, in the same order, as in '_limits'
+_temporal = {
+    'bmp':        [('temp_C', 3., 120, ""),
+                   ('station_P', 1., 120, ""),
+                   ('alt', 10., 120, "")],
+    'htu21d':     [('temp_C', 3., 120, ""),
+                   ('rel_hum', 10., 360, "")],
+    'mcp9808':    [('temp_C', 3., 120, "")],
+    'si1145':     [('vis', None, None, ""),    #dark all night; clouds
+                   ('ir', None, None, ""),     #    make real jumps
+                   ('uv', None, None, "")],
+    'rain':       [('rain', None, None, "rain")],
+    'anemometer': [('wind_speed', 20., 720, "wind")],
+    'wind_vane':  [('wind_dir', None, 720, "")],
+    }
 
 
-   
-if __name__ == "__main__":
-    limits_test()
+#performing step (rate-of-change) and persistence (flat-line) tests on the
+#    gap-filled 1-minute data; returns the step flags and the persistence
+#    flags of each row, in the same form as the flags of 'limits_test'.
+#    A value is step-flagged if it changed by more than 'max_step' since the
+#    minute before (so a spike, e.g. from a duplicated timestamp, flags the
+#    spike and the value following it), and persistence-flagged once it has
+#    not changed for 'persistence' minutes. NaNs are never flagged and break
+#    both tests.
+#To test data that arrive in pieces (e.g. one file per day), pass the same
+#    dictionary as 'state' with each piece in order; the last value of each
+#    variable and how long it had not changed are carried over in it, so the
+#    flags are the same as if all pieces were tested at once
+def temporal_test(sensor, df, units="", state=None):
 
+    tests = _temporal[_sensor_key(sensor)]
+    if state is None:
+        state = {}
 
+    #the limits of each variable, in the units of the data; variables that
+    #    are not tested can never be flagged
+    max_step = np.array([np.inf if step is None else step for var, step, persist, kind in tests])
+    persistence = np.array([np.inf if persist is None else persist for var, step, persist, kind in tests])
+    for i, (var, step, persist, kind) in enumerate(tests):
+        if kind != "":
+            max_step[i] *= _unit_factors[kind][units]
 
+    values = df[[var for var, step, persist, kind in tests]].to_numpy(dtype=float)
 
+    #the value of each variable in the minute before each row (the last value
+    #    of the previous piece, if any, for the first row)
+    last = state.get('last', np.full(len(tests), np.nan))
+    change = np.abs(np.diff(np.vstack((last, values)), axis=0))
 
+    #step test (NaNs compare False)
+    step_flagged = change > max_step
+
+    #persistence test: the number of minutes each value has not changed for;
+    #    count from the row after the last change, or from before this piece
+    #    if there was no change yet
+    rows = np.arange(1, len(values) + 1)[:, np.newaxis]
+    last_change = np.maximum.accumulate(np.where(change == 0, 0, rows), axis=0)
+    unchanged = rows - last_change + np.where(last_change == 0, state.get('unchanged', 0), 0)
+    persistence_flagged = unchanged >= persistence
+
+    #carry over the last value and how long it had not changed
+    if len(values) > 0:
+        state['last'] = values[-1]
+        state['unchanged'] = unchanged[-1]
+
+    #tell the user how many values of each variable were flagged
+    num_step = step_flagged.sum(axis=0)
+    num_persistence = persistence_flagged.sum(axis=0)
+    for i, (var, step, persist, kind) in enumerate(tests):
+        print("%s %s values failed the step test and %s the persistence test.\n" %
+              (num_step[i], var, num_persistence[i]))
+
+    print("------------------------------------------------------------------")
 
+    return _pack(step_flagged), _pack(persistence_flagged)
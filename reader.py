@@ -35,6 +35,9 @@ Created on Thu Nov 12 17:12:49 2020
 #    Glob
 #    Pandas
 #    Sys
+#    Multiprocessing (only used when reading with more than one worker)
+#    Mmap
+#    Gzip, Lzma, Zipfile (only used when reading compressed data files)
 #
 #
 #History:
@@ -63,6 +66,43 @@ Created on Thu Nov 12 17:12:49 2020
 #       ... or...
 #       b) call_bmp = reader.bmp(directory, var_name, wildcard)
 #
+#       To only read in the data within a certain time frame, also pass
+#       'mintime' and 'maxtime' ("YYYY-MM-DD HH:mm"; empty strings for the
+#       beginning/end of the dataset):
+#
+#       c) call_bmp = reader.bmp(directory, wildcard, mintime, maxtime)
+#
+#       To keep a cache of the parsed data files (see 'data_cache.py'), also
+#       pass the directory in which to keep the cache:
+#
+#       d) call_bmp = reader.bmp(directory, wildcard, mintime, maxtime, cache_dir)
+#
+#       To only read in the files added since the last run and merge them into
+#       the data processed on that run (see INCREMENTAL PROCESSING), also pass
+#       the file in which to keep the processed data between runs:
+#
+#       e) call_bmp = reader.bmp(directory, wildcard, "", "", cache_dir, state_file)
+#
+#       To read in the data files with several processes at once, also pass
+#       the number of processes ('workers'; 1 reads them one at a time):
+#
+#       f) call_bmp = reader.bmp(directory, wildcard, mintime, maxtime, cache_dir,
+#                                state_file, workers)
+#
+#       To read in a large archive one month (or 'period') at a time, with
+#       only about that much data in memory at once (see STREAMING):
+#
+#       g) for df, missing_reports, events in reader.read_blocks(reader.bmp,
+#                                                                directory, wildcard):
+#              ...use each block of data here...
+#
+#       To keep the dataframe small in memory (32-bit floats, and no columns
+#       that only repeat another column in other units; see COMPACT DATA),
+#       also pass 'compact':
+#
+#       h) call_bmp = reader.bmp(directory, wildcard, mintime, maxtime, cache_dir,
+#                                state_file, workers, compact=True)
+#
 #    4. Run the parent program with in terminal (e.g. "python 3D_main.py"),
 #       or open the parent program in Spyder and run from there.
 #
@@ -78,8 +118,21 @@ Created on Thu Nov 12 17:12:49 2020
 #       file/function. All parameters/attributes required to use this function
 #       should be specified in the parent program.
 # ----------------------------------------------------------------------------
-#       At the moment, this program reads in all data even if a subset of time
-#       is requested for plotting, which is a bit of an overkill
+#       When 'mintime' and/or 'maxtime' are given, only the files that may
+#       contain data within that time frame are read in (based on the date in
+#       the file name, or the first and last lines of files without one) and
+#       any data outside the time frame are dropped before pre-processing
+# ----------------------------------------------------------------------------
+#       Each reader function returns the dataframe, the times of the missing
+#       reports, and a dictionary holding the times at which time reset
+#       ('time_resets') and the duplicated timestamps ('duplicates') found
+#       during pre-processing (for the availability report in 'output.py')
+# ----------------------------------------------------------------------------
+#       Data files compressed with gzip (.gz) or xz (.xz), and zip files (.zip)
+#       holding any number of data files (e.g. a month of daily files), are
+#       read in just like the plain data files, as long as 'wildcard' matches
+#       them (e.g. "*.gz"); with more than one worker, the files are
+#       decompressed in parallel
 
 
 
@@ -91,6 +144,16 @@ import numpy as np
 import glob
 import pandas as pd
 import sys
+import os
+import re
+import mmap
+import gzip
+import lzma
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import data_cache
 
 
 
@@ -98,10 +161,276 @@ import sys
 ########################    UNIVERSAL VARIABLES    ###########################
 ##############################################################################
 
-#Initializing the lists that will store the data from each file for each
-#    variable; only variables associated with the sensor that is being called
-#    will be filled
+#The column layouts of the data files for each sensor. The keys are the number
+#    of whitespace-separated columns a valid data line must have, and the
+#    values map each variable name to the position of that variable within the
+#    line. Any line whose number of columns does not match one of the keys is
+#    skipped; these are likely partially overwritten lines or the last line in
+#    a file that did not record to 23:59 UTC and contains erroneous characters
+#    (\@\@\@\@\@\@\)
+_bmp_columns = {11: {'month':0, 'day':1, 'year':2, 'hour':3, 'minute':4,
+                     'temp_C':5, 'temp_F':6, 'station_P':7, 'SLP_hPa':8,
+                     'SLP_inHg':9, 'alt':10}}
+
+_htu21d_columns = {8: {'month':0, 'day':1, 'year':2, 'hour':3, 'minute':4,
+                       'temp_C':5, 'temp_F':6, 'rel_hum':7}}
 
+_mcp9808_columns = {7: {'month':0, 'day':1, 'year':2, 'hour':3, 'minute':4,
+                        'temp_C':5, 'temp_F':6}}
+
+_si1145_columns = {9: {'month':0, 'day':1, 'year':2, 'hour':3, 'minute':4,
+                       'vis':5, 'ir':6, 'uv':7, 'uvi':8}}
+
+#some rain gauge and anemometer data do NOT record time to the second
+_rain_columns = {7: {'month':0, 'day':1, 'year':2, 'hour':3, 'minute':4,
+                     'second':5, 'rain':6},
+                 6: {'month':0, 'day':1, 'year':2, 'hour':3, 'minute':4,
+                     'rain':5}}
+
+_wind_vane_columns = {9: {'month':0, 'day':1, 'year':2, 'hour':3, 'minute':4,
+                          'second':5, 'wind_dir':7},
+                      8: {'month':0, 'day':1, 'year':2, 'hour':3, 'minute':4,
+                          'second':5, 'wind_dir':7}}
+
+_anemometer_columns = {7: {'month':0, 'day':1, 'year':2, 'hour':3, 'minute':4,
+                           'second':5, 'wind_speed':6},
+                       6: {'month':0, 'day':1, 'year':2, 'hour':3, 'minute':4,
+                           'wind_speed':5}}
+
+
+
+##############################################################################
+###########################    PARSING ENGINE    #############################
+##############################################################################
+
+#the shared parsing engine used by every reader function below; rather than
+#    splitting each line into a list of strings and appending the elements to
+#    a dozen Python lists, the raw bytes of a file are scanned all at once with
+#    NumPy to find where each line and each column begin, and every number in
+#    the valid lines is converted to a float in a single call. The files are
+#    memory-mapped rather than read in, so the operating system pages the raw
+#    bytes in as they are scanned and no copy of the file is made. Compressed
+#    data files (see '_decompressors') are decompressed in memory and then
+#    parsed the same way
+
+#parse the raw bytes of ONE file ('buf', a NumPy array of uint8) into a 2-D
+#    array of floats with one row per valid line and one column per variable
+#    in 'fields'; variables that are not recorded for a given kind of line are
+#    NaN; also returns the number of lines that were skipped
+def _parse_buffer(buf, layouts, fields):
+
+    #an empty file has no lines at all, so there is nothing to skip
+    if len(buf) == 0:
+        return np.empty((0, len(fields))), 0
+
+    #find the whitespace (space, \t, \n, \v, \f, \r) characters and the
+    #    position of every newline character
+    whitespace = (buf == 32) | ((buf >= 9) & (buf <= 13))
+    newlines = np.flatnonzero(buf == 10)
+
+    #the number of bytes on each line, including its newline character; the
+    #    last line counts even if it does not end with a newline character (as
+    #    when iterating over the file)
+    line_ends = newlines + 1
+    if buf[-1] != 10:
+        line_ends = np.append(line_ends, len(buf))
+    line_lengths = np.diff(line_ends, prepend=0)
+    num_lines = len(line_ends)
+
+    #the first character of every column is a non-whitespace character that
+    #    is either the first character of the file or follows whitespace
+    starts = np.flatnonzero(~whitespace & np.concatenate(([True], whitespace[:-1])))
+
+    #the number of columns on each line of the file (the number of columns
+    #    that begin before the end of each line, less those on the lines
+    #    before it); blank lines have zero columns and, as before, are counted
+    #    as skipped lines
+    num_cols = np.diff(np.searchsorted(starts, line_ends), prepend=0)
+
+    #valid lines are those with one of the accepted numbers of columns
+    valid = np.isin(num_cols, list(layouts))
+    skipped = num_lines - int(valid.sum())
+
+    #convert every column of every valid line to a float in one go, straight
+    #    from the raw bytes; the skipped lines (if any) are masked out of the
+    #    raw bytes beforehand
+    if skipped > 0:
+        buf = buf[np.repeat(valid, line_lengths)]
+    #each number is read up to the first character that is not part of it,
+    #    so the bytes must not end in the middle of a number (as when the last
+    #    line does not end with a newline character); otherwise the reading
+    #    would run past the end of the bytes
+    if len(buf) > 0 and buf[-1] != 10:
+        buf = np.append(buf, np.uint8(10))
+    values = np.fromstring(buf, sep=' ')
+
+    #number of columns on each valid line and the position in 'values' of
+    #    each valid line's first column
+    row_cols = num_cols[valid]
+    row_start = np.cumsum(row_cols) - row_cols
+
+    #a column that is not a number (e.g. partially overwritten characters on
+    #    a line that still happens to have the right number of columns) will
+    #    throw the count off; fail just as converting the strings would have
+    if len(values) != row_cols.sum():
+        raise ValueError("Could not convert the data to floats. Check the data files for erroneous characters.")
+
+    #move each value into its row and column of the output array, one layout
+    #    (number of columns) at a time
+    block = np.full((len(row_cols), len(fields)), np.nan)
+    for ncols, layout in layouts.items():
+        rows = np.flatnonzero(row_cols == ncols)
+        for name, position in layout.items():
+            block[rows, fields.index(name)] = values[row_start[rows] + position]
+
+    return block, skipped
+
+
+#the compressed data files that are read in (by the extension of the file
+#    name) and the function that opens each kind for reading decompressed;
+#    a zip file may hold any number of data files (e.g. a month of daily
+#    files), which are read in the order of their names
+_decompressors = {'.gz': gzip.open, '.xz': lzma.open, '.zip': zipfile.ZipFile}
+
+
+#the raw bytes of ONE file (a NumPy array of uint8), decompressed if it is a
+#    compressed data file; plain files are mapped into memory (an empty file
+#    cannot be mapped) and the mapping stays open for as long as the array
+#    refers to it
+def _read_raw(file):
+    extension = os.path.splitext(file)[1].lower()
+
+    if extension == '.zip':
+        #each data file in the archive ends with a newline character so its
+        #    last line is not joined to the first line of the next
+        parts = []
+        with zipfile.ZipFile(file) as archive:
+            for name in sorted(archive.namelist()):
+                if name.endswith('/'): #a directory
+                    continue
+                data = archive.read(name)
+                parts.append(data if data[-1:] in (b'', b'\n') else data + b'\n')
+        return np.frombuffer(b''.join(parts), dtype=np.uint8)
+
+    if extension in _decompressors:
+        with _decompressors[extension](file, mode = "rb") as f:
+            return np.frombuffer(f.read(), dtype=np.uint8)
+
+    with open(file, mode = "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return np.empty(0, dtype=np.uint8)
+        return np.frombuffer(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ),
+                             dtype=np.uint8)
+
+
+#parse ONE file; if a cache directory is given, a cached copy of the parsed
+#    file is used when the file has not changed since it was cached, and newly
+#    parsed files are added to the cache
+def _parse_file(file, layouts, fields, cache_dir=""):
+
+    if cache_dir != "":
+        cached = data_cache.load(cache_dir, file, layouts)
+        if cached is not None:
+            return cached
+
+    #the size and modification time of the file as it is about to be read,
+    #    for the cache entry
+    if cache_dir != "":
+        stat = os.stat(file)
+
+    #the raw bytes of the whole file (decompressed, for a compressed file)
+    buf = _read_raw(file)
+
+    block, skipped = _parse_buffer(buf, layouts, fields)
+
+    if cache_dir != "":
+        data_cache.store(cache_dir, file, layouts, block, skipped, stat)
+
+    return block, skipped
+
+
+#parse every file in 'file_list' across a pool of 'workers' processes; returns
+#    the (block, skipped) result of each file in the order of 'file_list'.
+#    Each worker is handed a run of consecutive files at a time (a few runs
+#    per worker) so that the cost of passing work to the pool stays small
+#    compared to the cost of parsing. The processes are started the platform's
+#    default way (forked on Linux; spawned on macOS, where forking a process
+#    that may already run threads is unsafe, and on Windows); where they are
+#    spawned, the parent program must guard its code with
+#    'if __name__ == "__main__":' to use more than one worker
+def _parse_in_pool(file_list, layouts, fields, cache_dir, workers):
+    context = multiprocessing.get_context()
+
+    workers = min(workers, len(file_list))
+    chunksize = max(1, len(file_list) // (workers * 4))
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(_parse_file, file_list, repeat(layouts),
+                             repeat(fields), repeat(cache_dir),
+                             chunksize=chunksize))
+
+
+#the names of all variables found in any of the column layouts given by
+#    'layouts', in the order they appear in the data files
+def _layout_fields(layouts):
+    fields = []
+    for layout in layouts.values():
+        fields += [name for name in layout if name not in fields]
+    return fields
+
+
+#read in every file in 'file_list' with the column layout(s) given by
+#    'layouts' (one of the dictionaries in UNIVERSAL VARIABLES); returns a
+#    dictionary of NumPy arrays keyed by variable name, the number of lines
+#    skipped, and a list of the files that skipped lines came from (one entry
+#    per skipped line, as before)
+def _parse_files(file_list, layouts, cache_dir="", workers=1):
+
+    #the names of all variables found in any of the layouts
+    fields = _layout_fields(layouts)
+
+    blocks = [] #the parsed array for each file
+    counter = 0 #number of lines skipped
+    problem_files = [] #files with erroneous characters and partially
+                       #    overwritten lines
+
+    #parse the files one after another, or spread them across a pool of
+    #    'workers' processes; either way the results come back in the order of
+    #    'file_list', so the stacked data, the skipped-line count and
+    #    'problem_files' are exactly the same
+    if workers > 1 and len(file_list) > 1:
+        results = _parse_in_pool(file_list, layouts, fields, cache_dir, workers)
+    else:
+        results = (_parse_file(file, layouts, fields, cache_dir) for file in file_list)
+
+    for file, (block, skipped) in zip(file_list, results):
+        blocks.append(block)
+
+        #count the skipped lines and append the problematic filename to the
+        #    list once for every skipped line
+        counter += skipped
+        problem_files += [file] * skipped
+
+    #keep the cache within its size limit
+    if cache_dir != "":
+        data_cache.evict(cache_dir)
+
+    #stack the arrays from all files in the order the files were read in
+    if len(blocks) > 0:
+        data = np.concatenate(blocks)
+    else:
+        data = np.empty((0, len(fields)))
+
+    #split the stacked array into one array per variable; a variable that is
+    #    only recorded in some of the layouts (e.g. 'second') is left out
+    #    entirely if none of the lines read in recorded it
+    columns = {}
+    for i, name in enumerate(fields):
+        if all(name in layout for layout in layouts.values()) or \
+            np.isnan(data[:, i]).all() == False:
+            columns[name] = data[:, i]
+
+    return columns, counter, problem_files
 
 
 
@@ -111,24 +440,50 @@ import sys
 
 def timestamp_generator(year, month, day, hour, minute, second):
     
-    #create an array containing the dates/times using the arrays above
-    #initialize the empty list to store these timestamps
-    time = []
-    for i in range(len(month)): #the variable could be any of the time variables
-        #    (i.e. 'month', 'day', 'year', 'hour', 'minute') since each should be
-        #    the same length. This is to include every time from every file.
-        if len(second) > 0:
-            time.append('%s%s%s %s:%s:%s' % (year[i],month[i],day[i],hour[i],minute[i],second[i]))
-        else: #no 'seconds'
-            time.append('%s%s%s %s:%s' % (year[i],month[i],day[i],hour[i],minute[i]))
-        #the format above is one of many that pandas will accept
-    
-    #convert the 'time' list to pandas DatetimeIndex
-    #    NOTE: time is not reported to the second in these files, but the line the
-    #    below will output the date-time elements in HH:MM:SS format so the
-    #    assumption is that records are reported at the top of the minute, though
-    #    not explicitly true. (Can I change the output format?)
-    time = pd.to_datetime(time)
+    #build the timestamps with integer arithmetic on whole arrays rather than
+    #    formatting one date/time string per record and having pandas parse
+    #    (and guess the format of) every string
+    year = np.asarray(year, dtype=float).astype(np.int64)
+    month = np.asarray(month, dtype=float).astype(np.int64)
+    day = np.asarray(day, dtype=float).astype(np.int64)
+    hour = np.asarray(hour, dtype=float).astype(np.int64)
+    minute = np.asarray(minute, dtype=float).astype(np.int64)
+    
+    #time is not always recorded to the second; when it is not, records are
+    #    assumed to be reported at the top of the minute, though not explicitly
+    #    true. Lines missing the seconds in files that otherwise record them
+    #    (NaN) are treated the same way
+    if len(second) > 0:
+        second = np.nan_to_num(np.asarray(second, dtype=float))
+    else: #no 'seconds'
+        second = np.zeros(len(month))
+    
+    #reject impossible dates/times, just as pandas would have when parsing the
+    #    strings
+    days_in_month = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+    leap = ((year % 4 == 0) & (year % 100 != 0)) | (year % 400 == 0)
+    if ((month < 1) | (month > 12)).any():
+        raise ValueError("Month out of range in the data files. Check the data files for erroneous characters.")
+    if ((day < 1) | (day > days_in_month[month - 1] + (leap & (month == 2)))).any() or \
+        ((hour < 0) | (hour > 23)).any() or ((minute < 0) | (minute > 59)).any() or \
+            ((second < 0) | (second >= 60)).any():
+        raise ValueError("Day/time out of range in the data files. Check the data files for erroneous characters.")
+    
+    #number of days since 1970-01-01 for each date; this is the standard
+    #    "days from civil" algorithm, which treats March as the first month of
+    #    the year so that the leap day falls at the end of the year
+    y = year - (month <= 2)
+    era = np.floor_divide(y, 400)
+    yoe = y - era * 400                                  #year of era [0, 399]
+    doy = (153 * (month + np.where(month > 2, -3, 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy         #day of era
+    days = era * 146097 + doe - 719468
+    
+    #nanoseconds since 1970-01-01 00:00, then convert to a pandas
+    #    DatetimeIndex
+    ns = ((days * 24 + hour) * 60 + minute) * 60 * 10**9 + \
+        np.round(second * 10**9).astype(np.int64)
+    time = pd.DatetimeIndex(ns.astype('datetime64[ns]'))
     
     return time
 
@@ -145,13 +500,154 @@ def timestamp_generator(year, month, day, hour, minute, second):
 #    every occurrence of a half-minute to round up. The function(s) below does
 #    just that
 def half_up_minute(x):
-    m = (x - x.dt.floor('1T')).dt.total_seconds() < 30   # Round True Down, False Up
-    return x.where(m).dt.floor('1T').fillna(x.dt.ceil('1T'))
+    rounded = _half_up_minute_ns(x.to_numpy(dtype='datetime64[ns]').view(np.int64))
+    return pd.Series(rounded.view('datetime64[ns]'), index=x.index, name=x.name)
 
 # For indices:
 def half_up_minute_idx(idx):
-    m = (idx - idx.floor('1T')).total_seconds() < 30   # Round True Down, False Up
-    return pd.Index(np.select([m], [idx.floor('1T')], default=idx.ceil('1T')))
+    return pd.Index(_half_up_minute_ns(idx.asi8).view('datetime64[ns]'))
+
+#the rounding itself, on the timestamps as (int64) nanoseconds since
+#    1970-01-01: adding half a minute and flooring to the whole minute rounds
+#    every half-minute up, in a single pass; NaT (the smallest int64) is kept
+#    as NaT
+def _half_up_minute_ns(ns):
+    minute = 60 * 10**9
+    rounded = (ns + minute // 2) // minute * minute
+    return np.where(ns == np.iinfo(np.int64).min, ns, rounded)
+
+
+
+##############################################################################
+#############################    TIME WINDOW    ##############################
+##############################################################################
+
+#these functions let the reader functions load only the data within the time
+#    frame set by 'mintime' and 'maxtime' (in the same "YYYY-MM-DD HH:mm"
+#    format used in the parent program; empty strings mean the beginning or
+#    end of the dataset) instead of reading in the whole archive
+
+#convert 'mintime' and 'maxtime' to pandas Timestamps; None where they are
+#    empty strings (i.e. no limit on that end of the time frame)
+def _window_bounds(mintime, maxtime):
+    start = pd.to_datetime(mintime) if mintime != "" else None
+    end = pd.to_datetime(maxtime) if maxtime != "" else None
+    return start, end
+
+
+#find the date in a file's name (e.g. "bmp280_20200515.txt" or
+#    "2020-05-15_bmp280.log"); returns None if there is no (valid) date
+def _file_date(file):
+    match = re.search(r'(\d{4})[-_]?(\d{2})[-_]?(\d{2})', os.path.basename(file))
+    if match is None:
+        return None
+    try:
+        return pd.Timestamp(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    except ValueError:
+        return None
+
+
+#find the first and last timestamps of a file by parsing only the first and
+#    last few lines of it (a compressed file is decompressed as a whole);
+#    returns (None, None) if no valid lines were found
+def _probe_file(file, layouts, probe_size=4096):
+    fields = _layout_fields(layouts)
+    buf = _read_raw(file)
+    head = buf[:probe_size].tobytes()
+    tail = buf[max(len(buf) - probe_size, 0):].tobytes()
+
+    #only keep whole lines: drop the partial line at the end of the head and
+    #    at the beginning of the tail (unless the tail is the whole file)
+    if len(head) == probe_size:
+        head = head[:head.rfind(b'\n') + 1]
+    if len(tail) == probe_size:
+        tail = tail[tail.find(b'\n') + 1:]
+
+    block = np.concatenate([_parse_buffer(np.frombuffer(b, dtype=np.uint8), layouts, fields)[0]
+                            for b in (head, tail)])
+    if len(block) == 0:
+        return None, None
+
+    columns = {name: block[:, i] for i, name in enumerate(fields)}
+    time = timestamp_generator(columns['year'], columns['month'],
+                               columns['day'], columns['hour'],
+                               columns['minute'], columns.get('second', []))
+    return time.min(), time.max()
+
+
+#the time range that the data of a file may cover; the date in the file name
+#    is used if there is one, otherwise the first and last lines of the file
+#    are read to find its time range. Returns (None, None) if it can't be told
+#NOTE: daily files are assumed to contain (mostly) that day's data; the range
+#      reaches one day either side of that day to account for records that
+#      spill over into the next/previous day
+def _file_span(file, layouts):
+    date = _file_date(file)
+    if date is not None:
+        return date - pd.Timedelta(days=1), date + pd.Timedelta(days=2)
+    return _probe_file(file, layouts)
+
+
+#whether a file whose data cover 'first' to 'last' (see '_file_span') may
+#    contain data within the time frame
+def _span_in_window(first, last, start, end):
+    if first is None: #can't tell; read the whole file
+        return True
+    return not ((start is not None and last < start - pd.Timedelta(seconds=30)) or
+                (end is not None and first >= end + pd.Timedelta(seconds=30)))
+
+
+#select the files from 'file_list' that may contain data within the time
+#    frame
+#NOTE: records whose time reset far into the past or future will be missed if
+#      their file is skipped, so use the full dataset for cataloguing time
+#      resets and duplicates
+def _files_in_window(file_list, layouts, start, end):
+    if start is None and end is None:
+        return file_list
+
+    _check_window(file_list, layouts, start, end)
+
+    return [file for file in file_list
+            if _span_in_window(*_file_span(file, layouts), start, end)]
+
+
+#exit if the time frame reaches outside the time spanned by the files in
+#    'file_list' (from the first lines of the first file to the last lines of
+#    the last file, rounded to the minute as in pre-processing); otherwise the
+#    1-minute grid would be filled with NaNs out to the edges of the time
+#    frame, however far away they are. The exit message is the same as
+#    'time_checker.py' gives when the whole dataset is read in, so that a
+#    caller that catches the exit (e.g. 'batch_main.py') can still report it
+def _check_window(file_list, layouts, start, end):
+    if len(file_list) == 0:
+        raise ValueError("No data. Program exiting. Check the directory path and/or the data files themselves.")
+    first = _probe_file(file_list[0], layouts)[0]
+    last = _probe_file(file_list[-1], layouts)[1]
+    if first is None or last is None: #can't tell
+        return
+    first, last = half_up_minute_idx(pd.DatetimeIndex([first, last]))
+
+    if (start is not None and (start < first or start > last)) or \
+        (end is not None and (end > last or end < first)):
+        #remind the user what their start/end time limits are
+        sys.exit("'mintime'/'maxtime' are outside the range of time.\n"
+                 "The minimum start time is %s.\n"
+                 "The maximum end time is %s.\n" % (str(first), str(last)))
+
+
+#drop the rows of 'df' that lie outside the time frame; timestamps within 30
+#    seconds of either end are kept since they will round to the first/last
+#    minute of the time frame during pre-processing
+def _rows_in_window(df, start, end):
+    keep = np.ones(len(df), dtype=bool)
+    if start is not None:
+        keep &= (df.time >= start - pd.Timedelta(seconds=30)).to_numpy()
+    if end is not None:
+        keep &= (df.time < end + pd.Timedelta(seconds=30)).to_numpy()
+    if keep.all():
+        return df
+    return df[keep].reset_index(drop=True)
 
 
 
@@ -159,7 +655,47 @@ def half_up_minute_idx(idx):
 ############################    PRE-PROCESSING    ############################
 ##############################################################################
 
-def pre_processing(df, second):
+#place the records of each dataframe in 'frames' (whose timestamps are whole
+#    minutes without duplicates) on the 1-minute grid from 'grid_start' to
+#    'grid_end'; minutes without a record are NaNs. Each record's row is
+#    simply its number of minutes since 'grid_start', so the data are copied
+#    straight into a grid filled with NaNs (one array for all of the data
+#    columns, which becomes the dataframe without another copy) rather than
+#    reindexing. Returns the filled dataframe and the rows of the records of
+#    each dataframe
+def _fill_grid(frames, grid_start, grid_end):
+    minute = np.timedelta64(1, 'm')
+    grid_start = np.datetime64(grid_start, 'ns')
+    grid = np.arange(grid_start, np.datetime64(grid_end, 'ns') + minute, minute)
+
+    columns = frames[0].columns[1:]
+    dtype = np.result_type(np.float32, *[f[col].dtype for f in frames for col in columns])
+    values = np.full((len(columns), len(grid)), np.nan, dtype=dtype)
+    rows = []
+    for f in frames:
+        f_rows = (f.time.to_numpy() - grid_start) // minute
+        for i, col in enumerate(columns):
+            values[i, f_rows] = f[col].to_numpy()
+        rows.append(f_rows)
+
+    df = pd.DataFrame(values.T, columns=columns, copy=False)
+    df.insert(0, 'time', grid)
+    return df, rows
+
+
+#'start' and 'end' are the edges of the time frame (pandas Timestamps) when
+#    only a subset of time was read in; the 1-minute grid then spans the whole
+#    time frame so that minutes without reports at either end of it count as
+#    missing reports
+#'state' is used for incremental processing (see INCREMENTAL PROCESSING
+#    below); an empty dictionary is filled in with the results of this run,
+#    while a dictionary from a previous run means 'df' only holds the newly
+#    read records, which are then merged into the previously processed data
+def pre_processing(df, second, start=None, end=None, state=None):
+    
+    #merge newly read records into the data processed on a previous run
+    if state is not None and 'df' in state:
+        return _merge_processed(df, second, state)
 
     #################### Collect out-of-order timestamps #####################
     
@@ -172,10 +708,11 @@ def pre_processing(df, second):
     #    number of minutes in the past
     #indices of times in the dataFrame where the difference between i+1 and i is
     #    negative (i.e. out of chronological order)
-    idx = np.where(df.time.diff() < pd.Timedelta(minutes=0))
+    raw_times = df.time.to_numpy(dtype='datetime64[ns]')
+    idx = np.flatnonzero(raw_times[1:] < raw_times[:-1]) + 1
     
     #list of actual times in the dataFrame according to the indices above
-    times_out_of_order = pd.to_datetime(np.array(df.time[pd.Index(idx[0])]))
+    times_out_of_order = pd.to_datetime(raw_times[idx])
     
     #the number of occurrences such that timestamps are out of chronological order
     num_out_of_order = len(times_out_of_order)
@@ -183,6 +720,16 @@ def pre_processing(df, second):
     #tell the user the absolute frequency of which timestamps are out of order
     print("Time reset %s times.\n" % num_out_of_order)
     
+    #the times at which time reset and the duplicated timestamps (below); these
+    #    are returned for the availability report (see 'output.py')
+    events = {'time_resets': times_out_of_order.to_numpy(),
+              'duplicates': np.array([], dtype='datetime64[ns]')}
+    
+    #the last timestamp as recorded (before any rounding); needed to catch a
+    #    time reset between this run and the next in incremental mode
+    if df.time.empty == False:
+        last_raw = df.time.iloc[-1]
+    
     
     ######################## Massaging the timestamps ########################
     
@@ -193,70 +740,76 @@ def pre_processing(df, second):
     
     ##########################################################################
     
-    '''No longer sorting the data here because I have found that some
+    '''Not sorting the data with Pandas here because I have found that some
     occurrences of data spikes are associated with the second occurrence of a
     duplicate timestamp, and sometimes Pandas' sorting method places the second
     (third, fourth, etc.) occurrence of duplicate timestamp(s) ahead of the
-    true first occurrence of said timestamp. The methods below keep the first
-    occurrence of a duplicate timestamp so by sorting the data later, we keep
-    the valid data value and remove the duplicate timestamp with the bad value'''
-    #sort rows chronologically by 'time' (aka. the index variable)
-    #df = df.set_index('time').sort_index().reset_index()
+    true first occurrence of said timestamp. The stable sort below keeps the
+    occurrences of a duplicated timestamp in the order they were read in, so
+    the first occurrence (the valid data value) is kept and the duplicates
+    with the bad values are removed'''
     
     
     ##################### Handling Duplicate Timestamps ######################
     
+    #the order that sorts the timestamps chronologically (a stable sort, so
+    #    the first occurrence of a duplicated timestamp always comes first);
+    #    data read in already in order (the usual case) need no sorting
+    times = df.time.to_numpy(dtype='datetime64[ns]')
+    in_order = bool(np.all(times[1:] >= times[:-1]))
+    if in_order:
+        order = np.arange(len(times))
+    else:
+        order = np.argsort(times.view(np.int64), kind='stable')
+    
+    #in chronological order, any timestamp equal to the one before it is a
+    #    duplicate; only the first occurrence of each timestamp is kept
+    sorted_times = times[order]
+    first = np.ones(len(times), dtype=bool)
+    first[1:] = sorted_times[1:] != sorted_times[:-1]
+    
+    #get the number of duplicated times; might also be useful to output
+    num_duplicate_times = len(times) - int(first.sum())
+    
     #check for duplicated timestamps
-    if pd.Index(df.time).has_duplicates == True:
-        
-        #keep a list of each duplicated timestamp; the method below will give ALL
-        #    instances of a duplicated timestamp, so if there are 3 occurrences
-        #    for the same time, two will appear in the list; by default the first
-        #    occurrence of a duplicated timestamp is False
-        duplicate_times = pd.to_datetime(np.array(df.time[pd.Index(df.time).duplicated()]))
-        
-        #remove all but the first occurrence of duplicate timestamps and store
-        #    them in a new array which will serve as an addition to an output file
-        #    later on
-        duplicates = duplicate_times.drop_duplicates(keep='first')
+    if num_duplicate_times > 0:
         
-        #convert the list of duplicated times to strings to later be output to a
-        #    text file
-        duplicate_times = [str(t) for t in duplicate_times]
-        
-        #get the number of duplicated times; might also be useful to output
-        num_duplicate_times = len(duplicate_times)
+        #keep a list of each duplicated timestamp, in the order they were read
+        #    in; if there are 3 occurrences for the same time, two will appear
+        #    in the list
+        events['duplicates'] = times[np.sort(order[~first])]
         
         #print the number of duplicate timestamps to the user
         print("There are %s duplicate timestamps. Removing duplicated timestamps and associated data, but preserving the first occurrence.\n" % num_duplicate_times)
-        
-        #remove any and all rows that have the same timestamp (i.e. where there are
-        #    duplicated times), but preserve the first occurrence; the following line
-        #    first resets the index variable such that 'time' is a regular column like
-        #    the rest of the data, then drops rows based solely on duplicates in 'time'
-        #    (i.e. subset='time'), but keeps the first occurrence of any duplications
-        #    (i.e. keep='first'), then sets the index back to the 'time' column (this
-        #    will be necessary later on)
-        df = df.drop_duplicates(subset='time', keep='first')
-        #    NOTE: the above method assumes the first occurrence of a duplicated timestamp
+        #    NOTE: this assumes the first occurrence of a duplicated timestamp
         #          contains the correct/valid data, which is not necessarily true. To
         #          be handled later...
-        
-        #reorder the indices such that they follow a monotonically increasing order
-        #    from 0 in the event that rows were removed from the above lines
-        df = df.reset_index().drop(columns='index')
     
-    elif df.time.empty == True:
+    elif len(times) == 0 and (start is None or end is None):
         #if something screwy happened above whether in the program or the data
         #    such that no data were read in, 'time' in the data frame (or any other
         #    variable for that matter) should be empty. If so, raise an error so
-        #    the program exits
+        #    the program exits (a time frame that falls within a data gap simply
+        #    has no records; it is filled with NaNs below)
         raise TypeError("No data. Program exiting. Check the reader.py file and/or the data files themselves.")
     
     else:
         print("There are no duplicated timestamps.\n")
     
-    #by now, data should be sorted chronologically and rid of any duplicated
+    #the times of the records that were kept, in the order they were read in;
+    #    needed to count the data gaps below, and for incremental processing
+    kept = np.zeros(len(times), dtype=bool)
+    kept[order[first]] = True
+    kept_times = times[kept]
+    
+    #keep the first occurrence of each timestamp, in chronological order; this
+    #    is the only copy of the data made here (none at all if the data were
+    #    in order without duplicates)
+    if not in_order or num_duplicate_times > 0:
+        df = df.take(order[first])
+        df.index = pd.RangeIndex(len(df))
+    
+    #by now, data are sorted chronologically and rid of any duplicated
     #    timestamps.
     
         
@@ -271,7 +824,24 @@ def pre_processing(df, second):
     #    2:55:29, 2:56:29, 2:57:30 rounding to 2:55:00, 2:56:00, 2:58:00...
     #    the line below will include 2:57 as a data gap when in fact, this is not
     #    necessarily true
-    num_data_gaps = (df.time.diff() > pd.Timedelta(minutes=1)).sum()
+    #(counted between the records kept in the order they were read in)
+    num_data_gaps = (np.diff(kept_times) > np.timedelta64(1, 'm')).sum()
+    
+    #the first and last times of the 1-minute grid; when a time frame was
+    #    given, also count any missing reports before the first/after the last
+    #    record in the time frame as data gaps
+    if len(df) == 0: #the whole time frame is one data gap
+        grid_start, grid_end = start, end
+        num_data_gaps = 1
+    else:
+        grid_start = df.time.min()
+        grid_end = df.time.max()
+        if start is not None and start < grid_start:
+            grid_start = start
+            num_data_gaps += 1
+        if end is not None and end > grid_end:
+            grid_end = end
+            num_data_gaps += 1
     #NOTE: the value contained in 'num_data_gaps' is not necessarily representative
     #      of the number of missing reports because each data gap could contain
     #      multiple missing reports (e.g. a time gap from 14:10 UTC to 14:15 UTC
@@ -282,22 +852,11 @@ def pre_processing(df, second):
         print("There are %s data gaps. Filling data gaps with NaNs...\n" % num_data_gaps)
         
         # fill in the gaps #
-        #create a DatetimeIndex ranging from the oldest time in the 'time' column
-        #    to the newest time using an interval of 1 minute
-        time_full = pd.date_range(start=df.time.min(), end=df.time.max(),freq='min')
-        
-        #create a DatetimeIndex using the full list of times above to serve as the
-        #    new time array and index
-        new_index = pd.Index(time_full, name="time")
-        
-        #set the index as 'time' for reindexing below
-        df = df.set_index('time')
-        
-        #re-index the DataFrame using the new list of times, then reset the index.
-        #    This will replace the original, incomplete list of timestamps while
-        #    simultaneously filling in the elements for all other variables as
-        #    NaNs where there were previously no records
-        df = df.reindex(new_index).reset_index()
+        #place each record on a 1-minute grid ranging from the oldest time in
+        #    the 'time' column (or the start of the time frame) to the newest
+        #    time (or the end of the time frame), filling in the elements for
+        #    all other variables as NaNs where there were previously no records
+        df = _fill_grid([df], grid_start, grid_end)[0]
         
         #now, count the column (any column) sum of NaNs; THIS will tell you
         #    explicitly how many reports are missing and a better representation
@@ -308,15 +867,14 @@ def pre_processing(df, second):
         #      assign any values as NaNs for any reason other than "missing
         #      value", this is not necessary. Food for thought!
         
-        #this is a pandas series containing the indices for the whole dataset
-        #    such that the corresponding data value is NaN (i.e. missing)
-        missing_reports_idx = df.index[df[df.columns[1]].isna()==True]
+        #whether each data value is NaN (i.e. missing) for the whole dataset
+        missing = df[df.columns[1]].isna().to_numpy()
         
         #the actual timestamps for missing data records (NaNs)
-        missing_report_times = pd.to_datetime(np.array(df.time[missing_reports_idx]))
+        missing_report_times = pd.DatetimeIndex(df.time.to_numpy()[missing])
         
         #this is the total sum of NaNs within the entire dataset
-        missing_reports_sum = df[df.columns[1]].isna().sum()
+        missing_reports_sum = int(missing.sum())
         print("There are %s missing reports in the dataset read in.\n" % missing_reports_sum)
     
         #calculate the total downtime/uptime based on the number of missing reports
@@ -329,17 +887,236 @@ def pre_processing(df, second):
         
     else:
         print("There are no missing reports!\n")
+        
+        #there are no timestamps for missing data records
+        missing_report_times = pd.DatetimeIndex([])
 
     ##########################################################################
     
+    #keep everything needed to merge new records into these data on the next
+    #    run when in incremental mode
+    if state is not None:
+        state.update({'df': df, 'last_raw': last_raw.to_datetime64(),
+                      'last_kept': kept_times[-1],
+                      'reported': np.isin(df.time.to_numpy(), kept_times),
+                      'num_out_of_order': num_out_of_order,
+                      'num_duplicates': num_duplicate_times,
+                      'num_data_gaps': int(num_data_gaps),
+                      'time_resets': events['time_resets'],
+                      'duplicates': events['duplicates']})
     
-    #sort rows chronologically by 'time' (aka. the index variable)
-    df = df.set_index('time').sort_index().reset_index()
-    
-    
+    return (df, missing_report_times, events)
+
+
+
+##############################################################################
+########################    INCREMENTAL PROCESSING    ########################
+##############################################################################
+
+#In production one new file arrives per sensor per day, so rather than reading
+#    and pre-processing the whole archive on every run, the processed data
+#    (and the counters needed to carry on from it) are kept in a 'state_file'
+#    and only the files added since the last run are read in and merged. The
+#    result is the same as reading in every file again. If any file read on a
+#    previous run has changed or disappeared, or a new file sorts before the
+#    files already read, everything is read in again.
+#NOTE: incremental processing only applies when the whole dataset is read in
+#      (i.e. 'mintime' and 'maxtime' are empty strings)
+
+#load the state kept from the last run; an empty dictionary if there is none
+#    yet (the first run reads in everything)
+def load_state(state_file):
+    if os.path.exists(state_file):
+        return pd.read_pickle(state_file)
+    return {}
+
+
+#save the state for the next run; written to a temporary file first so that
+#    an interrupted run never leaves a half-written state file behind
+def save_state(state_file, state):
+    temp = state_file + ".%s.tmp" % os.getpid()
+    pd.to_pickle(state, temp)
+    os.replace(temp, state_file)
+
+
+#start an incremental run; returns the state (None when not in incremental
+#    mode) and the list of files that still need to be read in. 'key'
+#    identifies the reader and its options; a state saved with a different
+#    key is thrown away
+def _incremental_start(state_file, file_list, start, end, key):
+    if state_file == "" or start is not None or end is not None:
+        return None, file_list
+
+    state = load_state(state_file)
+
+    #the path, size and modification time of every file
+    files = []
+    for file in file_list:
+        stat = os.stat(file)
+        files.append((file, stat.st_size, stat.st_mtime_ns))
+
+    #only the files after those read in on the last run are new; anything
+    #    else means starting over
+    num_read = len(state.get('files', []))
+    if state.get('key') != key or files[:num_read] != state['files']:
+        state.clear()
+        num_read = 0
+
+    state['key'] = key
+    state['files'] = files
+
+    return state, file_list[num_read:]
+
+
+#merge newly read records ('df') into the data processed on a previous run;
+#    this follows the same steps as pre_processing, carrying the counters and
+#    the last timestamps over from the previous run so that the result is
+#    identical to pre-processing all of the data at once
+def _merge_processed(df, second, state):
+
+    old = state['df']
+    old_times = old.time.to_numpy()
+
+    #################### Collect out-of-order timestamps #####################
+
+    #a time reset may also occur between the last record of the previous run
+    #    and the first new record
+    raw_times = np.concatenate(([state['last_raw']], df.time.to_numpy()))
+    reset = np.diff(raw_times) < np.timedelta64(0)
+    num_out_of_order = state['num_out_of_order'] + int(reset.sum())
+    print("Time reset %s times.\n" % num_out_of_order)
+    state['last_raw'] = raw_times[-1]
+
+    #round each timestamp to the nearest minute if timestamps contain seconds
+    if len(second) > 0 and df.time.empty == False:
+        df.time = half_up_minute(df.time)
+
+
+    ##################### Handling Duplicate Timestamps ######################
+
+    #a new record is a duplicate if a record with the same timestamp was kept
+    #    on a previous run, or if it repeats an earlier new record; the first
+    #    occurrence is always preserved
+    times = df.time.to_numpy()
+    pos = np.minimum(np.searchsorted(old_times, times), len(old_times) - 1)
+    duplicated = ((old_times[pos] == times) & state['reported'][pos]) | \
+        pd.Index(times).duplicated()
+
+    num_duplicate_times = state['num_duplicates'] + int(duplicated.sum())
+
+    #the times at which time reset and the duplicated timestamps, on this and
+    #    all previous runs
+    events = {'time_resets': np.concatenate((state.get('time_resets', raw_times[:0]), raw_times[1:][reset])),
+              'duplicates': np.concatenate((state.get('duplicates', times[:0]), times[duplicated]))}
+    if num_duplicate_times > 0:
+        print("There are %s duplicate timestamps. Removing duplicated timestamps and associated data, but preserving the first occurrence.\n" % num_duplicate_times)
+    else:
+        print("There are no duplicated timestamps.\n")
+
+    new = df[~duplicated]
+    new_times = new.time.to_numpy()
+
+
+    ######################### Filling Gaps with NaNs #########################
+
+    #gaps between the records kept, including between the last record kept on
+    #    the previous run and the first new record
+    kept_times = np.concatenate(([state['last_kept']], new_times))
+    num_data_gaps = state['num_data_gaps'] + int((np.diff(kept_times) > np.timedelta64(1, 'm')).sum())
+    state['last_kept'] = kept_times[-1]
+
+    if num_data_gaps > 0:
+        print("There are %s data gaps. Filling data gaps with NaNs...\n" % num_data_gaps)
+
+        #place the old and new data on the full 1-minute grid covering both
+        #    the old and the new records; the rest are NaNs
+        df, (old_rows, new_rows) = _fill_grid([old, new],
+                                              min(old_times[0], new_times.min(initial=old_times[0])),
+                                              max(old_times[-1], new_times.max(initial=old_times[-1])))
+
+        #which minutes of the grid had a report
+        reported = np.zeros(len(df), dtype=bool)
+        reported[old_rows] = state['reported']
+        reported[new_rows] = True
+
+        #timestamps and number of missing data records (NaNs)
+        missing = df[df.columns[1]].isna().to_numpy()
+        missing_report_times = pd.DatetimeIndex(df.time.to_numpy()[missing])
+        missing_reports_sum = int(missing.sum())
+        print("There are %s missing reports in the dataset read in.\n" % missing_reports_sum)
+
+        #calculate the total downtime/uptime based on the number of missing
+        #    reports
+        total = pd.Timedelta(len(df), unit='m')
+        uptime = pd.Timedelta((len(df) - missing_reports_sum), unit='m')
+        uptime_percent = round((1 - (float(missing_reports_sum) / float(len(df)))) * 100., 1)
+        print("Total uptime is %s out of %s (%s%%).\n" % (uptime,total,uptime_percent))
+
+    else:
+        print("There are no missing reports!\n")
+
+        #no gaps anywhere; just add the new records and sort chronologically
+        df = pd.concat([old, new], ignore_index=True)
+        df = df.iloc[np.argsort(df.time.to_numpy(), kind='stable')].reset_index(drop=True)
+        reported = np.ones(len(df), dtype=bool)
+        missing_report_times = pd.DatetimeIndex([])
+
     ##########################################################################
-    
-    return (df, missing_report_times)
+
+    state.update({'df': df, 'reported': reported,
+                  'num_out_of_order': num_out_of_order,
+                  'num_duplicates': num_duplicate_times,
+                  'num_data_gaps': num_data_gaps,
+                  'time_resets': events['time_resets'],
+                  'duplicates': events['duplicates']})
+
+    return (df, missing_report_times, events)
+
+
+
+##############################################################################
+#############################    COMPACT DATA    #############################
+##############################################################################
+
+#To keep the data of many sensors in memory at once, the reader functions can
+#    return a compact dataframe ('compact=True'): the measurements are kept as
+#    32-bit floats (about 7 significant digits, plenty for values recorded to
+#    2 decimal places) and the columns that only hold another column in other
+#    units (or masked) are left out. Those are computed from the column they
+#    come from when needed, with 'column' or 'with_columns' below (the
+#    plotters do this for the data within the time frame only).
+#NOTE: computed temp_F and SLP_inHg differ from those recorded in the files
+#      by up to the rounding of the recorded values (0.01)
+
+#the columns that are left out of compact dataframes, and the column and
+#    conversion they are computed from
+_derived_columns = {'temp_F': ('temp_C', lambda x: x * 9. / 5. + 32.),
+                    'SLP_inHg': ('SLP_hPa', lambda x: x * 0.02953),
+                    'no_rain': ('rain', lambda x: x.where(~(x > 0.)))}
+
+
+#the compact version of a dataframe returned by the reader functions
+def to_compact(df):
+    df = df.drop(columns=[col for col in _derived_columns if col in df.columns])
+    return df.astype({col: np.float32 for col in df.columns[1:]})
+
+
+#the column 'var_name' of 'df', computed if 'df' is compact and it was left
+#    out
+def column(df, var_name):
+    if var_name in df.columns:
+        return df[var_name]
+    source, convert = _derived_columns[var_name]
+    return convert(df[source]).rename(var_name)
+
+
+#'df' with all of 'columns', adding any that were left out of a compact
+#    dataframe ('df' itself if none were)
+def with_columns(df, columns):
+    missing = [col for col in columns if col not in df.columns]
+    if len(missing) == 0:
+        return df
+    return df.assign(**{col: column(df, col) for col in missing})
 
 
 
@@ -347,73 +1124,45 @@ def pre_processing(df, second):
 #################################    BMP    ##################################
 ##############################################################################
 
-def bmp(directory, wildcard):
+def bmp(directory, wildcard, mintime="", maxtime="",
+        cache_dir="", state_file="", workers=1, compact=False,
+        files=None):
     
     #tell the user that the function was called
     print("------------------------------------------------------------------\n")
     print("BMP reader function called...\n")
     
-    #find all data files within the specified directory
-    file_list = glob.glob(directory + wildcard)
+    #find all data files within the specified directory (or take the files
+    #    given in 'files', already selected for the time frame; see STREAMING)
+    file_list = glob.glob(directory + wildcard) if files is None else files
     #sort the list of files
     file_list = sorted(file_list)
     
-    #Read in the data file(s) from the file_list
-    #Begin by initializing the lists that will store the data from each file for
-    #    each variable
-    month = [] #calendar day
-    day = [] #calendar month
-    year = [] #calendar year
-    hour = [] #hour in UTC
-    minute = [] #minutes after the hour [UTC]
-    second = [] #seconds after the minute [UTC]
-    temp_C = [] #temperature in degrees Celcius
-    temp_F = [] #temperature in degrees Fahrenheit
-    station_P = [] #station pressure in hectopascals
-    SLP_hPa = [] #sea-level pressure in hectopascals
-    SLP_inHg = [] #sea-level pressure in inches of mercury
-    alt = [] #station altitude in meters
-    
-    #loop through the list of files, collecting values from each file and
-    #    appending them to the appropriate list; each list will contain the data
-    #    for a single variable from all files
-    #set a counter for the number of lines with erroneous characters encountered
-    counter = 0
-    problem_files = [] #initialize a list to house files with erroneous characters
-                       #    and partially overwritten lines
-    
-    #Read in the data file(s) from the file_list
-    for file in file_list:
-        with open(file, mode = "r") as f: #open the current file in read mode
-            for line in f: #read each line of the file
-                l = line.strip('\n').split() #remove carriage returns and whitespace
-                if len(l) == 11: #this simple condition ought to weed out
-                    #    instances of erroneous characters at the end of a file or
-                    #    lines that were partially overwritten; the length, or # of
-                    #    elements in this variable 'l' should be equivalent to the
-                    #    # of columns in your data file; if not, the data line in
-                    #    question is likely a partially overwritten line or the
-                    #    last line in a file that did not record to 23:59 UTC and
-                    #    contains erroneous characters (\@\@\@\@\@\@\)
-                    month.append(l[0])
-                    day.append(l[1])
-                    year.append(l[2])
-                    hour.append(l[3])
-                    minute.append(l[4])
-                    temp_C.append(l[5])
-                    temp_F.append(l[6])
-                    station_P.append(l[7])
-                    SLP_hPa.append(l[8])
-                    SLP_inHg.append(l[9])
-                    alt.append(l[10])
-                else: #if the above condition of 11 elements is not met, then then 
-                    #    count the occurrence and skip to the next line/iteration
-                    counter += 1 #consider appending the 'file' to a list meant to
-                    
-                    #append the problematic filename to a list
-                    problem_files.append(file)
-                    continue
-        f.close() #always close opened files
+    #only keep the files that may contain data within the time frame set by
+    #    'mintime' and 'maxtime' (every file if both are empty strings)
+    start, end = _window_bounds(mintime, maxtime)
+    if files is None:
+        file_list = _files_in_window(file_list, _bmp_columns, start, end)
+    
+    #in incremental mode (i.e. a 'state_file' is given and the whole dataset
+    #    is read in), only the files added since the last run are read in; see
+    #    INCREMENTAL PROCESSING above
+    state, file_list = _incremental_start(state_file, file_list, start, end,
+                                          ('bmp', directory, wildcard))
+    
+    #Read in the data file(s) from the file_list with the shared parsing engine;
+    #    each variable is returned as a NumPy array of floats containing the
+    #    data from all files. Lines that do not have the number of columns
+    #    given in '_bmp_columns' are counted and skipped, and the file they came
+    #    from is added to 'problem_files'. Files that have not changed since
+    #    they were last parsed are taken from the cache in 'cache_dir', if one
+    #    is given (an empty string means no cache). With 'workers' greater than
+    #    1, the files are parsed in that many processes at once
+    call_parser = _parse_files(file_list, _bmp_columns, cache_dir, workers)
+    data = call_parser[0]
+    counter = call_parser[1] #number of lines with erroneous characters
+    problem_files = call_parser[2] #files with erroneous characters and
+                                   #    partially overwritten lines
     
     #print the number of files read in
     print("%s files read" % len(file_list))
@@ -424,46 +1173,37 @@ def bmp(directory, wildcard):
     
     
     
-    
     #------------------------------------------------------------------------#
     #------------------------    DATA PROCESSING    -------------------------#
     #------------------------------------------------------------------------#
     
     ########################## Checking Array Size ###########################
     
-    #check that the number of elements in each array are the same
-    if len(month) == len(day) == len(year) == len(hour) == len(minute) == \
-        len(temp_C) == len(temp_F) == len(station_P) == len(SLP_hPa) == \
-        len(SLP_inHg) == len(alt):
-        #if all arrays have the same number of elements, then the read/append
-        #    conditions above were met and everything is good.
-        print("Number of elements in each variable array are equal. Continue...\n")
-        
-        if len(month) == 0: #can be any variable since now we know they are
-        #    all equal in size/length
-            raise ValueError("No data. Program exiting. Check the directory path and/or the data files themselves.\n The # of columns in the data files may not match what is specified by the condition set in the READ IN FILE(S) section")
-            
-    else:
-        #if all arrays do not have the same number of elements...
-        print("Number of elements in each variable array are not equal. Program exited.\n")
-        sys.exit() #... kill the program
+    #every variable array comes from the same parsed rows, so they all have the
+    #    same number of elements; only check that there are data at all (no
+    #    new data is fine in incremental mode once data have been processed,
+    #    and so is a time frame that falls within a data gap)
+    if len(data['month']) == 0 and (state is None or 'df' not in state) and \
+        (start is None or end is None):
+        raise ValueError("No data. Program exiting. Check the directory path and/or the data files themselves.\n The # of columns in the data files may not match what is specified by the condition set in the READ IN FILE(S) section")
     
     
     ##########################################################################
     
     
-    #convert variable lists to numpy arrays for simpler processing
-    month = np.array(month) #this is a string
-    day = np.array(day) #this is a string
-    year = np.array(year) #this is a string
-    hour = np.array(hour) #this is a string
-    minute = np.array(minute) #this is a string
-    temp_C = np.array(temp_C, dtype=float) #this is a float
-    temp_F = np.array(temp_F, dtype=float) #this is a float
-    station_P = np.array(station_P, dtype=float) #this is a float
-    SLP_hPa = np.array(SLP_hPa, dtype=float) #this is a float
-    SLP_inHg = np.array(SLP_inHg, dtype=float) #this is a float
-    alt = np.array(alt, dtype=float) #this is a float
+    #pull the individual variables out of the parsed data
+    month = data['month'] #calendar month
+    day = data['day'] #calendar day
+    year = data['year'] #calendar year
+    hour = data['hour'] #hour in UTC
+    minute = data['minute'] #minutes after the hour [UTC]
+    second = [] #time is not recorded to the second
+    temp_C = data['temp_C'] #temperature in degrees Celcius
+    temp_F = data['temp_F'] #temperature in degrees Fahrenheit
+    station_P = data['station_P'] #station pressure in hectopascals
+    SLP_hPa = data['SLP_hPa'] #sea-level pressure in hectopascals
+    SLP_inHg = data['SLP_inHg'] #sea-level pressure in inches of mercury
+    alt = data['alt'] #station altitude in meters
     
     
     ########################## Creating Timestamps ###########################
@@ -481,23 +1221,37 @@ def bmp(directory, wildcard):
                        'SLP_inHg':SLP_inHg, 'alt':alt})
     
     
+    #drop any data outside the time frame set by 'mintime' and 'maxtime'
+    df = _rows_in_window(df, start, end)
+    
+    
     ############################# Data Cleansing #############################
     
     #call the pre-processing function; this will collect out-of-order
     #    timestamps, handle duplicate timestamps, and fill data gaps with NaNs
-    call_processor = pre_processing(df, second)
+    call_processor = pre_processing(df, second, start, end, state)
     df = call_processor[0]
     missing_reports = call_processor[1]
+    events = call_processor[2]
+    
+    #save the state for the next incremental run
+    if state is not None:
+        save_state(state_file, state)
     
     
     ##########################################################################
 
     print("------------------------------------------------------------------")
     
+    #keep only the compact version of the dataframe if asked to (see COMPACT
+    #    DATA)
+    if compact:
+        df = to_compact(df)
+    
     #will need to return 'count' and 'problem_files' if you want to add them to
     #    your output file; will also need to adjust variables in '3D_main.py'
     #    if returning 'count' and 'problem_files'
-    return (df, missing_reports)
+    return (df, missing_reports, events)
 
 
 
@@ -505,65 +1259,45 @@ def bmp(directory, wildcard):
 ################################    HTU21D    ################################
 ##############################################################################
 
-def htu21d(directory, wildcard):
+def htu21d(directory, wildcard, mintime="", maxtime="",
+           cache_dir="", state_file="", workers=1, compact=False,
+           files=None):
     
     #tell the user that the function was called
     print("------------------------------------------------------------------\n")
     print("HTU21D reader function called...\n")
     
-    #find all data files within the specified directory
-    file_list = glob.glob(directory + wildcard)
+    #find all data files within the specified directory (or take the files
+    #    given in 'files', already selected for the time frame; see STREAMING)
+    file_list = glob.glob(directory + wildcard) if files is None else files
     #sort the list of files
     file_list = sorted(file_list)
     
-    #Read in the data file(s) from the file_list
-    #Begin by initializing the lists that will store the data from each file for
-    #    each variable
-    month = [] #calendar day
-    day = [] #calendar month
-    year = [] #calendar year
-    hour = [] #hour in UTC
-    minute = [] #minutes after the hour [UTC]
-    second = [] #seconds after the minute [UTC]
-    temp_C = [] #temperature in degrees Celcius
-    temp_F = [] #temperature in degrees Fahrenheit 
-    rel_hum = [] #relative humidity (%)
-    
-    #loop through the list of files, collecting values from each file and
-    #    appending them to the appropriate list; each list will contain the data
-    #    for a single variable from all files
-    #set a counter for the number of lines with erroneous characters encountered
-    counter = 0
-    problem_files = [] #initialize a list to house files with erroneous characters
-                       #    and partially overwritten lines
-    for file in file_list:
-        with open(file, mode = "r") as f: #open the current file in read mode
-            for line in f: #read each line of the file
-                l = line.strip('\n').split() #remove carriage returns and whitespace
-                if len(l) == 8: #this simple condition ought to weed out
-                    #    instances of erroneous characters at the end of a file or
-                    #    lines that were partially overwritten; the length, or # of
-                    #    elements in this variable 'l' should be equivalent to the
-                    #    # of columns in your data file; if not, the data line in
-                    #    question is likely a partially overwritten line or the
-                    #    last line in a file that did not record to 23:59 UTC and
-                    #    contains erroneous characters (\@\@\@\@\@\@\)
-                    month.append(l[0])
-                    day.append(l[1])
-                    year.append(l[2])
-                    hour.append(l[3])
-                    minute.append(l[4])
-                    temp_C.append(l[5])
-                    temp_F.append(l[6])
-                    rel_hum.append(l[7])
-                else: #if the above condition of 8 elements is not met, then 
-                    #    count the occurrence and skip to the next line/iteration
-                    counter += 1 #consider appending the 'file' to a list meant to
-                    
-                    #append the problematic filename to a list
-                    problem_files.append(file)
-                    continue
-        f.close() #always close opened files
+    #only keep the files that may contain data within the time frame set by
+    #    'mintime' and 'maxtime' (every file if both are empty strings)
+    start, end = _window_bounds(mintime, maxtime)
+    if files is None:
+        file_list = _files_in_window(file_list, _htu21d_columns, start, end)
+    
+    #in incremental mode (i.e. a 'state_file' is given and the whole dataset
+    #    is read in), only the files added since the last run are read in; see
+    #    INCREMENTAL PROCESSING above
+    state, file_list = _incremental_start(state_file, file_list, start, end,
+                                          ('htu21d', directory, wildcard))
+    
+    #Read in the data file(s) from the file_list with the shared parsing engine;
+    #    each variable is returned as a NumPy array of floats containing the
+    #    data from all files. Lines that do not have the number of columns
+    #    given in '_htu21d_columns' are counted and skipped, and the file they came
+    #    from is added to 'problem_files'. Files that have not changed since
+    #    they were last parsed are taken from the cache in 'cache_dir', if one
+    #    is given (an empty string means no cache). With 'workers' greater than
+    #    1, the files are parsed in that many processes at once
+    call_parser = _parse_files(file_list, _htu21d_columns, cache_dir, workers)
+    data = call_parser[0]
+    counter = call_parser[1] #number of lines with erroneous characters
+    problem_files = call_parser[2] #files with erroneous characters and
+                                   #    partially overwritten lines
     
     #print the number of files read in
     print("%s files read" % len(file_list))
@@ -580,37 +1314,28 @@ def htu21d(directory, wildcard):
     
     ########################## Checking Array Size ###########################
     
-    #check that the number of elements in each array are the same
-    if len(month) == len(day) == len(year) == len(hour) == len(minute) == len(temp_C) \
-        == len(temp_F) == len(rel_hum):
-        #if all arrays have the same number of elements, then the read/append
-        #    conditions above were met and everything is good.
-        print("Number of elements in each variable array are equal. Continue...\n")
-        
-        if len(month) == 0: #can be any variable since now we know they are
-        #    all equal in size/length
-            raise ValueError("No data. Program exiting. Check the directory path and/or the data files themselves.\n The # of columns in the data files may not match what is specified by the condition set in the READ IN FILE(S) section")
-        
-    else:
-        #if all arrays do not have the same number of elements...
-        print("Number of elements in each variable array are not equal. Program exited.\n")
-        sys.exit() #... kill the program
-        #consider telling the user where (i.e. what file) the above conditions was
-        #    not met; this could pinpoint an otherwise unknown issue that needs
-        #    addressing
+    #every variable array comes from the same parsed rows, so they all have the
+    #    same number of elements; only check that there are data at all (no
+    #    new data is fine in incremental mode once data have been processed,
+    #    and so is a time frame that falls within a data gap)
+    if len(data['month']) == 0 and (state is None or 'df' not in state) and \
+        (start is None or end is None):
+        raise ValueError("No data. Program exiting. Check the directory path and/or the data files themselves.\n The # of columns in the data files may not match what is specified by the condition set in the READ IN FILE(S) section")
+    
     
     ##########################################################################
     
     
-    #convert variable lists to numpy arrays for simpler processing
-    month = np.array(month) #this is a string
-    day = np.array(day) #this is a string
-    year = np.array(year) #this is a string
-    hour = np.array(hour) #this is a string
-    minute = np.array(minute) #this is a string
-    temp_C = np.array(temp_C, dtype=float) #this is a float
-    temp_F = np.array(temp_F, dtype=float) #this is a float
-    rel_hum = np.array(rel_hum, dtype=float) #this is a float
+    #pull the individual variables out of the parsed data
+    month = data['month'] #calendar month
+    day = data['day'] #calendar day
+    year = data['year'] #calendar year
+    hour = data['hour'] #hour in UTC
+    minute = data['minute'] #minutes after the hour [UTC]
+    second = [] #time is not recorded to the second
+    temp_C = data['temp_C'] #temperature in degrees Celcius
+    temp_F = data['temp_F'] #temperature in degrees Fahrenheit
+    rel_hum = data['rel_hum'] #relative humidity (%)
     
     
     ########################## Creating Timestamps ###########################
@@ -627,23 +1352,37 @@ def htu21d(directory, wildcard):
                        'rel_hum':rel_hum})
     
     
+    #drop any data outside the time frame set by 'mintime' and 'maxtime'
+    df = _rows_in_window(df, start, end)
+    
+    
     ############################# Data Cleansing #############################
     
     #call the pre-processing function; this will collect out-of-order
     #    timestamps, handle duplicate timestamps, and fill data gaps with NaNs
-    call_processor = pre_processing(df, second)
+    call_processor = pre_processing(df, second, start, end, state)
     df = call_processor[0]
     missing_reports = call_processor[1]
+    events = call_processor[2]
+    
+    #save the state for the next incremental run
+    if state is not None:
+        save_state(state_file, state)
     
     
     ##########################################################################
 
     print("------------------------------------------------------------------")
     
+    #keep only the compact version of the dataframe if asked to (see COMPACT
+    #    DATA)
+    if compact:
+        df = to_compact(df)
+    
     #will need to return 'count' and 'problem_files' if you want to add them to
     #    your output file; will also need to adjust variables in '3D_main.py'
     #    if returning 'count' and 'problem_files'
-    return (df, missing_reports)
+    return (df, missing_reports, events)
 
 
 
@@ -651,64 +1390,45 @@ def htu21d(directory, wildcard):
 ###############################    MCP9808    ################################
 ##############################################################################
 
-def mcp9808(directory, wildcard):
+def mcp9808(directory, wildcard, mintime="", maxtime="",
+            cache_dir="", state_file="", workers=1, compact=False,
+            files=None):
     
     #tell the user that the function was called
     print("------------------------------------------------------------------\n")
     print("MCP9808 reader function called...\n")
     
-    #find all data files within the specified directory
-    file_list = glob.glob(directory + wildcard)
+    #find all data files within the specified directory (or take the files
+    #    given in 'files', already selected for the time frame; see STREAMING)
+    file_list = glob.glob(directory + wildcard) if files is None else files
     #sort the list of files
     file_list = sorted(file_list)
     
-    #Read in the data file(s) from the file_list
-    #Begin by initializing the lists that will store the data from each file for
-    #    each variable
-    month = [] #calendar day
-    day = [] #calendar month
-    year = [] #calendar year
-    hour = [] #hour in UTC
-    minute = [] #minutes after the hour [UTC]
-    second = [] #seconds after the minute [UTC]
-    temp_C = [] #temperature in degrees Celcius
-    temp_F = [] #temperature in degrees Fahrenheit 
-    
-    #loop through the list of files, collecting values from each file and
-    #    appending them to the appropriate list; each list will contain the data
-    #    for a single variable from all files
-    #set a counter for the number of lines with erroneous characters encountered
-    counter = 0
-    problem_files = [] #initialize a list to house filenames with erroneous
-                       #    characters and partially overwritten lines
-    for file in file_list:
-        with open(file, mode = "r") as f: #open the current file in read mode
-            for line in f: #read each line of the file
-                l = line.strip('\n').split() #remove carriage returns and whitespace
-                if len(l) == 7: #this simple condition ought to weed out
-                    #    instances of erroneous characters at the end of a file or
-                    #    lines that were partially overwritten; the length, or # of
-                    #    elements in this variable 'l' should be equivalent to the
-                    #    # of columns in your data file; if not, the data line in
-                    #    question is likely a partially overwritten line or the
-                    #    last line in a file that did not record to 23:59 UTC and
-                    #    contains erroneous characters (\@\@\@\@\@\@\)
-                    month.append(l[0])
-                    day.append(l[1])
-                    year.append(l[2])
-                    hour.append(l[3])
-                    minute.append(l[4])
-                    temp_C.append(l[5])
-                    temp_F.append(l[6])
-                else: #if the above condition of 7 elements is not met, then 
-                    #    count the occurrence and skip to the next line/iteration
-                    counter += 1
-                    
-                    #append the problematic filename to a list
-                    problem_files.append(file)
-                    continue
-                
-        #no need to close opened files; the 'with' method above does that for us
+    #only keep the files that may contain data within the time frame set by
+    #    'mintime' and 'maxtime' (every file if both are empty strings)
+    start, end = _window_bounds(mintime, maxtime)
+    if files is None:
+        file_list = _files_in_window(file_list, _mcp9808_columns, start, end)
+    
+    #in incremental mode (i.e. a 'state_file' is given and the whole dataset
+    #    is read in), only the files added since the last run are read in; see
+    #    INCREMENTAL PROCESSING above
+    state, file_list = _incremental_start(state_file, file_list, start, end,
+                                          ('mcp9808', directory, wildcard))
+    
+    #Read in the data file(s) from the file_list with the shared parsing engine;
+    #    each variable is returned as a NumPy array of floats containing the
+    #    data from all files. Lines that do not have the number of columns
+    #    given in '_mcp9808_columns' are counted and skipped, and the file they came
+    #    from is added to 'problem_files'. Files that have not changed since
+    #    they were last parsed are taken from the cache in 'cache_dir', if one
+    #    is given (an empty string means no cache). With 'workers' greater than
+    #    1, the files are parsed in that many processes at once
+    call_parser = _parse_files(file_list, _mcp9808_columns, cache_dir, workers)
+    data = call_parser[0]
+    counter = call_parser[1] #number of lines with erroneous characters
+    problem_files = call_parser[2] #files with erroneous characters and
+                                   #    partially overwritten lines
     
     #print the number of files read in
     print("%s files read" % len(file_list))
@@ -725,35 +1445,27 @@ def mcp9808(directory, wildcard):
     
     ########################## Checking Array Size ###########################
     
-    #check that the number of elements in each array are the same
-    if len(month) == len(day) == len(year) == len(hour) == len(minute) == len(temp_C) \
-        == len(temp_F):
-        #if all arrays have the same number of elements, then the read/append
-        #    conditions above were met and everything is good.
-        print("Number of elements in each variable array are equal. Continue...\n")
-        
-        if len(month) == 0: #can be any variable since now we know they are
-        #    all equal in size/length
-            raise ValueError("No data. Program exiting. Check the directory path and/or the data files themselves.\n The # of columns in the data files may not match what is specified by the condition set in the READ IN FILE(S) section")
-    else:
-        #if all arrays do not have the same number of elements...
-        print("Number of elements in each variable array are not equal. Program exited.\n")
-        sys.exit() #... kill the program
-        #consider telling the user where (i.e. what file) the above conditions was
-        #    not met; this could pinpoint an otherwise unknown issue that needs
-        #    addressing
+    #every variable array comes from the same parsed rows, so they all have the
+    #    same number of elements; only check that there are data at all (no
+    #    new data is fine in incremental mode once data have been processed,
+    #    and so is a time frame that falls within a data gap)
+    if len(data['month']) == 0 and (state is None or 'df' not in state) and \
+        (start is None or end is None):
+        raise ValueError("No data. Program exiting. Check the directory path and/or the data files themselves.\n The # of columns in the data files may not match what is specified by the condition set in the READ IN FILE(S) section")
+    
     
     ##########################################################################
     
     
-    #convert variable lists to numpy arrays for simpler processing
-    month = np.array(month) #this is a string
-    day = np.array(day) #this is a string
-    year = np.array(year) #this is a string
-    hour = np.array(hour) #this is a string
-    minute = np.array(minute) #this is a string
-    temp_C = np.array(temp_C, dtype=float) #this is a float
-    temp_F = np.array(temp_F, dtype=float) #this is a float
+    #pull the individual variables out of the parsed data
+    month = data['month'] #calendar month
+    day = data['day'] #calendar day
+    year = data['year'] #calendar year
+    hour = data['hour'] #hour in UTC
+    minute = data['minute'] #minutes after the hour [UTC]
+    second = [] #time is not recorded to the second
+    temp_C = data['temp_C'] #temperature in degrees Celcius
+    temp_F = data['temp_F'] #temperature in degrees Fahrenheit
     
     
     ########################## Creating Timestamps ###########################
@@ -769,23 +1481,37 @@ def mcp9808(directory, wildcard):
     df = pd.DataFrame({'time':time, 'temp_C':temp_C, 'temp_F':temp_F})
     
     
+    #drop any data outside the time frame set by 'mintime' and 'maxtime'
+    df = _rows_in_window(df, start, end)
+    
+    
     ############################# Data Cleansing #############################
     
     #call the pre-processing function; this will collect out-of-order
     #    timestamps, handle duplicate timestamps, and fill data gaps with NaNs
-    call_processor = pre_processing(df, second)
+    call_processor = pre_processing(df, second, start, end, state)
     df = call_processor[0]
     missing_reports = call_processor[1]
+    events = call_processor[2]
+    
+    #save the state for the next incremental run
+    if state is not None:
+        save_state(state_file, state)
     
     
     ##########################################################################
 
     print("------------------------------------------------------------------")
     
+    #keep only the compact version of the dataframe if asked to (see COMPACT
+    #    DATA)
+    if compact:
+        df = to_compact(df)
+    
     #will need to return 'count' and 'problem_files' if you want to add them to
     #    your output file; will also need to adjust variables in '3D_main.py'
     #    if returning 'count' and 'problem_files'
-    return (df, missing_reports)
+    return (df, missing_reports, events)
 
 
 
@@ -793,72 +1519,49 @@ def mcp9808(directory, wildcard):
 ################################    SI1145    ################################
 ##############################################################################
 
-def si1145(directory, wildcard):
+def si1145(directory, wildcard, mintime="", maxtime="",
+           cache_dir="", state_file="", workers=1, compact=False,
+           files=None):
     
     #tell the user that the function was called
     print("------------------------------------------------------------------\n")
     print("SI1145 reader function called...\n")
     
-    #find all data files within the specified directory
-    file_list = glob.glob(directory + wildcard)
+    #find all data files within the specified directory (or take the files
+    #    given in 'files', already selected for the time frame; see STREAMING)
+    file_list = glob.glob(directory + wildcard) if files is None else files
     #sort the list of files
     file_list = sorted(file_list)
     
+    #only keep the files that may contain data within the time frame set by
+    #    'mintime' and 'maxtime' (every file if both are empty strings)
+    start, end = _window_bounds(mintime, maxtime)
+    if files is None:
+        file_list = _files_in_window(file_list, _si1145_columns, start, end)
+    
+    #in incremental mode (i.e. a 'state_file' is given and the whole dataset
+    #    is read in), only the files added since the last run are read in; see
+    #    INCREMENTAL PROCESSING above
+    state, file_list = _incremental_start(state_file, file_list, start, end,
+                                          ('si1145', directory, wildcard))
+    
     # you'll need to think about how to account for the different types of data
     #    files here. This will be the place to begin, perhaps with some 'if'
     #    statements
     
-    #Read in the data file(s) from the file_list
-    #Begin by initializing the lists that will store the data from each file for
-    #    each variable
-    month = [] #calendar day
-    day = [] #calendar month
-    year = [] #calendar year
-    hour = [] #hour in UTC
-    minute = [] #minutes after the hour [UTC]
-    second = [] #seconds after the minute [UTC]
-    vis = [] #visible light in Watts per meter squared
-    ir = [] #infrared radiation "" "" "" "" ""
-    uv = [] #ultraviolet radiation "" "" "" "" ""
-    uvi = [] #ultraviolet index
-    
-    #loop through the list of files, collecting values from each file and
-    #    appending them to the appropriate list; each list will contain the data
-    #    for a single variable from all files
-    #set a counter for the number of lines with erroneous characters encountered
-    counter = 0
-    problem_files = [] #initialize a list to house files with erroneous characters
-                       #    and partially overwritten lines
-    for file in file_list:
-        with open(file, mode = "r") as f: #open the current file in read mode
-            for line in f: #read each line of the file
-                l = line.strip('\n').split() #remove carriage returns and whitespace
-                if len(l) == 9: #this simple condition ought to weed out
-                    #    instances of erroneous characters at the end of a file or
-                    #    lines that were partially overwritten; the length, or # of
-                    #    elements in this variable 'l' should be equivalent to the
-                    #    # of columns in your data file; if not, the data line in
-                    #    question is likely a partially overwritten line or the
-                    #    last line in a file that did not record to 23:59 UTC and
-                    #    contains erroneous characters (\@\@\@\@\@\@\)
-                    month.append(l[0])
-                    day.append(l[1])
-                    year.append(l[2])
-                    hour.append(l[3])
-                    minute.append(l[4])
-                    vis.append(l[5])
-                    ir.append(l[6])
-                    uv.append(l[7])
-                    uvi.append(l[8])
-                    
-                else: #if the above condition of 8 elements is not met, then 
-                    #    count the occurrence and skip to the next line/iteration
-                    counter += 1
-                    
-                    #append the problematic filename to a list
-                    problem_files.append(file)
-                    continue
-        f.close() #always close opened files
+    #Read in the data file(s) from the file_list with the shared parsing engine;
+    #    each variable is returned as a NumPy array of floats containing the
+    #    data from all files. Lines that do not have the number of columns
+    #    given in '_si1145_columns' are counted and skipped, and the file they came
+    #    from is added to 'problem_files'. Files that have not changed since
+    #    they were last parsed are taken from the cache in 'cache_dir', if one
+    #    is given (an empty string means no cache). With 'workers' greater than
+    #    1, the files are parsed in that many processes at once
+    call_parser = _parse_files(file_list, _si1145_columns, cache_dir, workers)
+    data = call_parser[0]
+    counter = call_parser[1] #number of lines with erroneous characters
+    problem_files = call_parser[2] #files with erroneous characters and
+                                   #    partially overwritten lines
     
     #print the number of files read in
     print("%s files read" % len(file_list))
@@ -875,38 +1578,29 @@ def si1145(directory, wildcard):
     
     ########################## Checking Array Size ###########################
     
-    #check that the number of elements in each array are the same
-    if len(month) == len(day) == len(year) == len(hour) == len(minute) == len(vis) \
-        == len(ir) == len(uv) == len(uvi):
-        #if all arrays have the same number of elements, then the read/append
-        #    conditions above were met and everything is good.
-        print("Number of elements in each variable array are equal. Continue...\n")
-        
-        if len(month) == 0: #can be any variable since now we know they are
-        #    all equal in size/length
-            raise ValueError("No data. Program exiting. Check the directory path and/or the data files themselves.\n The # of columns in the data files may not match what is specified by the condition set in the READ IN FILE(S) section")
-            
-    else:
-        #if all arrays do not have the same number of elements...
-        print("Number of elements in each variable array are not equal. Program exited.\n")
-        sys.exit() #... kill the program
-        #consider telling the user where (i.e. what file) the above conditions was
-        #    not met; this could pinpoint an otherwise unknown issue that needs
-        #    addressing
+    #every variable array comes from the same parsed rows, so they all have the
+    #    same number of elements; only check that there are data at all (no
+    #    new data is fine in incremental mode once data have been processed,
+    #    and so is a time frame that falls within a data gap)
+    if len(data['month']) == 0 and (state is None or 'df' not in state) and \
+        (start is None or end is None):
+        raise ValueError("No data. Program exiting. Check the directory path and/or the data files themselves.\n The # of columns in the data files may not match what is specified by the condition set in the READ IN FILE(S) section")
+    
     
     ##########################################################################
     
     
-    #convert variable lists to numpy arrays for simpler processing
-    month = np.array(month) #this is a string
-    day = np.array(day) #this is a string
-    year = np.array(year) #this is a string
-    hour = np.array(hour) #this is a string
-    minute = np.array(minute) #this is a string
-    vis = np.array(vis, dtype=float) #this is a float
-    ir = np.array(ir, dtype=float) #this is a float
-    uv = np.array(uv, dtype=float) #this is a float
-    uvi = np.array(uvi, dtype=float) #this is a float
+    #pull the individual variables out of the parsed data
+    month = data['month'] #calendar month
+    day = data['day'] #calendar day
+    year = data['year'] #calendar year
+    hour = data['hour'] #hour in UTC
+    minute = data['minute'] #minutes after the hour [UTC]
+    second = [] #time is not recorded to the second
+    vis = data['vis'] #visible light in Watts per meter squared
+    ir = data['ir'] #infrared radiation in Watts per meter squared
+    uv = data['uv'] #ultraviolet radiation in Watts per meter squared
+    uvi = data['uvi'] #ultraviolet index
     
     
     ########################## Creating Timestamps ###########################
@@ -922,23 +1616,37 @@ def si1145(directory, wildcard):
     df = pd.DataFrame({'time':time, 'vis':vis, 'ir':ir, 'uv':uv, 'uvi':uvi})
     
     
+    #drop any data outside the time frame set by 'mintime' and 'maxtime'
+    df = _rows_in_window(df, start, end)
+    
+    
     ############################# Data Cleansing #############################
     
     #call the pre-processing function; this will collect out-of-order
     #    timestamps, handle duplicate timestamps, and fill data gaps with NaNs
-    call_processor = pre_processing(df, second)
+    call_processor = pre_processing(df, second, start, end, state)
     df = call_processor[0]
     missing_reports = call_processor[1]
+    events = call_processor[2]
+    
+    #save the state for the next incremental run
+    if state is not None:
+        save_state(state_file, state)
     
     
     ##########################################################################
 
     print("------------------------------------------------------------------")
     
+    #keep only the compact version of the dataframe if asked to (see COMPACT
+    #    DATA)
+    if compact:
+        df = to_compact(df)
+    
     #will need to return 'count' and 'problem_files' if you want to add them to
     #    your output file; will also need to adjust variables in '3D_main.py'
     #    if returning 'count' and 'problem_files'
-    return (df, missing_reports)
+    return (df, missing_reports, events)
 
 
 
@@ -946,76 +1654,49 @@ def si1145(directory, wildcard):
 #######################    RAIN / TIPPING BUCKET    ##########################
 ##############################################################################
 
-def rain_gauge(directory, units, wildcard):
+def rain_gauge(directory, units, wildcard, mintime="", maxtime="",
+               cache_dir="", state_file="", workers=1, compact=False,
+               files=None):
     
     #tell the user that the function was called
     print("------------------------------------------------------------------\n")
     print("RAIN GAUGE reader function called...\n")
     
-    #find all data files within the specified directory
-    file_list = glob.glob(directory + wildcard)
+    #find all data files within the specified directory (or take the files
+    #    given in 'files', already selected for the time frame; see STREAMING)
+    file_list = glob.glob(directory + wildcard) if files is None else files
     #sort the list of files
     file_list = sorted(file_list)
     
+    #only keep the files that may contain data within the time frame set by
+    #    'mintime' and 'maxtime' (every file if both are empty strings)
+    start, end = _window_bounds(mintime, maxtime)
+    if files is None:
+        file_list = _files_in_window(file_list, _rain_columns, start, end)
+    
+    #in incremental mode (i.e. a 'state_file' is given and the whole dataset
+    #    is read in), only the files added since the last run are read in; see
+    #    INCREMENTAL PROCESSING above
+    state, file_list = _incremental_start(state_file, file_list, start, end,
+                                          ('rain_gauge', directory, wildcard))
+    
     # you'll need to think about how to account for the different types of data
     #    files here. This will be the place to begin, perhaps with some 'if'
     #    statements
     
-    #Read in the data file(s) from the file_list
-    #Begin by initializing the lists that will store the data from each file for
-    #    each variable
-    month = [] #calendar day
-    day = [] #calendar month
-    year = [] #calendar year
-    hour = [] #hour in UTC
-    minute = [] #minutes after the hour [UTC]
-    second = [] #seconds after the minute [UTC]
-    rain = [] #precipitation amount in mm
-    
-    #loop through the list of files, collecting values from each file and
-    #    appending them to the appropriate list; each list will contain the data
-    #    for a single variable from all files
-    #set a counter for the number of lines with erroneous characters encountered
-    counter = 0
-    problem_files = [] #initialize a list to house files with erroneous characters
-                       #    and partially overwritten lines
-    for file in file_list:
-        with open(file, mode = "r") as f: #open the current file in read mode
-            for line in f: #read each line of the file
-                l = line.strip('\n').split() #remove carriage returns and whitespace
-                if len(l) == 7: #this simple condition ought to weed out
-                    #    instances of erroneous characters at the end of a file or
-                    #    lines that were partially overwritten; the length, or # of
-                    #    elements in this variable 'l' should be equivalent to the
-                    #    # of columns in your data file; if not, the data line in
-                    #    question is likely a partially overwritten line or the
-                    #    last line in a file that did not record to 23:59 UTC and
-                    #    contains erroneous characters (\@\@\@\@\@\@\)
-                    month.append(l[0])
-                    day.append(l[1])
-                    year.append(l[2])
-                    hour.append(l[3])
-                    minute.append(l[4])
-                    second.append(l[5])
-                    rain.append(l[6])
-                    
-                elif len(l) == 6: #adding this exception because some rain
-                    #    gauge data do NOT record time to the second
-                    month.append(l[0])
-                    day.append(l[1])
-                    year.append(l[2])
-                    hour.append(l[3])
-                    minute.append(l[4])
-                    rain.append(l[5])
-                    
-                else: #if neither condition of 7 or 8 elements is not met, then 
-                    #    count the occurrence and skip to the next line/iteration
-                    counter += 1
-                    
-                    #append the problematic filename to a list
-                    problem_files.append(file)
-                    continue
-        f.close() #always close opened files
+    #Read in the data file(s) from the file_list with the shared parsing engine;
+    #    each variable is returned as a NumPy array of floats containing the
+    #    data from all files. Lines that do not have the number of columns
+    #    given in '_rain_columns' are counted and skipped, and the file they came
+    #    from is added to 'problem_files'. Files that have not changed since
+    #    they were last parsed are taken from the cache in 'cache_dir', if one
+    #    is given (an empty string means no cache). With 'workers' greater than
+    #    1, the files are parsed in that many processes at once
+    call_parser = _parse_files(file_list, _rain_columns, cache_dir, workers)
+    data = call_parser[0]
+    counter = call_parser[1] #number of lines with erroneous characters
+    problem_files = call_parser[2] #files with erroneous characters and
+                                   #    partially overwritten lines
     
     #print the number of files read in
     print("%s files read" % len(file_list))
@@ -1031,41 +1712,30 @@ def rain_gauge(directory, units, wildcard):
     #------------------------------------------------------------------------#
     
     ########################## Checking Array Size ###########################
-
-    #check that the number of elements in each array are the same
-    if len(month) == len(day) == len(year) == len(hour) == len(minute) == len(rain):
-        #if all arrays have the same number of elements, then the read/append
-        #    conditions above were met and everything is good.
-        print("Number of elements in each variable array are equal. Continue...\n")
-        
-        if len(month) == 0: #can be any variable since now we know they are
-        #    all equal in size/length
-            raise ValueError("No data. Program exiting. Check the directory path and/or the data files themselves.\n The # of columns in the data files may not match what is specified by the condition set in the READ IN FILE(S) section")
-            
-    else:
-        #if all arrays do not have the same number of elements...
-        print("Number of elements in each variable array are not equal. Program exited.\n")
-        sys.exit() #... kill the program
-        #consider telling the user where (i.e. what file) the above conditions was
-        #    not met; this could pinpoint an otherwise unknown issue that needs
-        #    addressing
+    
+    #every variable array comes from the same parsed rows, so they all have the
+    #    same number of elements; only check that there are data at all (no
+    #    new data is fine in incremental mode once data have been processed,
+    #    and so is a time frame that falls within a data gap)
+    if len(data['month']) == 0 and (state is None or 'df' not in state) and \
+        (start is None or end is None):
+        raise ValueError("No data. Program exiting. Check the directory path and/or the data files themselves.\n The # of columns in the data files may not match what is specified by the condition set in the READ IN FILE(S) section")
+    
     
     ##########################################################################
     
     
-    #convert variable lists to numpy arrays for simpler processing
-    month = np.array(month) #this is a string
-    day = np.array(day) #this is a string
-    year = np.array(year) #this is a string
-    hour = np.array(hour) #this is a string
-    minute = np.array(minute) #this is a string
-    if len(second) > 0:
-        second = np.array(second) #this is a string
-    else:
-        pass
-    rain = np.array(rain, dtype=float) #this is a float
-
-
+    #pull the individual variables out of the parsed data
+    month = data['month'] #calendar month
+    day = data['day'] #calendar day
+    year = data['year'] #calendar year
+    hour = data['hour'] #hour in UTC
+    minute = data['minute'] #minutes after the hour [UTC]
+    second = data.get('second', []) #seconds after the minute [UTC]; empty
+                                    #    if time is not recorded to the second
+    rain = data['rain'] #precipitation amount in mm
+    
+    
     ########################## Creating Timestamps ###########################
     
     #call the timestamp generator function
@@ -1080,13 +1750,22 @@ def rain_gauge(directory, units, wildcard):
     df = pd.DataFrame({'time':time, 'rain':rain})
     
     
+    #drop any data outside the time frame set by 'mintime' and 'maxtime'
+    df = _rows_in_window(df, start, end)
+    
+    
     ############################# Data Cleansing #############################
     
     #call the pre-processing function; this will collect out-of-order
     #    timestamps, handle duplicate timestamps, and fill data gaps with NaNs
-    call_processor = pre_processing(df, second)
+    call_processor = pre_processing(df, second, start, end, state)
     df = call_processor[0]
     missing_reports = call_processor[1]
+    events = call_processor[2]
+    
+    #save the state for the next incremental run
+    if state is not None:
+        save_state(state_file, state)
     
     
     ################################ Convert Data ################################
@@ -1111,10 +1790,15 @@ def rain_gauge(directory, units, wildcard):
 
     print("------------------------------------------------------------------")
     
+    #keep only the compact version of the dataframe if asked to (see COMPACT
+    #    DATA)
+    if compact:
+        df = to_compact(df)
+    
     #will need to return 'count' and 'problem_files' if you want to add them to
     #    your output file; will also need to adjust variables in '3D_main.py'
     #    if returning 'count' and 'problem_files'
-    return (df, missing_reports)
+    return (df, missing_reports, events)
 
 
 
@@ -1122,88 +1806,54 @@ def rain_gauge(directory, units, wildcard):
 ##############################    WIND VANE    ###############################
 ##############################################################################
 
-def wind_vane(directory, wildcard):
+def wind_vane(directory, wildcard, mintime="", maxtime="",
+              cache_dir="", state_file="", workers=1, compact=False,
+              files=None):
     #tell the user the function was called
     print("------------------------------------------------------------------\n")
     print("WIND VANE reader function called...\n")
     
-    #find all data files within the specified directory
-    file_list = glob.glob(directory + wildcard)
+    #find all data files within the specified directory (or take the files
+    #    given in 'files', already selected for the time frame; see STREAMING)
+    file_list = glob.glob(directory + wildcard) if files is None else files
     #sort the list of files
     file_list = sorted(file_list)
     
+    #only keep the files that may contain data within the time frame set by
+    #    'mintime' and 'maxtime' (every file if both are empty strings)
+    start, end = _window_bounds(mintime, maxtime)
+    if files is None:
+        file_list = _files_in_window(file_list, _wind_vane_columns, start, end)
+    
+    #in incremental mode (i.e. a 'state_file' is given and the whole dataset
+    #    is read in), only the files added since the last run are read in; see
+    #    INCREMENTAL PROCESSING above
+    state, file_list = _incremental_start(state_file, file_list, start, end,
+                                          ('wind_vane', directory, wildcard))
+    
     # you'll need to think about how to account for the different types of
     #    data files here. This will be the place to begin, perhaps with some
     #    'if' statements
     
-    #Read in the data file(s) from the file_list
-    #Begin by initializing the lists that will store the data from each file
-    #    for each variable
-    month = [] #calendar day
-    day = [] #calendar month
-    year = [] #calendar year
-    hour = [] #hour of day [UTC]
-    minute = [] #minutes after the hour [UTC]
-    second = [] #seconds after the minute [UTC]
-    wind_dir = [] #wind speed [m/s]
-    
-    #loop through the list of files, collecting values from each file and
-    #    appending them to the appropriate list; each list will contain the
-    #    data for a single variable from all files
-    #set a counter for the number of lines with erroneous characters
-    #    encountered
-    counter = 0
-    problem_files = [] #initialize a list to house files with erroneous
-                       #    characters and partially overwritten lines
-    num_lines = 0 #counts the total number of lines read in
-    
-    for file in file_list:
-        with open(file, mode = "r") as f: #open the current file in read mode
-            for line in f: #read each line of the file
-                l = line.strip('\n').split() #remove carriage returns and
-                                             #    whitespace
-                num_lines += 1
-                if len(l) == 9: #this simple condition ought to weed out
-                    #    instances of erroneous characters at the end of a
-                    #    file or lines that were partially overwritten; the
-                    #    length, or # of elements in this variable 'l' should
-                    #    be equivalent to the # of columns in your data file;
-                    #    if not, the data line in question is likely a
-                    #    partially overwritten line or the last line in a file
-                    #    that did not record to 23:59 UTC and contains
-                    #    erroneous characters (\@\@\@\@\@\@\)
-                    month.append(l[0])
-                    day.append(l[1])
-                    year.append(l[2])
-                    hour.append(l[3])
-                    minute.append(l[4])
-                    second.append(l[5])
-                    wind_dir.append(l[7])
-                    
-                elif len(l) == 8: #for timestamps NOT recorded to the second
-                    month.append(l[0])
-                    day.append(l[1])
-                    year.append(l[2])
-                    hour.append(l[3])
-                    minute.append(l[4])
-                    second.append(l[5])
-                    wind_dir.append(l[7])
-                    
-                else: #if the above condition of 8 elements is not met, then 
-                    #    count the occurrence and skip to the next 
-                    #    ine/iteration
-                    counter += 1
-                    
-                    #append the problematic filename to a list
-                    problem_files.append(file)
-                    continue
-        f.close() #always close opened files
+    #Read in the data file(s) from the file_list with the shared parsing engine;
+    #    each variable is returned as a NumPy array of floats containing the
+    #    data from all files. Lines that do not have the number of columns
+    #    given in '_wind_vane_columns' are counted and skipped, and the file they came
+    #    from is added to 'problem_files'. Files that have not changed since
+    #    they were last parsed are taken from the cache in 'cache_dir', if one
+    #    is given (an empty string means no cache). With 'workers' greater than
+    #    1, the files are parsed in that many processes at once
+    call_parser = _parse_files(file_list, _wind_vane_columns, cache_dir, workers)
+    data = call_parser[0]
+    counter = call_parser[1] #number of lines with erroneous characters
+    problem_files = call_parser[2] #files with erroneous characters and
+                                   #    partially overwritten lines
     
     #print the number of files read in
     print("%s files read" % len(file_list))
     
-    #print the number of lines skipped due to erroneous characters or
-    #    partially overwritten data lines
+    #print the number of lines skipped due to erroneous characters or partially
+    #    overwritten data lines
     print("%s lines skipped\n" % counter)
     
     
@@ -1214,38 +1864,28 @@ def wind_vane(directory, wildcard):
     
     ########################## Checking Array Size ###########################
     
-    #check that the number of elements in each array are the same
-    if len(month) == len(day) == len(year) == len(hour) == len(minute) == \
-        len(second) == len(wind_dir):
-        #if all arrays have the same number of elements, then the read/append
-        #    conditions above were met and everything is good.
-        print("Number of elements in each variable array are equal. Continue...\n")
-        
-        if len(month) == 0: #can be any variable since now we know they are
-        #    all equal in size/length
-            raise ValueError("No data. Program exiting. Check the directory path and/or the data files themselves.\n The # of columns in the data files may not match what is specified by the condition set in the READ IN FILE(S) section")
-        
-    else:
-        #if all arrays do not have the same number of elements...
-        print("Number of elements in each variable array are not equal. Program exited.\n")
-        sys.exit() #... kill the program
-        #consider telling the user where (i.e. what file) the above conditions
-        #    was not met; this could pinpoint an otherwise unknown issue that
-        #    needs addressing
-        
+    #every variable array comes from the same parsed rows, so they all have the
+    #    same number of elements; only check that there are data at all (no
+    #    new data is fine in incremental mode once data have been processed,
+    #    and so is a time frame that falls within a data gap)
+    if len(data['month']) == 0 and (state is None or 'df' not in state) and \
+        (start is None or end is None):
+        raise ValueError("No data. Program exiting. Check the directory path and/or the data files themselves.\n The # of columns in the data files may not match what is specified by the condition set in the READ IN FILE(S) section")
+    
     
     ##########################################################################
-        
     
-    #convert variable lists to numpy arrays for simpler processing
-    month = np.array(month) #this is a string
-    day = np.array(day) #this is a string
-    year = np.array(year) #this is a string
-    hour = np.array(hour) #this is a string
-    minute = np.array(minute) #this is a string
-    second = np.array(second) #this is a string
-    wind_dir = np.array(wind_dir, dtype=float) #this is a float
-
+    
+    #pull the individual variables out of the parsed data
+    month = data['month'] #calendar month
+    day = data['day'] #calendar day
+    year = data['year'] #calendar year
+    hour = data['hour'] #hour in UTC
+    minute = data['minute'] #minutes after the hour [UTC]
+    second = data.get('second', []) #seconds after the minute [UTC]; empty
+                                    #    if time is not recorded to the second
+    wind_dir = data['wind_dir'] #wind direction [degrees]
+    
     
     ########################## Creating Timestamps ###########################
     
@@ -1260,23 +1900,37 @@ def wind_vane(directory, wildcard):
     df = pd.DataFrame({'time':time, 'wind_dir':wind_dir})
     
     
+    #drop any data outside the time frame set by 'mintime' and 'maxtime'
+    df = _rows_in_window(df, start, end)
+    
+    
     ############################# Data Cleansing #############################
     
     #call the pre-processing function; this will collect out-of-order
     #    timestamps, handle duplicate timestamps, and fill data gaps with NaNs
-    call_processor = pre_processing(df, second)
+    call_processor = pre_processing(df, second, start, end, state)
     df = call_processor[0]
     missing_reports = call_processor[1]
+    events = call_processor[2]
+    
+    #save the state for the next incremental run
+    if state is not None:
+        save_state(state_file, state)
     
     
     ##########################################################################
 
     print("------------------------------------------------------------------")
     
+    #keep only the compact version of the dataframe if asked to (see COMPACT
+    #    DATA)
+    if compact:
+        df = to_compact(df)
+    
     #will need to return 'count' and 'problem_files' if you want to add them to
     #    your output file; will also need to adjust variables in '3D_main.py'
     #    if returning 'count' and 'problem_files'
-    return (df, missing_reports)
+    return (df, missing_reports, events)
 
 
 
@@ -1284,76 +1938,48 @@ def wind_vane(directory, wildcard):
 ##############################    ANEMOMETER    ##############################
 ##############################################################################
 
-def anemometer(directory, units, wildcard):
+def anemometer(directory, units, wildcard, mintime="", maxtime="",
+               cache_dir="", state_file="", workers=1, compact=False,
+               files=None):
     #tell the user that the function was called
     print("------------------------------------------------------------------\n")
     print("ANEMOMETER reader function called...\n")
     
-    #find all data files within the specified directory
-    file_list = glob.glob(directory + wildcard)
+    #find all data files within the specified directory (or take the files
+    #    given in 'files', already selected for the time frame; see STREAMING)
+    file_list = glob.glob(directory + wildcard) if files is None else files
     #sort the list of files
     file_list = sorted(file_list)
     
+    #only keep the files that may contain data within the time frame set by
+    #    'mintime' and 'maxtime' (every file if both are empty strings)
+    start, end = _window_bounds(mintime, maxtime)
+    if files is None:
+        file_list = _files_in_window(file_list, _anemometer_columns, start, end)
+    
+    #in incremental mode (i.e. a 'state_file' is given and the whole dataset
+    #    is read in), only the files added since the last run are read in; see
+    #    INCREMENTAL PROCESSING above
+    state, file_list = _incremental_start(state_file, file_list, start, end,
+                                          ('anemometer', directory, wildcard, units))
+    
     # you'll need to think about how to account for the different types of data
     #    files here. This will be the place to begin, perhaps with some 'if'
     #    statements
     
-    #Read in the data file(s) from the file_list
-    #Begin by initializing the lists that will store the data from each file for
-    #    each variable
-    month = [] #calendar day
-    day = [] #calendar month
-    year = [] #calendar year
-    hour = [] #hour of day [UTC]
-    minute = [] #minutes after the hour [UTC]
-    second = [] #seconds after the minute [UTC]
-    wind_speed = [] #wind speed [m/s]
-    
-    #loop through the list of files, collecting values from each file and
-    #    appending them to the appropriate list; each list will contain the data
-    #    for a single variable from all files
-    #set a counter for the number of lines with erroneous characters encountered
-    counter = 0
-    problem_files = [] #initialize a list to house files with erroneous characters
-                       #    and partially overwritten lines
-    num_lines = 0 #counts the total number of lines read in
-    
-    for file in file_list:
-        with open(file, mode = "r") as f: #open the current file in read mode
-            for line in f: #read each line of the file
-                l = line.strip('\n').split() #remove carriage returns and whitespace
-                num_lines += 1
-                if len(l) == 7: #this simple condition ought to weed out
-                    #    instances of erroneous characters at the end of a file or
-                    #    lines that were partially overwritten; the length, or # of
-                    #    elements in this variable 'l' should be equivalent to the
-                    #    # of columns in your data file; if not, the data line in
-                    #    question is likely a partially overwritten line or the
-                    #    last line in a file that did not record to 23:59 UTC and
-                    #    contains erroneous characters (\@\@\@\@\@\@\)
-                    month.append(l[0])
-                    day.append(l[1])
-                    year.append(l[2])
-                    hour.append(l[3])
-                    minute.append(l[4])
-                    second.append(l[5])
-                    wind_speed.append(l[6])
-                elif len(l) == 6: #to account for timestamps not recorded to
-                    #    the second
-                    month.append(l[0])
-                    day.append(l[1])
-                    year.append(l[2])
-                    hour.append(l[3])
-                    minute.append(l[4])
-                    wind_speed.append(l[5])
-                else: #if the above condition of 8 elements is not met, then 
-                    #    count the occurrence and skip to the next line/iteration
-                    counter += 1
-                    
-                    #append the problematic filename to a list
-                    problem_files.append(file)
-                    continue
-        f.close() #always close opened files
+    #Read in the data file(s) from the file_list with the shared parsing engine;
+    #    each variable is returned as a NumPy array of floats containing the
+    #    data from all files. Lines that do not have the number of columns
+    #    given in '_anemometer_columns' are counted and skipped, and the file they came
+    #    from is added to 'problem_files'. Files that have not changed since
+    #    they were last parsed are taken from the cache in 'cache_dir', if one
+    #    is given (an empty string means no cache). With 'workers' greater than
+    #    1, the files are parsed in that many processes at once
+    call_parser = _parse_files(file_list, _anemometer_columns, cache_dir, workers)
+    data = call_parser[0]
+    counter = call_parser[1] #number of lines with erroneous characters
+    problem_files = call_parser[2] #files with erroneous characters and
+                                   #    partially overwritten lines
     
     #print the number of files read in
     print("%s files read" % len(file_list))
@@ -1370,36 +1996,27 @@ def anemometer(directory, units, wildcard):
     
     ########################## Checking Array Size ###########################
     
-    #check that the number of elements in each array are the same
-    if len(month) == len(day) == len(year) == len(hour) == len(minute) == len(wind_speed):
-        #if all arrays have the same number of elements, then the read/append
-        #    conditions above were met and everything is good.
-        print("Number of elements in each variable array are equal. Continue...\n")
-        
-        if len(month) == 0: #can be any variable since now we know they are
-        #    all equal in size/length
-            raise ValueError("No data. Program exiting. Check the directory path and/or the data files themselves.\n The # of columns in the data files may not match what is specified by the condition set in the READ IN FILE(S) section")
-        
-    else:
-        #if all arrays do not have the same number of elements...
-        print("Number of elements in each variable array are not equal. Program exited.\n")
-        sys.exit() #... kill the program
-        #consider telling the user where (i.e. what file) the above conditions was
-        #    not met; this could pinpoint an otherwise unknown issue that needs
-        #    addressing
+    #every variable array comes from the same parsed rows, so they all have the
+    #    same number of elements; only check that there are data at all (no
+    #    new data is fine in incremental mode once data have been processed,
+    #    and so is a time frame that falls within a data gap)
+    if len(data['month']) == 0 and (state is None or 'df' not in state) and \
+        (start is None or end is None):
+        raise ValueError("No data. Program exiting. Check the directory path and/or the data files themselves.\n The # of columns in the data files may not match what is specified by the condition set in the READ IN FILE(S) section")
+    
     
     ##########################################################################
-        
     
-    #convert variable lists to numpy arrays for simpler processing
-    month = np.array(month) #this is a string
-    day = np.array(day) #this is a string
-    year = np.array(year) #this is a string
-    hour = np.array(hour) #this is a string
-    minute = np.array(minute) #this is a string
-    if len(second) > 0:
-        second = np.array(second) #this is a string
-    wind_speed = np.array(wind_speed, dtype=float) #this is a float
+    
+    #pull the individual variables out of the parsed data
+    month = data['month'] #calendar month
+    day = data['day'] #calendar day
+    year = data['year'] #calendar year
+    hour = data['hour'] #hour in UTC
+    minute = data['minute'] #minutes after the hour [UTC]
+    second = data.get('second', []) #seconds after the minute [UTC]; empty
+                                    #    if time is not recorded to the second
+    wind_speed = data['wind_speed'] #wind speed [m/s]
     
     
     ############################ Converting Data #############################
@@ -1436,23 +2053,126 @@ def anemometer(directory, units, wildcard):
     df = pd.DataFrame({'time':time, 'wind_speed':wind_speed})
     
     
+    #drop any data outside the time frame set by 'mintime' and 'maxtime'
+    df = _rows_in_window(df, start, end)
+    
+    
     ############################# Data Cleansing #############################
     
     #call the pre-processing function; this will collect out-of-order
     #    timestamps, handle duplicate timestamps, and fill data gaps with NaNs
-    call_processor = pre_processing(df, second)
+    call_processor = pre_processing(df, second, start, end, state)
     df = call_processor[0]
     missing_reports = call_processor[1]
+    events = call_processor[2]
+    
+    #save the state for the next incremental run
+    if state is not None:
+        save_state(state_file, state)
     
     
     ##########################################################################
 
     print("------------------------------------------------------------------")
     
+    #keep only the compact version of the dataframe if asked to (see COMPACT
+    #    DATA)
+    if compact:
+        df = to_compact(df)
+    
     #will need to return 'count' and 'problem_files' if you want to add them to
     #    your output file; will also need to adjust variables in '3D_main.py'
     #    if returning 'count' and 'problem_files'
-    return (df, missing_reports)
+    return (df, missing_reports, events)
+
+
+
+##############################################################################
+##############################    STREAMING    ###############################
+##############################################################################
+
+#For archives too large to hold in memory at once, 'read_blocks' reads the
+#    data in one block of time (by default, one calendar month) after another
+#    and yields what the reader function returns for each block: the
+#    pre-processed (time-ordered, deduplicated and gap-filled) dataframe, the
+#    missing report times and the time resets/duplicated timestamps. Only the
+#    files that may contain data within a block are read in for it (see TIME
+#    WINDOW), so at most about one block of data is in memory at a time.
+#Each record belongs to the block of the minute its timestamp rounds to, so
+#    duplicated timestamps are always found within the same block, and the
+#    1-minute grids of the blocks follow on from one another without overlap
+#    or gaps; a block without any data is yielded as all missing reports
+#    (with the columns of the block before it).
+#    Put together, the blocks are the same as reading in everything at once.
+#NOTE: as with reading in a time frame, records whose time reset far into
+#      another block are missed, and time resets are counted within blocks
+
+#the file layouts of each reader function
+def _reader_layouts(reader_func):
+    return {bmp: _bmp_columns, htu21d: _htu21d_columns,
+            mcp9808: _mcp9808_columns, si1145: _si1145_columns,
+            rain_gauge: _rain_columns, wind_vane: _wind_vane_columns,
+            anemometer: _anemometer_columns}[reader_func]
+
+
+#'reader_func' is one of the reader functions above and 'args' are its
+#    arguments up to 'wildcard' (e.g. (directory, units, wildcard) for
+#    rain_gauge); 'period' is the length of the blocks as a pandas frequency
+#    (e.g. "MS" for calendar months, "7D" for weeks)
+def read_blocks(reader_func, *args, period="MS", cache_dir="", workers=1,
+                compact=False):
+    directory, wildcard = args[0], args[-1]
+    layouts = _reader_layouts(reader_func)
+
+    #the files are found, and the time range of each of them told (see
+    #    '_file_span'), only once for all of the blocks
+    file_list = sorted(glob.glob(directory + wildcard))
+    spans = [_file_span(file, layouts) for file in file_list]
+
+    #the time spanned by the files, from the dates in their names (or their
+    #    first and last lines)
+    times = []
+    for file, span in zip(file_list, spans):
+        date = _file_date(file)
+        if date is not None:
+            times.append(date)
+        else:
+            times.extend(t for t in span if t is not None)
+    if len(times) == 0:
+        raise ValueError("No data. Program exiting. Check the directory path and/or the data files themselves.")
+
+    #the first block takes in everything before its end and the last block
+    #    everything after its start, whatever the files' dates
+    bounds = pd.date_range(min(times), max(times), freq=period)
+    bounds = [None] + [b for b in bounds if b > min(times)] + [None]
+
+    dtypes = None
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        mintime = "" if start is None else str(start)
+        maxtime = "" if end is None else str(end - pd.Timedelta(minutes=1))
+
+        #only the files that may contain data within this block are read in;
+        #    a block without any such files is not read in at all
+        files = [file for file, span in zip(file_list, spans)
+                 if _span_in_window(*span, *_window_bounds(mintime, maxtime))]
+        block = None
+        if len(files) > 0 or dtypes is None:
+            try:
+                block = reader_func(*args, mintime, maxtime, cache_dir, "",
+                                    workers, compact, files=files)
+            except (ValueError, TypeError) as e:
+                if not str(e).startswith("No data") or dtypes is None:
+                    raise
+        if block is None:
+            #no data within this block; every minute is a missing report
+            time = pd.date_range(start=start, end=end, freq='min', inclusive='left')
+            df = pd.DataFrame({col: time if col == 'time' else np.nan
+                               for col in dtypes.index}).astype(dtypes)
+            block = (df, pd.DatetimeIndex(time),
+                     {'time_resets': np.array([], dtype='datetime64[ns]'),
+                      'duplicates': np.array([], dtype='datetime64[ns]')})
+        dtypes = block[0].dtypes
+        yield block
 
 
 #only execute the functions if they are explicitly called from the parent
@@ -54,9 +54,9 @@ Created on Thu Jun  4 16:05:12 2020
 #    3. Call the function in the parent program, ensuring that you pass the 
 #       appropriate attributes/parameters:
 #
-#       a) call_time = time_checker(mintime, maxtime, df)
+#       a) call_time = time_checker(mintime, maxtime, plot_opt, df, avail)
 #       ... or...
-#       b) call_time = tc.time_checker(mintime, maxtime, df)
+#       b) call_time = tc.time_checker(mintime, maxtime, plot_opt, df, avail)
 #
 #    4. Run the parent program within terminal (e.g. "python BMP_plotter.py"),
 #       or open the parent program in Spyder and run from there.
@@ -68,9 +68,11 @@ Created on Thu Jun  4 16:05:12 2020
 #    
 #
 #
-#NOTES: At the moment, this program reads in all data (the whole dataframe)
-#       even if a subset of time is requested for plotting, analysis, etc.,
-#       which is a bit of an overkill
+#NOTES: When a subset of time is requested, the reader functions only read in
+#       the data within it (see TIME WINDOW in 'reader.py'), so the checks
+#       below are against the data read in for that time frame; the indices
+#       of 'mintime' and 'maxtime' are found with a binary search (see
+#       'calendar_index.py'), without going through the whole dataset
 
 
 
@@ -81,6 +83,7 @@ Created on Thu Jun  4 16:05:12 2020
 import numpy as np
 import pandas as pd
 import sys
+from availability import AvailabilityIndex
 
 
 
@@ -90,8 +93,9 @@ import sys
 
 #'mintime', 'maxtime', and 'df' (dataframe) are called from the main function;
 #    'df' is needed because we use the dataframe and some dataframe methods to
-#    check timestamps
-def time_checker(mintime, maxtime, plot_opt, df):
+#    check timestamps; 'avail' is the availability index of 'df' (see
+#    'availability.py'), built here if not given
+def time_checker(mintime, maxtime, plot_opt, df, avail=None):
     
     #tell the user that the function was called
     print("------------------------------------------------------------------\n")
@@ -101,9 +105,11 @@ def time_checker(mintime, maxtime, plot_opt, df):
     ###########################    DATA PROCESSING    ############################
     ##############################################################################
     
-    #create a 'time' variable from the 'time' column in the DataFrame as a
-    #   DatetimeIndex array; this will be used for other calculations/test below
-    time = pd.to_datetime(np.array(df.time))
+    #the first and last timestamps of the dataset; the reader functions return
+    #    'df' in time order, so these are read straight off its ends rather
+    #    than going through the whole 'time' column
+    first_time = df.time.iloc[0]
+    last_time = df.time.iloc[-1]
     
     
     ################## Checking 'mintime' / 'maxtime' Validity ###################
@@ -144,15 +150,13 @@ def time_checker(mintime, maxtime, plot_opt, df):
         
     #then check to see if 'mintime' and 'maxtime' are within the dataset that was
     #    read in
-    #Note: the method min() and max() are functions of both DataFrames and
-    #      datetimeindex, so if we wanted, we could also do this: df.time.min()
-    if pd.to_datetime(mintime) < df.time.min() or \
-        pd.to_datetime(mintime) > df.time.max() or \
-            pd.to_datetime(maxtime) > df.time.max() or \
-                pd.to_datetime(maxtime) < df.time.min():
+    if pd.to_datetime(mintime) < first_time or \
+        pd.to_datetime(mintime) > last_time or \
+            pd.to_datetime(maxtime) > last_time or \
+                pd.to_datetime(maxtime) < first_time:
         print("'mintime'/'maxtime' are outside the range of time.")
-        print("The minimum start time is %s." % str(time.min()))
-        print("The maximum end time is %s.\n" % str(time.max()))
+        print("The minimum start time is %s." % str(first_time))
+        print("The maximum end time is %s.\n" % str(last_time))
         #remind the user what their start/end time limits are^
         sys.exit()
     
@@ -165,9 +169,12 @@ def time_checker(mintime, maxtime, plot_opt, df):
     ########################## Setting the Time Frame ############################
     
     #set up the user-defined time frame
-    #Note: the method .get_loc() used below is a function of datetimeindex, NOT
-    #      DataFrames, so we must resort to using the datetimeindex array 'time'
-    #      that was created from the 'time' column in the dataframe
+    #Note: the indices of 'mintime' and 'maxtime' are found with a binary
+    #      search of the 'time' column (see 'calendar_index.py') rather than by
+    #      building a hash table of every timestamp with .get_loc()
+    if avail is None:
+        avail = AvailabilityIndex(df)
+    calendar = avail.calendar
     if mintime == "" and maxtime == "":
         #if 'mintime' and 'maxtime are empty strings, then the user must want to
         #    plot the entire dataset
@@ -177,17 +184,17 @@ def time_checker(mintime, maxtime, plot_opt, df):
         #if 'mintime' is an empty string, but 'maxtime' is not, then plot from the
         #    beginning of the dataset to the specified endtime (i.e. 'maxtime')
         mintime = 0
-        maxtime = time.get_loc(pd.to_datetime(maxtime))
+        maxtime = calendar.locate(maxtime)
     elif mintime != "" and maxtime == "":
         #if 'mintime' is not an empty string, but 'maxtime' is, then plot from the
         #    start time specified by 'mintime' to the end of the dataset
-        mintime = time.get_loc(pd.to_datetime(mintime))
+        mintime = calendar.locate(mintime)
         maxtime = df.index[-1]
     elif mintime != "" and maxtime != "":
         #if setting a user-defined time frame over which to plot, first convert
         #    the 'mintime' and 'maxtime' strings to pandas Timestamps
-        mintime = time.get_loc(pd.to_datetime(mintime))
-        maxtime = time.get_loc(pd.to_datetime(maxtime))
+        mintime = calendar.locate(mintime)
+        maxtime = calendar.locate(maxtime)
     
     #if using the daily, weekly, or monthly plotter, check that the interval
     #    of time determined by the user-defined range limits is at least 1 day,
@@ -200,14 +207,10 @@ def time_checker(mintime, maxtime, plot_opt, df):
         if ((df.time[maxtime] - df.time[mintime]) < pd.Timedelta(days=28)):
             raise ValueError("The time delta given by 'mintime' and 'maxtime' is less than 28 days.\nPlease give a 'mintime' and 'maxtime' such that the time delta is at least 28 days when using the monthly plotter, or use the default plotter instead.")
         else:
-            #this line will find the index of the very first day/time for each month in
-            #    the whole dataframe
-            day1_of_month_idx = df.index[df.set_index('time').index.day == 1][::1440]
-            
             #this line will find the index(indices) of the very first day/time for each
-            #    month within the time frame set by the user (within 'mintime' and
-            #    'maxtime')
-            day1_of_month_idx = day1_of_month_idx[(day1_of_month_idx>mintime) & (day1_of_month_idx<maxtime)]
+            #    month within the time frame set by the user (after 'mintime' and
+            #    before 'maxtime'; see 'calendar_index.py')
+            day1_of_month_idx = pd.Index(calendar.months(mintime + 1, maxtime))
             
             #if the user time frame is GREATER THAN or EQUAL TO 28 days but does
             #    not contain a first-of-the-month date/timestamp
@@ -231,25 +234,22 @@ def time_checker(mintime, maxtime, plot_opt, df):
     #      calculated above in the "Filling gaps with NaNs" subsection
     if mintime != 0 or maxtime != df.index[-1]:
     
-        #this is a pandas series containing the indices WITHIN THE TIME FRAME
-        #    such that the corresponding data value is NaN (i.e. missing)
-        missing_reports_idx = df.index[mintime:maxtime+1][df[df.columns[1]][mintime:maxtime+1].isna()==True]
+        #the availability index of 'df' (see 'availability.py') answers these
+        #    from running totals of the missing reports, without going through
+        #    the data WITHIN THE TIME FRAME; pass the same index to the rest of
+        #    the program (e.g. 'output.py') to count them only once
         
         #the actual timestamps for missing data records (NaNs)
-        missing_report_times = pd.to_datetime(np.array(df.time[missing_reports_idx]))
-        
-        #this is the total sum WITHIN THE TIME FRAME such that the data are
-        #    NaNs
-        missing_reports_sum = df[df.columns[1]][mintime:maxtime+1].isna().sum()
+        missing_report_times = avail.missing_times(mintime, maxtime+1)
         
         #total amount of time WITHIN THE TIME FRAME
-        total = pd.Timedelta(len(df.index[mintime:maxtime+1]), unit='m')
+        total = avail.total(mintime, maxtime+1)
         
         #total amount of uptime WITHIN THE TIME FRAME
-        uptime = pd.Timedelta((len(df.index[mintime:maxtime+1]) - missing_reports_sum), unit='m')
+        uptime = avail.uptime(mintime, maxtime+1)
         
         #total uptime percentage WITHIN THE TIME FRAME
-        uptime_percent = round((1 - (float(missing_reports_sum) / float(len(df[mintime:maxtime+1])))) * 100., 1)
+        uptime_percent = avail.uptime_percent(mintime, maxtime+1)
         print("Uptime during the time frame is %s out of %s (%s%%).\n" % (uptime,total,uptime_percent))
         
     
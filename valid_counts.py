@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+###############################################################################
+'''
+           _____   _____     _     ____        ___    ___   _____
+           |    \  |        / \    |   \       |  \  /  |   |
+           |____/  |__     /___\   |    |      |   \/   |   |__
+           | \     |      /     \  |    |      |        |   |
+           |  \    |____ /       \ |___/       |        |   |____
+'''
+
+#This code counts the valid (not NaN) data points of a dataframe returned by
+#    the reader functions within any range of indices, without going through
+#    the data within that range.
+#
+#LICENSE:
+#This code may be used and distributed freely, provided proper attribution is
+#    given to UCAR.
+#
+#
+#REQUIREMENTS:
+#    Python 3
+#    Numpy
+#
+#
+#PLANNED FEATURES:
+#
+#
+#HOW TO USE:
+#    1. Save this file/program in the same directory as the parent program you
+#       will use this function in conjunction with
+#    2. Build the counts once for a dataframe, then ask for the number of rows
+#       or valid data points of a column from index 'lo' up to (not including)
+#       index 'hi' (the same rows as df[column][lo:hi]):
+#
+#       counts = ValidCounts(df)
+#       counts.size(lo, hi)
+#       counts.count(column, lo, hi)
+#
+#
+#NOTES: The first time a column is counted, the running total of its valid
+#       data points is computed (one pass through the column); every count
+#       after that is the difference of two entries of that running total, so
+#       it takes the same (very short) time no matter how many rows are
+#       counted.
+
+
+
+##############################################################################
+#########################    IMPORTING MODULES    ############################
+##############################################################################
+
+import numpy as np
+
+
+
+##############################################################################
+###############################    CLASS    ##################################
+##############################################################################
+
+class ValidCounts:
+
+    def __init__(self, df):
+        self.df = df
+        #the running total of valid data points for each column counted so
+        #    far; entry i is the number of valid data points before row i
+        self._totals = {}
+
+    #the running total of valid data points of 'column'
+    def totals(self, column):
+        if column not in self._totals:
+            valid = self.df[column].notna().to_numpy()
+            self._totals[column] = np.concatenate(([0], np.cumsum(valid)))
+        return self._totals[column]
+
+    #'lo' and 'hi' limited to the rows of the dataframe, as slicing does
+    def _bounds(self, lo, hi):
+        n = len(self.df)
+        lo = min(max(lo, 0), n)
+        return lo, min(max(hi, lo), n)
+
+    #the number of rows from 'lo' up to (not including) 'hi'
+    def size(self, lo, hi):
+        lo, hi = self._bounds(lo, hi)
+        return hi - lo
+
+    #the number of valid data points of 'column' from 'lo' up to (not
+    #    including) 'hi'
+    def count(self, column, lo, hi):
+        lo, hi = self._bounds(lo, hi)
+        totals = self.totals(column)
+        return int(totals[hi] - totals[lo])